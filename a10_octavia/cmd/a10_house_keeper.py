@@ -48,6 +48,7 @@ def spare_amphora_check():
         LOG.debug("Initiating spare amphora check...")
         try:
             spare_amp.spare_check()
+            spare_amp.warm_spare_check()
         except Exception as e:
             LOG.debug('spare_amphora caught the following exception and '
                       'is restarting: {}'.format(e))
@@ -64,12 +65,11 @@ def db_cleanup():
     LOG.info('Load balancer expiry age is %s seconds',
              CONF.a10_house_keeping.load_balancer_expiry_age)
 
-    db_cleanup = house_keeping.DatabaseCleanup()
+    db_cleanup = house_keeping.DatabaseCleanup(stop_event=db_cleanup_thread_event)
     while not db_cleanup_thread_event.is_set():
         LOG.info("Initiating the cleanup of old resources...")
         try:
-            db_cleanup.delete_old_amphorae()
-            db_cleanup.cleanup_load_balancers()
+            db_cleanup.cleanup()
         except Exception as e:
             LOG.info('db_cleanup caught the following exception and '
                      'is restarting: {}'.format(e))
@@ -53,8 +53,15 @@ BACKUP_VRRP_STATUS = 'backup_vrrp_status'
 NAT_POOL = 'nat_pool'
 NAT_FLAVOR = 'nat_flavor'
 SUBNET_PORT = 'subnet_port'
+SUBNET_PORTS = 'subnet_ports'
 WRITE_MEM_SHARED = 'write_mem_shared'
 WRITE_MEM_PRIVATE = 'write_mem_private'
+WRITE_MEM_PARTITIONS = 'write_mem_partitions'
+WRITE_MEM_THUNDERS = 'write_mem_thunders'
+RELOAD_CHECK_THUNDERS = 'reload_check_thunders'
+LOADBALANCERS_MAP = 'loadbalancers_map'
+PARTITION_CHANGE_COUNTS = 'partition_change_counts'
+FLOW_SESSION = 'flow_session'
 
 FAILED = 'FAILED'
 USED_SPARE = 'USED_SPARE'
@@ -116,6 +123,8 @@ COMPUTE_PAUSED = "PAUSED"
 L2DSR_FLAVOR = "l2dsr_flavor"
 MASTER_AMPHORA_STATUS = "master_amphora_status"
 BACKUP_AMPHORA_STATUS = "backup_amphora_status"
+PEER_VTHUNDER = "peer_vthunder"
+PEER_AMPHORA_STATUS = "peer_amphora_status"
 
 FLOW_TYPE = 'flow_type'
 FLOW_TYPE_DELETE = 'delete'
@@ -236,6 +245,7 @@ CONFIGURE_PROXY_SERVER = 'configure-proxy-server'
 SET_VTHUNDER_HOSTNAME = 'set-vthunder-hostname'
 WRITE_MEMORY_THUNDER_FLOW = 'write-memory-thunder-flow'
 RELOAD_CHECK_THUNDER_FLOW = 'reload-check-thunder-flow'
+WRITE_MEMORY_DEVICE_FLOW = 'write-memory-device-flow'
 LB_TO_VTHUNDER_SUBFLOW = 'lb-to-vthunder-subflow'
 GET_SPARE_AMPHORA_SBUFLOW = 'get-sapre_amphora-subflow'
 GET_LB_RESOURCE = 'get-lb-resource'
@@ -254,6 +264,8 @@ GET_AMPHORA_FOR_FAILOVER = 'get-amphora-for-failover'
 PLUG_NETWORK_BY_IDS = 'plug-network-by-ids'
 PLUG_VIP_NETWORK_ON_SPARE = 'plusg-vip-network-on-spare'
 POST_SPARE_PLUG_NETWORK = 'post-failover-plug-network'
+WARM_SPARE_VTHUNDER_FLOW = 'a10-house-keeper-warm-spare-vthunder'
+MARK_SPARE_VTHUNDER_READY_IN_DB = 'mark-spare-vthunder-ready-in-db'
 GET_VCS_DEVICE_ID = 'get-vcs-device-id'
 POST_FAILOVER_DB_UPDATE = 'post-failover-db-update'
 MARK_LB_LIST_ERROR_ON_REVERT = 'mark-lb-list-error-on-revert'
@@ -283,6 +295,11 @@ FULLY_POPULATED_MARK_L7RULE_ACTIVE = '-mark-l7rule-active'
 # ======================
 
 OCTAVIA_OWNER = 'Octavia'
+AXAPI_PORT = 443
+# Seconds an index of Octavia owned ports by ip address is reused before
+# it is rebuilt from neutron
+OCTAVIA_PORT_INDEX_TTL = 60
+SEC_GRP_FILTER_EXT_ALIAS = 'port-security-groups-filtering'
 TOPOLOGY_SPARE = 'SPARE'
 READY = "READY"
 
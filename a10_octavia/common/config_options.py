@@ -63,7 +63,12 @@ A10_GLOBAL_OPTS = [
                 default='',
                 help=_('A list of subnet and IPv6 address pair, which a10-octavia will attach '
                        'the addresses to the vThunder subnet interfaces '
-                       'when using vThunder as Amphora'))
+                       'when using vThunder as Amphora')),
+    cfg.IntOpt('parent_project_cache_ttl', default=600, min=0,
+               help=_('Seconds a project to parent project lookup from Keystone '
+                      'is cached for. 0 disables the cache.')),
+    cfg.IntOpt('parent_project_negative_cache_ttl', default=60, min=0,
+               help=_('Seconds a project not found in Keystone is cached for.'))
 ]
 
 A10_GLM_LICENSE_OPTS = [
@@ -289,6 +294,15 @@ A10_HEALTH_MANAGER_OPTS = [
     cfg.BoolOpt('stats_update_disable',
                 default=False,
                 help=_('Disable loadbalancer listener statistics update')),
+    cfg.BoolOpt('stats_delta_writes',
+                default=False,
+                help=_('Only write the statistics of a listener to the database '
+                       'when its counters changed since the last write')),
+    cfg.IntOpt('stats_min_write_interval',
+               default=0, min=0,
+               help=_('Minimum seconds between two database writes of the '
+                      'statistics of a listener when stats_delta_writes is '
+                      'enabled')),
 ]
 
 A10_CONTROLLER_WORKER_OPTS = [
@@ -302,6 +316,24 @@ A10_CONTROLLER_WORKER_OPTS = [
                default=10,
                help=_('Seconds to wait between checks on whether an VThunder '
                       'has become active')),
+    cfg.FloatOpt('amp_connect_timeout',
+                 default=3.0, min=0.1,
+                 help=_('Seconds a single connectivity probe waits for the '
+                        'vThunder-Amphora aXAPI port to accept a connection. '
+                        'Independent of default_axapi_timeout')),
+    cfg.IntOpt('amp_reload_start_timeout',
+               default=30, min=0,
+               help=_('Seconds to wait for a vThunder-Amphora to start a reload '
+                      'or reboot before polling it as if it had reloaded')),
+    cfg.IntOpt('amp_ready_timeout',
+               default=600, min=1,
+               help=_('Seconds to wait for a vThunder-Amphora to become ready '
+                      'after a reload or reboot')),
+    cfg.FloatOpt('amp_ready_poll_interval',
+                 default=1.0, min=0.1,
+                 help=_('Initial seconds between readiness polls of a reloading '
+                        'vThunder-Amphora. The interval doubles on every poll up '
+                        'to amp_active_wait_sec')),
     cfg.StrOpt('amp_flavor_id',
                default='',
                help=_('Nova instance flavor id for the VThunder')),
@@ -366,7 +398,17 @@ A10_CONTROLLER_WORKER_OPTS = [
     cfg.IntOpt('retry_max',
                default=5,
                help=_('Maximum Retries for Database Entry')),
-    cfg.BoolOpt('event_notifications', default=True)
+    cfg.BoolOpt('event_notifications', default=True),
+    cfg.IntOpt('flavor_cache_ttl', default=30, min=0,
+               help=_('Seconds the parsed data of a flavor is used without reading '
+                      'its flavor profile again. 0 reads it for every flow.')),
+    cfg.IntOpt('aflex_cache_ttl', default=0, min=0,
+               help=_('Seconds an aFlex script uploaded for a l7policy is trusted '
+                      'to be unchanged on the vThunder. An unchanged script is not '
+                      'uploaded again within this time. 0 uploads it every time. '
+                      'The scripts uploaded are remembered per worker process, only '
+                      'enable it when a single a10-octavia worker process manages '
+                      'the vThunders.'))
 ]
 
 A10_HOUSE_KEEPING_OPTS = [
@@ -377,6 +419,37 @@ A10_HOUSE_KEEPING_OPTS = [
     cfg.IntOpt('spare_amphora_pool_size',
                default=0,
                help=_('Number of spare vThunder-Amphorae')),
+    cfg.StrOpt('spare_pool_mode',
+               choices=['static', 'adaptive'],
+               default='static',
+               help=_('static keeps spare_amphora_pool_size spares. adaptive '
+                      'sizes the pool to the forecast spare demand within '
+                      'spare_pool_min_size and spare_pool_max_size')),
+    cfg.IntOpt('spare_pool_min_size',
+               default=0, min=0,
+               help=_('Minimum number of spare vThunder-Amphorae in adaptive mode')),
+    cfg.IntOpt('spare_pool_max_size',
+               default=10, min=0,
+               help=_('Maximum number of spare vThunder-Amphorae in adaptive mode')),
+    cfg.IntOpt('spare_forecast_window',
+               default=3600, min=60,
+               help=_('Seconds of recent spare demand the adaptive forecast '
+                      'is based on')),
+    cfg.IntOpt('spare_forecast_horizon',
+               default=1800, min=60,
+               help=_('Seconds ahead the adaptive spare pool should cover '
+                      'the forecast demand for')),
+    cfg.IntOpt('spare_boot_rate_limit',
+               default=5, min=1,
+               help=_('Maximum number of spare vThunder-Amphorae booted per '
+                      'spare check in adaptive mode')),
+    cfg.IntOpt('spare_warm_network_count',
+               default=0, min=0,
+               help=_('Number of the most used VIP and member networks of '
+                      'a project to plug into a spare vThunder-Amphora kept '
+                      'for that project, so failover skips the network plug '
+                      'and reload. One cold spare is always kept for the '
+                      'other projects. 0 disables warm spares')),
     cfg.IntOpt('cleanup_interval',
                default=30,
                help=_('DB cleanup interval in seconds')),
@@ -386,6 +459,16 @@ A10_HOUSE_KEEPING_OPTS = [
     cfg.IntOpt('load_balancer_expiry_age',
                default=604800,
                help=_('Load balancer expiry age in seconds')),
+    cfg.IntOpt('purge_chunk_size',
+               default=100, min=1,
+               help=_('Number of expired records DB cleanup deletes at a time')),
+    cfg.FloatOpt('purge_chunk_interval',
+                 default=0.5, min=0,
+                 help=_('Seconds DB cleanup pauses between two chunks of deletes')),
+    cfg.IntOpt('purge_cycle_time_limit',
+               default=60, min=1,
+               help=_('Maximum seconds one DB cleanup cycle spends purging. '
+                      'Records left over are purged in the next cycle')),
     cfg.IntOpt('stats_cleanup_interval',
                default=3600,
                help=_('Statistics cleanup interval in seconds')),
@@ -403,6 +486,14 @@ A10_HOUSE_KEEPING_OPTS = [
                default=3600,
                min=300,
                help=_('Write Memory interval in seconds')),
+    cfg.IntOpt('write_mem_device_threads',
+               default=8, min=1,
+               help=_('Number of thunder devices write memory and reload check '
+                      'run on concurrently')),
+    cfg.IntOpt('write_mem_partitions_per_device',
+               default=1, min=1,
+               help=_('Number of partitions of one thunder device write memory '
+                      'and reload check run on concurrently')),
     cfg.StrOpt('use_periodic_write_memory',
                choices=['enable', 'disable'],
                default='disable',
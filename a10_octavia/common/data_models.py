@@ -241,3 +241,15 @@ class VrrpSet(BaseDataModel):
         self.mgmt_subnet = mgmt_subnet
         self.project_id = project_id
         self.set_id = set_id
+
+
+class PartitionChange(BaseDataModel):
+
+    def __init__(self, ip_address=None, partition_name=None, change_count=0,
+                 written_count=0, pending=False, updated_at=None):
+        self.ip_address = ip_address
+        self.partition_name = partition_name
+        self.change_count = change_count
+        self.written_count = written_count
+        self.pending = pending
+        self.updated_at = updated_at
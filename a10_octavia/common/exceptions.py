@@ -271,6 +271,13 @@ class MissThunderForFailover(acos_errors.ACOSException):
         super(MissThunderForFailover, self).__init__(msg=msg)
 
 
+class ThunderNotReady(acos_errors.ACOSException):
+    def __init__(self, vthunder_id, timeout):
+        msg = ('vThunder {0} is not ready {1} seconds after reload.').format(
+            vthunder_id, timeout)
+        super(ThunderNotReady, self).__init__(msg=msg)
+
+
 class FlavorNotFound(cfg.ConfigFileValueError):
     def __init__(self, flavor):
         msg = ('Flavor {0} specified in the configuration file cannot be located,'
@@ -0,0 +1,123 @@
+#    Copyright 2021, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import copy
+import json
+import re
+import threading
+
+from oslo_config import cfg
+from oslo_log import log as logging
+from oslo_utils import timeutils
+
+CONF = cfg.CONF
+LOG = logging.getLogger(__name__)
+
+
+def _format_keys(flavor_data):
+    if isinstance(flavor_data, list):
+        return [_format_keys(item) for item in flavor_data]
+    elif isinstance(flavor_data, dict):
+        return {k.replace('-', '_'): _format_keys(v) for k, v in flavor_data.items()}
+    return flavor_data
+
+
+def _name_expression_regexes(flavor_data):
+    if isinstance(flavor_data, list):
+        for item in flavor_data:
+            for regex in _name_expression_regexes(item):
+                yield regex
+    elif isinstance(flavor_data, dict):
+        for key, value in flavor_data.items():
+            if key == 'name_expressions' and isinstance(value, list):
+                for expression in value:
+                    if isinstance(expression, dict) and 'regex' in expression:
+                        yield expression['regex']
+            else:
+                for regex in _name_expression_regexes(value):
+                    yield regex
+
+
+class FlavorCache(object):
+    """Parsed flavor profile data by flavor id.
+
+    An entry is trusted for flavor_cache_ttl seconds. Afterwards the caller
+    reads the flavor profile again and the entry is only parsed again when
+    the flavor profile or its data changed. Callers get copies, so they may
+    modify the returned data.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # flavor id -> (expiry StopWatch, flavor_data, parsed, normalized)
+        self._flavors = {}
+        self._regexes = {}
+
+    def clear(self):
+        with self._lock:
+            self._flavors.clear()
+            self._regexes.clear()
+
+    def _get(self, flavor_id, index):
+        with self._lock:
+            entry = self._flavors.get(flavor_id)
+        if entry and not entry[0].expired():
+            return copy.deepcopy(entry[index])
+        return None
+
+    def get(self, flavor_id):
+        """Returns the flavor data with its original keys, or None if not cached."""
+        return self._get(flavor_id, 2)
+
+    def get_normalized(self, flavor_id):
+        """Returns the flavor data with '-' in keys replaced by '_', or None if not cached."""
+        return self._get(flavor_id, 3)
+
+    def update(self, flavor_id, flavor_data, normalized=False):
+        """Caches the flavor_data json string of the flavor profile of flavor_id.
+
+        :returns: The flavor data, with normalized keys if normalized is True
+        """
+        watch = timeutils.StopWatch(
+            duration=CONF.a10_controller_worker.flavor_cache_ttl).start()
+        with self._lock:
+            entry = self._flavors.get(flavor_id)
+        if entry and entry[1] == flavor_data:
+            parsed, normalized_data = entry[2], entry[3]
+        else:
+            parsed = json.loads(flavor_data)
+            normalized_data = _format_keys(parsed)
+            for regex in _name_expression_regexes(normalized_data):
+                try:
+                    self.get_regex(regex)
+                except re.error as e:
+                    LOG.warning("Invalid name_expressions regex %s in flavor %s: %s",
+                                regex, flavor_id, str(e))
+            LOG.debug("Parsed flavor profile data of flavor %s", flavor_id)
+        with self._lock:
+            self._flavors[flavor_id] = (watch, flavor_data, parsed, normalized_data)
+        return copy.deepcopy(normalized_data if normalized else parsed)
+
+    def get_regex(self, regex):
+        """Returns regex of a name_expressions entry compiled."""
+        with self._lock:
+            compiled = self._regexes.get(regex)
+        if compiled is None:
+            compiled = re.compile(regex)
+            with self._lock:
+                self._regexes[regex] = compiled
+        return compiled
+
+
+flavor_cache = FlavorCache()
@@ -22,12 +22,15 @@ import json
 import netaddr
 import socket
 import struct
+import threading
+import types
 
 from ipaddress import ip_address
 from ipaddress import IPv4Address
 from ipaddress import IPv6Address
 from oslo_config import cfg
 from oslo_log import log as logging
+from oslo_utils import timeutils
 
 from keystoneauth1.exceptions import http as keystone_exception
 from keystoneclient.v3 import client as keystone_client
@@ -43,6 +46,10 @@ from a10_octavia.common import exceptions
 LOG = logging.getLogger(__name__)
 CONF = cfg.CONF
 
+# project id -> (expiry StopWatch, parent project id or None when not found)
+_parent_project_cache = {}
+_parent_project_lock = threading.Lock()
+
 
 def validate_ipv4(address):
     """Validate for IP4 address format"""
@@ -146,14 +153,53 @@ def convert_to_hardware_thunder_conf(hardware_list):
         vthunder_conf.device_name_as_key = True
         hardware_dict[(a10constants.DEVICE_KEY_PREFIX + device_name)] = vthunder_conf
 
-        duplicates = check_duplicate_entries(hardware_dict)
-        if duplicates:
-            raise cfg.ConfigFileValueError('Duplicates found for the following '
-                                           '\'ip_address:partition_name\' entries: {}'
-                                           .format(list(duplicates)))
+    duplicates = check_duplicate_entries(hardware_dict)
+    if duplicates:
+        raise cfg.ConfigFileValueError('Duplicates found for the following '
+                                       '\'ip_address:partition_name\' entries: {}'
+                                       .format(list(duplicates)))
     return hardware_dict
 
 
+class HardwareThunderIndex(object):
+    """Read only lookups of the [hardware_thunder] devices.
+
+    by_project maps project ids and by_device_name maps device names to the
+    device configuration.
+    """
+
+    def __init__(self, devices):
+        self.devices = devices
+        by_project = {}
+        by_device_name = {}
+        if isinstance(devices, dict):
+            for key, device in devices.items():
+                if key.startswith(a10constants.DEVICE_KEY_PREFIX):
+                    by_device_name[device.device_name] = device
+                else:
+                    by_project[key] = device
+        self.by_project = types.MappingProxyType(by_project)
+        self.by_device_name = types.MappingProxyType(by_device_name)
+
+
+_hardware_thunder_index = HardwareThunderIndex({})
+
+
+def get_hardware_thunder_index():
+    """Returns the HardwareThunderIndex of the current [hardware_thunder] devices.
+
+    A new index is built, and swapped in as a whole, when the devices option
+    holds a different dict than the one indexed, e.g. after a config mutate.
+    """
+    global _hardware_thunder_index
+    devices = CONF.hardware_thunder.devices
+    index = _hardware_thunder_index
+    if index.devices is not devices:
+        index = HardwareThunderIndex(devices)
+        _hardware_thunder_index = index
+    return index
+
+
 def get_vip_security_group_name(port_id):
     if port_id:
         return a10constants.VIP_SEC_GROUP_PREFIX + port_id
@@ -162,21 +208,79 @@ def get_vip_security_group_name(port_id):
 
 def get_parent_project_list():
     parent_project_list = []
-    for project_id in CONF.hardware_thunder.devices:
+    for project_id in get_hardware_thunder_index().by_project:
         parent_project_id = get_parent_project(project_id)
         if parent_project_id != 'default':
             parent_project_list.append(parent_project_id)
     return parent_project_list
 
 
-def get_parent_project(project_id):
+def parent_projects_in_use():
+    """Returns True when partitions are selected by the parent project.
+
+    That is with use_parent_partition set, or a [hardware_thunder] device
+    with hierarchical multitenancy enabled.
+    """
+    if CONF.a10_global.use_parent_partition:
+        return True
+    index = get_hardware_thunder_index()
+    return any(device.hierarchical_multitenancy == "enable"
+               for device in list(index.by_project.values()) +
+               list(index.by_device_name.values()))
+
+
+def _get_keystone_client():
     key_session = keystone.KeystoneSession().get_session()
-    key_client = keystone_client.Client(session=key_session)
+    return keystone_client.Client(session=key_session)
+
+
+def _cache_parent_project(project_id, parent_project_id):
+    if parent_project_id is None:
+        ttl = CONF.a10_global.parent_project_negative_cache_ttl
+    else:
+        ttl = CONF.a10_global.parent_project_cache_ttl
+    if ttl <= 0:
+        return
+    expiry = timeutils.StopWatch(duration=ttl).start()
+    with _parent_project_lock:
+        _parent_project_cache[project_id] = (expiry, parent_project_id)
+
+
+def get_parent_project(project_id):
+    with _parent_project_lock:
+        cached = _parent_project_cache.get(project_id)
+    if cached and not cached[0].expired():
+        return cached[1]
+
     try:
-        project = key_client.projects.get(project_id)
-        return project.parent_id
+        parent_project_id = _get_keystone_client().projects.get(project_id).parent_id
     except keystone_exception.NotFound:
-        return None
+        parent_project_id = None
+    _cache_parent_project(project_id, parent_project_id)
+    return parent_project_id
+
+
+def warm_parent_project_cache():
+    """Caches the parent of every Keystone project with a single list call.
+
+    Projects of hardware_thunder devices which Keystone does not list are
+    cached as not found. Failures are logged, lookups then fall back to
+    querying each project on first use.
+    """
+    try:
+        projects = _get_keystone_client().projects.list()
+    except Exception as e:
+        LOG.warning("Failed to warm up the parent project cache: %s", str(e))
+        return
+
+    listed = set()
+    for project in projects:
+        _cache_parent_project(project.id, project.parent_id)
+        listed.add(project.id)
+    for project_id in get_hardware_thunder_index().by_project:
+        if project_id not in listed:
+            _cache_parent_project(project_id, None)
+    LOG.debug("Cached the parent project of %d projects", len(listed))
 
 
 def get_axapi_client(vthunder):
@@ -123,9 +123,7 @@ class A10HealthManager(health_manager.HealthManager):
 
         busy_status = [constants.PENDING_CREATE, constants.PENDING_UPDATE, constants.PENDING_DELETE]
         vthunder_list = self.vthunder_repo.get_compute_vthunders(
-            session, vthunder.compute_id)
-        for thunder in vthunder_list:
-            lb = self.loadbalancer_repo.get(session, id=thunder.loadbalancer_id)
-            if lb and lb.provisioning_status in busy_status:
-                return True
-        return False
+            session, vthunder.compute_id, fields=('loadbalancer_id',))
+        lb_ids = [thunder.loadbalancer_id for thunder in vthunder_list
+                  if thunder.loadbalancer_id]
+        return self.loadbalancer_repo.check_lbs_in_status(session, lb_ids, busy_status)
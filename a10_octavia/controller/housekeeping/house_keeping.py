@@ -13,16 +13,23 @@
 #    under the License.
 
 
+import collections
 from concurrent import futures
 import datetime
+import math
 import multiprocessing
+import threading
 
 from oslo_config import cfg
 from oslo_log import log as logging
+from oslo_utils import timeutils
+from sqlalchemy.orm import exc as db_exceptions
 
 from octavia.db import api as db_api
 from octavia.db import repositories as repo
+from octavia.network import base as network_base
 
+from a10_octavia.common import utils as a10_utils
 from a10_octavia.controller.worker import controller_worker as cw
 from a10_octavia.db import repositories as a10repo
 
@@ -33,16 +40,105 @@ hk_ctx_map = mp_mgr.dict()
 hk_ctx_lock = mp_mgr.Lock()
 
 
+class SpareDemandForecaster(object):
+    """Forecasts how many spare vThunders will be taken in the coming horizon.
+
+    Spares taken by load balancer creates and failovers are counted at every
+    spare check. The demand rate of the last window and the rate of the
+    same time of day on the previous days are projected over the horizon,
+    the higher of the two wins so daily peaks are ready before they start.
+    """
+
+    history_days = 7
+
+    def __init__(self):
+        self.history = collections.deque()
+        self._expected = None
+        self._since = None
+        self.forecast = {'taken_last_check': 0, 'recent_rate': 0.0,
+                         'seasonal_rate': 0.0, 'predicted_demand': 0, 'target': 0}
+
+    def observe(self, available, now=None):
+        """Records the spares taken since the last check.
+
+        :param available: Spares which are ready, busy or booting
+        :returns: Number of spares taken since the last check
+        """
+        now = now or timeutils.utcnow()
+        taken = 0
+        if self._expected is not None:
+            taken = max(0, self._expected - available)
+            self.history.append((now, taken))
+        else:
+            self._since = now
+        self._expected = available
+
+        oldest = now - datetime.timedelta(days=self.history_days, seconds=self._horizon())
+        while self.history and self.history[0][0] < oldest:
+            self.history.popleft()
+        self.forecast['taken_last_check'] = taken
+        return taken
+
+    def expect(self, count):
+        """Accounts for spares the housekeeper booted or deleted itself."""
+        if self._expected is not None:
+            self._expected += count
+
+    @staticmethod
+    def _horizon():
+        return CONF.a10_house_keeping.spare_forecast_horizon
+
+    def _taken_between(self, start, end):
+        return sum(taken for timestamp, taken in self.history if start < timestamp <= end)
+
+    def predict(self, now=None):
+        """Returns the spare pool size covering the forecast demand."""
+        now = now or timeutils.utcnow()
+        window = datetime.timedelta(seconds=CONF.a10_house_keeping.spare_forecast_window)
+        horizon = datetime.timedelta(seconds=self._horizon())
+        recent_rate = self._taken_between(now - window, now) / window.total_seconds()
+
+        seasonal_rates = []
+        for days in range(1, self.history_days + 1):
+            start = now - datetime.timedelta(days=days)
+            if self._since is None or self._since > start:
+                break
+            seasonal_rates.append(
+                self._taken_between(start, start + horizon) / horizon.total_seconds())
+        seasonal_rate = sum(seasonal_rates) / len(seasonal_rates) if seasonal_rates else 0.0
+
+        demand = int(math.ceil(max(recent_rate, seasonal_rate) * horizon.total_seconds()))
+        target = min(max(demand, CONF.a10_house_keeping.spare_pool_min_size),
+                     CONF.a10_house_keeping.spare_pool_max_size)
+        self.forecast.update(recent_rate=recent_rate, seasonal_rate=seasonal_rate,
+                             predicted_demand=demand, target=target)
+        return target
+
+
 class SpareAmphora(object):
     def __init__(self):
         self.vthunder_repo = a10repo.VThunderRepository()
+        self.lb_repo = a10repo.LoadBalancerRepository()
+        self.member_repo = a10repo.MemberRepository()
         self.cw = cw.A10ControllerWorker()
+        self.forecaster = SpareDemandForecaster()
+        self._network_driver = None
+        self._subnet_networks = {}
+
+    @property
+    def network_driver(self):
+        if self._network_driver is None:
+            self._network_driver = a10_utils.get_network_driver()
+        return self._network_driver
 
     def spare_check(self):
         """Checks the DB for the Spare amphora count.
 
         If it's less than the requirement, starts new amphora.
         """
+        if CONF.a10_house_keeping.spare_pool_mode == 'adaptive':
+            return self.adaptive_spare_check()
+
         session = db_api.get_session()
         conf_spare_cnt = CONF.a10_house_keeping.spare_amphora_pool_size
         curr_spare_cnt = self.vthunder_repo.get_spare_vthunder_count(session)
@@ -66,72 +162,299 @@ class SpareAmphora(object):
         else:
             LOG.debug("Current spare vThunder count satisfies the requirement")
 
+    def adaptive_spare_check(self):
+        """Sizes the spare pool to the forecast demand.
+
+        Boots at most spare_boot_rate_limit spares and deletes at most one
+        idle spare per check.
+
+        :returns: The forecast of this check
+        """
+        session = db_api.get_session()
+        ready_spare_cnt = self.vthunder_repo.get_spare_vthunder_count(session)
+        curr_spare_cnt = (ready_spare_cnt +
+                          self.vthunder_repo.get_busy_spare_vthunder_count(session) +
+                          self.vthunder_repo.get_booting_spare_vthunder_count(session))
+        self.forecaster.observe(curr_spare_cnt)
+        target = self.forecaster.predict()
+        self.forecaster.forecast['current'] = curr_spare_cnt
+        LOG.info("Spare vThunder forecast : %s", self.forecaster.forecast)
+
+        diff_count = target - curr_spare_cnt
+        if diff_count > 0:
+            boot_count = min(diff_count, CONF.a10_house_keeping.spare_boot_rate_limit)
+            LOG.info("Initiating creation of %d spare amphora.", boot_count)
+            with futures.ThreadPoolExecutor(max_workers=boot_count) as executor:
+                boots = []
+                for i in range(1, boot_count + 1):
+                    LOG.debug("Starting amphorae number %d ...", i)
+                    boots.append(executor.submit(self.cw.create_amphora))
+            # only spares which booted are expected, a failed boot is not demand
+            booted = 0
+            for boot in boots:
+                try:
+                    boot.result()
+                    booted += 1
+                except Exception as e:
+                    LOG.error("Failed to create spare vThunder: %s", str(e))
+            self.forecaster.expect(booted)
+        elif diff_count < 0 and ready_spare_cnt > 0:
+            spare = self.vthunder_repo.claim_spare_vthunder(session, 'PENDING_DELETE')
+            if spare:
+                LOG.info("Deleting spare vThunder %s above the forecast demand", spare.id)
+                self.forecaster.expect(-1)
+                try:
+                    self.cw.delete_spare_amphora(spare)
+                except Exception as e:
+                    # A spare whose compute is gone stops sending heartbeats,
+                    # the stale vThunder check cleans it up once READY again
+                    LOG.error("Failed to delete spare vThunder %s: %s", spare.id, str(e))
+                    self.vthunder_repo.set_spare_vthunder_status(session, spare.id, 'READY')
+                    self.forecaster.expect(1)
+        else:
+            LOG.debug("Current spare vThunder count satisfies the forecast demand")
+        return dict(self.forecaster.forecast)
+
+    def get_warm_network_ids(self, session, network_count):
+        """Returns the networks used by most VIPs and members of each project.
+
+        :returns: (project_id, network_ids) of each project, the projects
+                  with the most VIPs and members first
+        """
+        usage = collections.defaultdict(collections.Counter)
+        subnet_usage = (self.lb_repo.get_vip_subnet_usage(session) +
+                        self.member_repo.get_member_subnet_usage(session))
+        for project_id, subnet_id, count in subnet_usage:
+            network_id = self._subnet_networks.get(subnet_id)
+            if network_id is None:
+                try:
+                    network_id = self.network_driver.get_subnet(subnet_id).network_id
+                except network_base.SubnetNotFound:
+                    LOG.debug("Subnet %s not found, not warming spares for it", subnet_id)
+                    continue
+                self._subnet_networks[subnet_id] = network_id
+            usage[project_id][network_id] += count
+        projects = sorted(usage, key=lambda project_id: sum(usage[project_id].values()),
+                          reverse=True)
+        return [(project_id, [network_id for network_id, _ in
+                              usage[project_id].most_common(network_count)])
+                for project_id in projects]
+
+    def warm_spare_check(self):
+        """Plugs the networks of one project into a cold READY spare per check.
+
+        The warmed spare is kept for that project only, and projects get
+        their warm spare by decreasing usage. The spare is held BUSY while
+        its networks are plugged and it reloads, so it is not handed out
+        half configured. One cold spare is always kept for the projects
+        without a warm spare.
+
+        :returns: The spare vThunder warmed in this check, or None
+        """
+        network_count = CONF.a10_house_keeping.spare_warm_network_count
+        if not network_count:
+            return None
+
+        session = db_api.get_session()
+        spares = self.vthunder_repo.get_spare_vthunders(session)
+        cold_spares = [spare for spare in spares if spare.project_id is None]
+        if len(cold_spares) < 2:
+            return None
+        warm_projects = set(spare.project_id for spare in spares if spare.project_id)
+
+        for project_id, network_ids in self.get_warm_network_ids(session, network_count):
+            if project_id in warm_projects:
+                continue
+            for spare in cold_spares:
+                spare = self.vthunder_repo.claim_spare_vthunder(
+                    session, 'BUSY', vthunder_id=spare.id)
+                if spare:
+                    break
+            else:
+                return None
+            nics = self.network_driver.get_plugged_networks(spare.compute_id)
+            plugged_ids = set(nic.network_id for nic in nics)
+            self.vthunder_repo.update(session, spare.id, project_id=project_id)
+            LOG.info("Plugging networks %s of project %s into spare vThunder %s",
+                     network_ids, project_id, spare.id)
+            try:
+                self.cw.warm_spare_amphora(spare, network_ids)
+            except Exception as e:
+                LOG.warning("Failed to plug networks into spare vThunder %s due to %s",
+                            spare.id, str(e))
+                self._release_warm_spare(session, spare, plugged_ids)
+            return spare
+        return None
+
+    def _release_warm_spare(self, session, spare, plugged_ids):
+        """Returns a spare which failed to warm to the cold spares.
+
+        A spare still holding networks of the project it was warmed for is
+        deleted instead, so no other project gets it.
+        """
+        try:
+            for nic in self.network_driver.get_plugged_networks(spare.compute_id):
+                if nic.network_id not in plugged_ids:
+                    self.network_driver.unplug_network(spare.compute_id, nic.network_id)
+        except Exception as e:
+            LOG.error("Failed to unplug networks from spare vThunder %s, deleting it: %s",
+                      spare.id, str(e))
+            try:
+                self.cw.delete_spare_amphora(spare)
+            except Exception as e:
+                LOG.error("Failed to delete spare vThunder %s: %s", spare.id, str(e))
+            return
+        self.vthunder_repo.update(session, spare.id, status='READY', project_id=None)
+
+
+class PurgeEngine(object):
+    """Purges expired rows in chunks with a pause between each chunk.
+
+    Ids left over when a cycle runs out of time are kept and purged first
+    on the next cycle, so an interrupted purge resumes where it stopped.
+    """
+
+    def __init__(self, name, get_expired_ids, delete_ids, stop_event=None):
+        """
+        :param name: Resource name used in the progress logs
+        :param get_expired_ids: Callable of a session returning the ids to purge
+        :param delete_ids: Callable of a session and a chunk of ids returning
+                           the number of rows deleted
+        :param stop_event: Event which interrupts the pause between chunks
+        """
+        self.name = name
+        self._get_expired_ids = get_expired_ids
+        self._delete_ids = delete_ids
+        self._stop_event = stop_event or threading.Event()
+        self.pending_ids = []
+        self.stats = {'purged_total': 0, 'chunks_total': 0,
+                      'last_cycle_purged': 0, 'last_cycle_seconds': 0.0,
+                      'pending': 0}
+
+    def purge(self, session, watch=None):
+        """Purges expired ids until none are left or the watch expires.
+
+        :param watch: oslo_utils StopWatch capping the time spent in this cycle
+        :returns: Number of rows purged in this cycle
+        """
+        cycle_watch = timeutils.StopWatch().start()
+        chunk_size = CONF.a10_house_keeping.purge_chunk_size
+        if not self.pending_ids:
+            self.pending_ids = list(self._get_expired_ids(session))
+        else:
+            LOG.info('Resuming purge of %d %s', len(self.pending_ids), self.name)
+
+        purged = 0
+        while self.pending_ids and not self._stop_event.is_set():
+            if watch is not None and watch.expired():
+                LOG.info('Purge of %s reached the cycle time limit, %d left for the next cycle',
+                         self.name, len(self.pending_ids))
+                break
+            # The chunk is dropped even if its delete fails, the next
+            # listing of expired ids picks up what is left of it
+            chunk = self.pending_ids[:chunk_size]
+            del self.pending_ids[:chunk_size]
+            count = self._delete_ids(session, chunk)
+            purged += count
+            self.stats['chunks_total'] += 1
+            LOG.info('Purged %d %s, %d left', count, self.name, len(self.pending_ids))
+            if self.pending_ids:
+                self._stop_event.wait(CONF.a10_house_keeping.purge_chunk_interval)
+
+        self.stats['purged_total'] += purged
+        self.stats['last_cycle_purged'] = purged
+        self.stats['last_cycle_seconds'] = cycle_watch.elapsed()
+        self.stats['pending'] = len(self.pending_ids)
+        return purged
+
 
 class DatabaseCleanup(object):
-    def __init__(self):
+    def __init__(self, stop_event=None):
         self.vthunder_repo = a10repo.VThunderRepository()
         self.lb_repo = a10repo.LoadBalancerRepository()
+        self.amphora_purge = PurgeEngine('vThunders', self._get_expired_amphorae,
+                                         self._delete_amphorae, stop_event)
+        self.lb_purge = PurgeEngine('load balancers', self._get_expired_load_balancers,
+                                    self._delete_load_balancers, stop_event)
 
-    def delete_old_amphorae(self):
-        """Checks the DB for old amphora and deletes them based on its age."""
+    def _get_expired_amphorae(self, session):
         exp_age = datetime.timedelta(
             seconds=CONF.a10_house_keeping.amphora_expiry_age)
+        return self.vthunder_repo.get_all_deleted_expiring(session, exp_age=exp_age)
 
-        session = db_api.get_session()
-        amp_ids = self.vthunder_repo.get_all_deleted_expiring(session,
-                                                              exp_age=exp_age)
-        LOG.info('VThunder ids: %s', amp_ids)
-
-        for amp_id in amp_ids:
-            LOG.info('Attempting to purge db record for VThunder ID: %s',
-                     amp_id)
-            self.vthunder_repo.delete(session, id=amp_id)
-            LOG.info('Purged db record for Amphora ID: %s', amp_id)
+    def _delete_amphorae(self, session, amp_ids):
+        return self.vthunder_repo.delete_batch(session, ids=amp_ids)
 
-    def cleanup_load_balancers(self):
-        """Checks the DB for old load balancers and triggers their removal."""
+    def _get_expired_load_balancers(self, session):
         exp_age = datetime.timedelta(
             seconds=CONF.a10_house_keeping.load_balancer_expiry_age)
+        return self.lb_repo.get_all_deleted_expiring(session, exp_age=exp_age)
 
-        session = db_api.get_session()
-        lb_ids = self.lb_repo.get_all_deleted_expiring(session,
-                                                       exp_age=exp_age)
-        LOG.info('Load balancer ids: %s', lb_ids)
+    def _delete_load_balancers(self, session, lb_ids):
+        # Load balancers keep the ORM delete for its cascade to child rows
+        count = 0
         for lb_id in lb_ids:
-            LOG.info('Attempting to delete load balancer id : %s', lb_id)
-            self.lb_repo.delete(session, id=lb_id)
-            LOG.info('Deleted load balancer id : %s', lb_id)
+            try:
+                self.lb_repo.delete(session, id=lb_id)
+                count += 1
+            except db_exceptions.NoResultFound:
+                # Already purged by another housekeeper
+                LOG.debug('Load balancer %s was already purged', lb_id)
+        return count
+
+    def _cycle_watch(self):
+        return timeutils.StopWatch(
+            duration=CONF.a10_house_keeping.purge_cycle_time_limit).start()
+
+    def delete_old_amphorae(self, watch=None):
+        """Checks the DB for old amphora and deletes them based on its age."""
+        watch = watch or self._cycle_watch()
+        return self.amphora_purge.purge(db_api.get_session(), watch)
+
+    def cleanup_load_balancers(self, watch=None):
+        """Checks the DB for old load balancers and triggers their removal."""
+        watch = watch or self._cycle_watch()
+        return self.lb_purge.purge(db_api.get_session(), watch)
+
+    def cleanup(self):
+        """Runs one cleanup cycle, sharing its time limit between purges."""
+        watch = self._cycle_watch()
+        self.delete_old_amphorae(watch)
+        self.cleanup_load_balancers(watch)
+        LOG.info('DB cleanup cycle finished in %.3f seconds: vThunders %s, '
+                 'load balancers %s', watch.elapsed(), self.amphora_purge.stats,
+                 self.lb_purge.stats)
 
 
 class StatisticsCleanup(object):
     def __init__(self):
-        self.listener_repo = repo.ListenerRepository()
         self.listener_stats_repo = a10repo.ListenerStatisticsRepository()
 
     def delete_listener_stats(self):
+        """Purges the statistics entries of deleted listeners.
 
-        listeners, _ = self.listener_repo.get_all(db_api.get_session())
-        listeners_stats, _ = self.listener_stats_repo.get_all(db_api.get_session())
-
-        listeners_ids = [listener.id for listener in listeners]
-        listeners_stats_ids = [listener_stats.listener_id for listener_stats in listeners_stats]
-
-        for listeners_stats_id in listeners_stats_ids:
-            if listeners_stats_id not in listeners_ids:
-                self.listener_stats_repo.delete_multiple(db_api.get_session(),
-                                                         listener_id=listeners_stats_id)
-                LOG.info('Delete the statictics entry of listener %s', listeners_stats_id)
+        :returns: Number of statistics rows purged
+        """
+        watch = timeutils.StopWatch().start()
+        count = self.listener_stats_repo.delete_orphans(db_api.get_session())
+        LOG.info('Purged %d statistics entries of deleted listeners in %.3f seconds',
+                 count, watch.elapsed())
+        return count
 
 
 class WriteMemory(object):
 
     def __init__(self):
         self.thunder_repo = a10repo.VThunderRepository()
+        self.partition_change_repo = a10repo.PartitionChangeRepository()
         self.cw = cw.A10ControllerWorker()
         self.svc_up_time = datetime.datetime.utcnow()
 
     def perform_memory_writes(self):
-        thunders = self.thunder_repo.get_recently_updated_thunders(db_api.get_session())
+        session = db_api.get_session()
+        change_counts = self.partition_change_repo.get_pending(session)
+        pending_partitions = set(change_counts)
+        thunders = self.thunder_repo.get_thunders_by_partitions(session, pending_partitions)
         ip_partition_list = set()
         write_mem_list = []
         reload_check_list = []
@@ -140,7 +463,9 @@ class WriteMemory(object):
             if (thunder.status != 'DELETED' and
                     thunder.loadbalancer_id is not None):
                 if thunder.last_write_mem is not None:
-                    reload_check_list.append(thunder)
+                    if (thunder.updated_at is not None and
+                            thunder.updated_at >= thunder.last_write_mem):
+                        reload_check_list.append(thunder)
                 elif thunder.updated_at > self.svc_up_time:
                     # For new lb, it didn't have last_write_mem yet, so if
                     #  - it's latest update is after this service starts, then
@@ -152,15 +477,22 @@ class WriteMemory(object):
             if ip_partition not in ip_partition_list:
                 ip_partition_list.add(ip_partition)
                 write_mem_list.append(thunder)
+            pending_partitions.discard((thunder.ip_address, thunder.partition_name))
+
+        # Partitions without thunders left have nothing to write. The others
+        # wait for their master to be ACTIVE again.
+        in_use = self.thunder_repo.get_partitions_in_use(session, pending_partitions)
+        for ip_address, partition_name in pending_partitions - in_use:
+            self.partition_change_repo.delete_unchanged(
+                session, ip_address, partition_name,
+                change_counts[(ip_address, partition_name)])
 
         if reload_check_list:
             LOG.info("Check configuration lost for Thunders : %s", list(reload_check_list))
-            self.cw.perform_reload_check(reload_check_list)
-            LOG.info("Finished conf lost check for {} thunders...".format(len(reload_check_list)))
 
         if write_mem_list:
             LOG.info("Write Memory for Thunders : %s", list(ip_partition_list))
-            self.cw.perform_write_memory(write_mem_list)
+            self.cw.perform_write_memory_pass(reload_check_list, write_mem_list)
             LOG.info("Finished running write memory for {} thunders...".format(len(write_mem_list)))
         else:
             LOG.warning("No thunders found that are recently updated."
@@ -20,6 +20,7 @@ from oslo_messaging.rpc import dispatcher
 
 from octavia.common import rpc
 
+from a10_octavia.common import utils
 from a10_octavia.controller.queue import endpoint
 
 LOG = logging.getLogger(__name__)
@@ -41,6 +42,8 @@ class ConsumerService(cotyledon.Service):
 
     def run(self):
         LOG.info('Starting consumer...')
+        if utils.parent_projects_in_use():
+            utils.warm_parent_project_cache()
         target = messaging.Target(topic=self.topic, server=self.server,
                                   fanout=False)
         self.endpoints = [endpoint.Endpoint(self.ctx_map, self.ctx_lock)]
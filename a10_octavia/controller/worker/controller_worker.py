@@ -12,7 +12,6 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import json
 from sqlalchemy.orm import exc as db_exceptions
 import tenacity
 import time
@@ -22,6 +21,8 @@ from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_utils import excutils
 from taskflow.listeners import logging as tf_logging
+from taskflow import states
+from taskflow.types import notifier
 
 from octavia.common import base_taskflow
 from octavia.common import constants
@@ -31,7 +32,9 @@ from octavia.db import repositories as repo
 
 from a10_octavia.common import a10constants
 from a10_octavia.common import exceptions as a10_ex
+from a10_octavia.common import flavor_cache
 from a10_octavia.common import utils
+from a10_octavia.controller.worker import device_executor
 from a10_octavia.controller.worker.flows import a10_health_monitor_flows
 from a10_octavia.controller.worker.flows import a10_l7policy_flows
 from a10_octavia.controller.worker.flows import a10_l7rule_flows
@@ -40,6 +43,7 @@ from a10_octavia.controller.worker.flows import a10_load_balancer_flows
 from a10_octavia.controller.worker.flows import a10_member_flows
 from a10_octavia.controller.worker.flows import a10_pool_flows
 from a10_octavia.controller.worker.flows import vthunder_flows
+from a10_octavia.db import flow_session as a10_flow_session
 from a10_octavia.db import repositories as a10repo
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -121,10 +125,26 @@ class A10ControllerWorker(base_taskflow.BaseTaskFlowEngine):
         self._flavor_repo = repo.FlavorRepository()
         self._flavor_profile_repo = repo.FlavorProfileRepository()
         self._exclude_result_logging_tasks = ()
+        self._write_mem_executor = device_executor.DeviceExecutor('write memory')
+        self._reload_check_executor = device_executor.DeviceExecutor('reload check')
         self.ctx_map = None
         self.ctx_lock = None
         super(A10ControllerWorker, self).__init__()
 
+    def taskflow_load(self, flow, **kwargs):
+        """Loads flow with a FlowSession in its store, closed when the flow ends."""
+        flow_session = a10_flow_session.FlowSession(flow.name)
+        store = dict(kwargs.pop('store', None) or {})
+        store.setdefault(a10constants.FLOW_SESSION, flow_session)
+
+        def _close_flow_session(state, details):
+            if state in (states.SUCCESS, states.FAILURE, states.REVERTED, states.SUSPENDED):
+                flow_session.close()
+
+        engine = super(A10ControllerWorker, self).taskflow_load(flow, store=store, **kwargs)
+        engine.notifier.register(notifier.Notifier.ANY, _close_flow_session)
+        return engine
+
     def create_amphora(self):
         """Creates an Amphora.
 
@@ -1271,6 +1291,39 @@ class A10ControllerWorker(base_taskflow.BaseTaskFlowEngine):
         finally:
             self._set_vthunder_available(l7rule.project_id, False, ctx_flags, load_balancer)
 
+    def delete_spare_amphora(self, vthunder):
+        """Deletes a spare vThunder and its compute.
+
+        This is used to shrink the spare amphora pool.
+
+        :param vthunder: spare vThunder to delete
+        :returns: None
+        """
+        store = {a10constants.VTHUNDER: vthunder}
+        delete_spare_tf = self.taskflow_load(
+            self._vthunder_flows.get_failover_spare_vthunder_flow(),
+            store=store)
+        with tf_logging.DynamicLoggingListener(delete_spare_tf, log=LOG):
+            delete_spare_tf.run()
+
+    def warm_spare_amphora(self, vthunder, network_ids):
+        """Plugs networks into a spare vThunder ahead of its use.
+
+        The spare is reloaded and its interfaces enabled now, so failover
+        and loadbalancer create skip them for networks already plugged.
+
+        :param vthunder: spare vThunder claimed by the caller
+        :param network_ids: IDs of the networks to plug
+        :returns: None
+        """
+        store = {a10constants.SPARE_VTHUNDER: vthunder,
+                 a10constants.NETWORK_LIST: network_ids}
+        warm_spare_tf = self.taskflow_load(
+            self._vthunder_flows.get_warm_spare_vthunder_flow(),
+            store=store)
+        with tf_logging.DynamicLoggingListener(warm_spare_tf, log=LOG):
+            warm_spare_tf.run()
+
     def failover_amphora(self, vthunder_id):
         """Perform failover operations for an vThunder.
         :param vthunder_id: ID for vThunder to failover
@@ -1351,45 +1404,85 @@ class A10ControllerWorker(base_taskflow.BaseTaskFlowEngine):
     def perform_write_memory(self, thunders):
         """Perform write memory operations for a thunders
 
+        Devices are written concurrently, partitions of a device serially.
+
         :param thunders: group of thunder objects
-        :returns: None
+        :returns: metrics of the write memory cycle
         """
-        store = {a10constants.WRITE_MEM_SHARED_PART: True}
+        return self._write_mem_executor.run(thunders, self._write_memory_thunder)
 
-        for vthunder in thunders:
-            delete_compute = False
-            if vthunder.status == 'DELETED' and vthunder.compute_id is not None:
-                delete_compute = self._vthunder_repo.get_delete_compute_flag(db_apis.get_session(),
-                                                                             vthunder.compute_id)
-            try:
-                write_mem_tf = self.taskflow_load(
-                    self._vthunder_flows.get_write_memory_flow(vthunder, store, delete_compute),
-                    store=store)
-
-                with tf_logging.DynamicLoggingListener(write_mem_tf,
-                                                       log=LOG):
-                    write_mem_tf.run()
-            except Exception:
-                # continue on other thunders (assume exception is logged)
-                pass
+    def _write_memory_thunder(self, vthunder, delete_compute=False):
+        store = {a10constants.WRITE_MEM_SHARED_PART: True}
+        if (not delete_compute and vthunder.status == 'DELETED' and
+                vthunder.compute_id is not None):
+            delete_compute = self._vthunder_repo.get_delete_compute_flag(db_apis.get_session(),
+                                                                         vthunder.compute_id)
+        write_mem_tf = self.taskflow_load(
+            self._vthunder_flows.get_write_memory_flow(vthunder, store, delete_compute),
+            store=store)
+
+        with tf_logging.DynamicLoggingListener(write_mem_tf,
+                                               log=LOG):
+            write_mem_tf.run()
 
     def perform_reload_check(self, thunders):
         """Perform check for thunders see if thunder reload before write memory
 
         :param thunders: group of thunder objects
-        :returns: None
+        :returns: metrics of the reload check cycle
         """
+        return self._reload_check_executor.run(thunders, self._reload_check_thunder)
+
+    def _reload_check_thunder(self, vthunder):
         store = {}
-        for vthunder in thunders:
-            try:
-                reload_check_tf = self.taskflow_load(
-                    self._vthunder_flows.get_reload_check_flow(vthunder, store),
-                    store=store)
-                with tf_logging.DynamicLoggingListener(reload_check_tf, log=LOG):
-                    reload_check_tf.run()
-            except Exception:
-                # continue on other thunders (assume exception is logged)
-                pass
+        reload_check_tf = self.taskflow_load(
+            self._vthunder_flows.get_reload_check_flow(vthunder, store),
+            store=store)
+        with tf_logging.DynamicLoggingListener(reload_check_tf, log=LOG):
+            reload_check_tf.run()
+
+    def perform_write_memory_pass(self, reload_check_thunders, write_mem_thunders):
+        """Perform reload check and write memory with one session per thunder device
+
+        :param reload_check_thunders: thunder objects to check for a reload
+        :param write_mem_thunders: thunder objects to write memory for, one per partition
+        :returns: metrics of the write memory cycle
+        """
+        reload_check_ids = set(thunder.id for thunder in reload_check_thunders)
+        write_mem_ids = set(thunder.id for thunder in write_mem_thunders)
+        thunders = list(write_mem_thunders)
+        thunders.extend(thunder for thunder in reload_check_thunders
+                        if thunder.id not in write_mem_ids)
+        return self._write_mem_executor.run_devices(
+            thunders, lambda device_thunders: self._write_memory_device(
+                device_thunders, reload_check_ids, write_mem_ids))
+
+    def _write_memory_device(self, device_thunders, reload_check_ids, write_mem_ids):
+        reload_check_thunders = []
+        write_mem_thunders = []
+        for vthunder in device_thunders:
+            if vthunder.id in reload_check_ids:
+                reload_check_thunders.append(vthunder)
+            if vthunder.id not in write_mem_ids:
+                continue
+            if (vthunder.status == 'DELETED' and vthunder.compute_id is not None and
+                    self._vthunder_repo.get_delete_compute_flag(db_apis.get_session(),
+                                                                vthunder.compute_id)):
+                # compute is gone, only the DB side of write memory is left
+                self._write_memory_thunder(vthunder, delete_compute=True)
+            else:
+                write_mem_thunders.append(vthunder)
+
+        if not write_mem_thunders and not reload_check_thunders:
+            return
+        store = {}
+        write_mem_tf = self.taskflow_load(
+            self._vthunder_flows.get_device_write_memory_flow(
+                (write_mem_thunders or reload_check_thunders)[0], reload_check_thunders,
+                write_mem_thunders, store),
+            store=store)
+        with tf_logging.DynamicLoggingListener(write_mem_tf, log=LOG):
+            write_mem_tf.run()
 
     def perform_vthunder_stats_update(self, ip):
         """Perform for listener statistics update"""
@@ -1399,14 +1492,15 @@ class A10ControllerWorker(base_taskflow.BaseTaskFlowEngine):
             thunders = self._vthunder_repo.get_all_vthunder_by_address(
                 db_apis.get_session(),
                 ip_address=ip)
-            for vthunder in thunders:
+            if thunders:
+                # one aXAPI session collects the stats of all partitions of the device
                 vthunder_stats_tf = self.taskflow_load(
-                    self._listener_flows.get_listener_stats_flow(vthunder, store),
+                    self._listener_flows.get_device_listener_stats_flow(thunders, store),
                     store=store)
                 with tf_logging.DynamicLoggingListener(vthunder_stats_tf, log=LOG):
                     vthunder_stats_tf.run()
         except Exception:
-            # continue on other thunders (assume exception is logged)
+            # assume exception is logged
             pass
 
     def a10_worker_ctx_init(self, ctx_map, ctx_lock):
@@ -1427,10 +1521,8 @@ class A10ControllerWorker(base_taskflow.BaseTaskFlowEngine):
             flavor_data = utils.get_loadbalancer_flavor(loadbalancer)
             if flavor_data is not None:
                 device_name = flavor_data.get('device-name', None)
-        if device_name is not None and isinstance(CONF.hardware_thunder.devices, dict):
-            for device in CONF.hardware_thunder.devices.values():
-                if device.device_name == device_name:
-                    return True
+        if device_name is not None:
+            return device_name in utils.get_hardware_thunder_index().by_device_name
 
         return False
 
@@ -1494,13 +1586,16 @@ class A10ControllerWorker(base_taskflow.BaseTaskFlowEngine):
         engine.notifier.register('*', flow_notification_handler, kwargs=kwargs)
 
     def _get_flavor_data(self, flavor_id):
+        flavor_data = flavor_cache.flavor_cache.get(flavor_id)
+        if flavor_data is not None:
+            return flavor_data
+
         flavor = self._flavor_repo.get(db_apis.get_session(), id=flavor_id)
         if flavor and flavor.flavor_profile_id:
             flavor_profile = self._flavor_profile_repo.get(
                 db_apis.get_session(),
                 id=flavor.flavor_profile_id)
-            flavor_data = json.loads(flavor_profile.flavor_data)
-            return flavor_data
+            return flavor_cache.flavor_cache.update(flavor_id, flavor_profile.flavor_data)
         return None
 
     def delete_load_balancer_with_housekeeping(self, pending_lb, cascade=True):
@@ -0,0 +1,129 @@
+#    Copyright 2021, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+from concurrent import futures
+import threading
+
+from oslo_config import cfg
+from oslo_log import log as logging
+from oslo_utils import timeutils
+
+CONF = cfg.CONF
+LOG = logging.getLogger(__name__)
+
+
+class DeviceExecutor(object):
+    """Runs a job for each thunder partition, one device per worker thread.
+
+    Partitions are grouped by device ip address. Different devices run
+    concurrently while the partitions of one device run serially, or at most
+    ``write_mem_partitions_per_device`` at a time, so a device never gets more
+    concurrent aXAPI sessions than it is configured for.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self.stats = {'devices': 0, 'partitions': 0, 'pending': 0,
+                      'failed': 0, 'last_cycle_seconds': 0.0}
+
+    @staticmethod
+    def group_by_device(thunders):
+        devices = collections.OrderedDict()
+        for thunder in thunders:
+            devices.setdefault(thunder.ip_address, []).append(thunder)
+        return devices
+
+    def _run_partition(self, job, thunder):
+        try:
+            job(thunder)
+        except Exception as e:
+            LOG.warning('%s failed for thunder %s:%s due to %s', self.name,
+                        thunder.ip_address, thunder.partition_name, str(e))
+            with self._lock:
+                self.stats['failed'] += 1
+        finally:
+            with self._lock:
+                self.stats['pending'] -= 1
+
+    def _run_device(self, job, thunders):
+        partition_limit = CONF.a10_house_keeping.write_mem_partitions_per_device
+        if partition_limit <= 1 or len(thunders) == 1:
+            for thunder in thunders:
+                self._run_partition(job, thunder)
+            return
+
+        with futures.ThreadPoolExecutor(
+                max_workers=min(partition_limit, len(thunders))) as executor:
+            for thunder in thunders:
+                executor.submit(self._run_partition, job, thunder)
+
+    def _run_whole_device(self, job, thunders):
+        try:
+            job(thunders)
+        except Exception as e:
+            LOG.warning('%s failed for thunder %s due to %s', self.name,
+                        thunders[0].ip_address, str(e))
+            with self._lock:
+                self.stats['failed'] += len(thunders)
+        finally:
+            with self._lock:
+                self.stats['pending'] -= len(thunders)
+
+    def run(self, thunders, job):
+        """Runs job for every thunder and records the cycle metrics.
+
+        :param thunders: Thunders to run the job for, one per partition
+        :param job: Callable of a thunder, exceptions it raises are logged
+        :returns: Metrics of the cycle
+        """
+        return self._run_cycle(thunders, self._run_device, job)
+
+    def run_devices(self, thunders, job):
+        """Runs job once for every device and records the cycle metrics.
+
+        :param thunders: Thunders to run the job for, one per partition
+        :param job: Callable of the list of thunders of one device,
+                    exceptions it raises are logged
+        :returns: Metrics of the cycle
+        """
+        return self._run_cycle(thunders, self._run_whole_device, job)
+
+    def _run_cycle(self, thunders, run_device, job):
+        watch = timeutils.StopWatch().start()
+        devices = self.group_by_device(thunders)
+        with self._lock:
+            self.stats.update(devices=len(devices), partitions=len(thunders),
+                              pending=len(thunders), failed=0)
+
+        if devices:
+            device_threads = CONF.a10_house_keeping.write_mem_device_threads
+            with futures.ThreadPoolExecutor(
+                    max_workers=min(device_threads, len(devices))) as executor:
+                for device_thunders in devices.values():
+                    executor.submit(run_device, job, device_thunders)
+
+        self.stats['last_cycle_seconds'] = watch.elapsed()
+        LOG.info('Finished %s for %d partitions on %d devices in %.2f seconds, '
+                 '%d failed', self.name, self.stats['partitions'],
+                 self.stats['devices'], self.stats['last_cycle_seconds'],
+                 self.stats['failed'])
+        if self.stats['last_cycle_seconds'] > CONF.a10_house_keeping.write_mem_interval:
+            LOG.warning('%s took %.2f seconds which is longer than the write memory '
+                        'interval of %d seconds. Consider raising '
+                        'write_mem_device_threads', self.name,
+                        self.stats['last_cycle_seconds'],
+                        CONF.a10_house_keeping.write_mem_interval)
+        return dict(self.stats)
@@ -435,26 +435,17 @@ class ListenerFlows(object):
             requires=[a10constants.CERT_DATA, a10constants.VTHUNDER]))
         return update_ssl_cert_flow
 
-    def get_listener_stats_flow(self, vthunder, store):
-        """Perform Listener Statistics update """
+    def get_device_listener_stats_flow(self, vthunders, store):
+        """Perform Listener Statistics update of all vThunders of a device"""
 
         sf_name = 'a10-health-monitor' + '-' + a10constants.UPDATE_LISTENER_STATS_FLOW
 
         listener_stats_flow = linear_flow.Flow(sf_name)
-        vthunder_store = {}
-        vthunder_store[vthunder] = vthunder
-        listener_stats_flow.add(vthunder_tasks.GetListenersStats(
-            name='{flow}-{id}'.format(
-                id=vthunder.vthunder_id,
-                flow='GetListenersStats'),
-            requires=(a10constants.VTHUNDER),
-            rebind={a10constants.VTHUNDER: vthunder},
+        listener_stats_flow.add(vthunder_tasks.GetDeviceListenersStats(
+            requires=a10constants.VTHUNDER_LIST,
             provides=a10constants.LISTENER_STATS))
         listener_stats_flow.add(a10_database_tasks.UpdateListenersStats(
-            name='{flow}-{id}'.format(
-                id=vthunder.vthunder_id,
-                flow='UpdateListenersStats'),
             requires=a10constants.LISTENER_STATS))
 
-        store.update(vthunder_store)
+        store[a10constants.VTHUNDER_LIST] = vthunders
         return listener_stats_flow
@@ -295,19 +295,15 @@ class LoadBalancerFlows(object):
             delete_LB_flow.add(vthunder_tasks.AmphoraePostNetworkUnplug(
                 name=a10constants.AMPHORA_POST_NETWORK_UNPLUG,
                 requires=(constants.LOADBALANCER, constants.ADDED_PORTS, a10constants.VTHUNDER)))
-            delete_LB_flow.add(
-                vthunder_tasks.VThunderComputeConnectivityWait(
-                    name=a10constants.VTHUNDER_CONNECTIVITY_WAIT,
-                    requires=(a10constants.VTHUNDER, constants.AMPHORA,
-                              a10constants.MASTER_AMPHORA_STATUS)))
             if lb.topology == "ACTIVE_STANDBY":
                 delete_LB_flow.add(
                     vthunder_tasks.VThunderComputeConnectivityWait(
-                        name=a10constants.BACKUP_CONNECTIVITY_WAIT,
-                        rebind={a10constants.VTHUNDER: a10constants.BACKUP_VTHUNDER,
-                                a10constants.MASTER_AMPHORA_STATUS:
+                        name=a10constants.VTHUNDER_CONNECTIVITY_WAIT,
+                        rebind={a10constants.PEER_VTHUNDER: a10constants.BACKUP_VTHUNDER,
+                                a10constants.PEER_AMPHORA_STATUS:
                                 a10constants.BACKUP_AMPHORA_STATUS},
-                        requires=(constants.AMPHORA)))
+                        requires=(a10constants.VTHUNDER, constants.AMPHORA,
+                                  a10constants.MASTER_AMPHORA_STATUS)))
                 delete_LB_flow.add(vthunder_tasks.VCSSyncWait(
                     name="vip-unplug-wait-vcs-ready",
                     requires=(a10constants.VTHUNDER,
@@ -317,6 +313,12 @@ class LoadBalancerFlows(object):
                     name=a10constants.GET_VTHUNDER_MASTER,
                     requires=a10constants.VTHUNDER,
                     provides=a10constants.VTHUNDER))
+            else:
+                delete_LB_flow.add(
+                    vthunder_tasks.VThunderComputeConnectivityWait(
+                        name=a10constants.VTHUNDER_CONNECTIVITY_WAIT,
+                        requires=(a10constants.VTHUNDER, constants.AMPHORA,
+                                  a10constants.MASTER_AMPHORA_STATUS)))
         delete_LB_flow.add(a10_network_tasks.GetLBResourceSubnet(
             rebind={a10constants.LB_RESOURCE: constants.LOADBALANCER},
             provides=constants.SUBNET))
@@ -455,10 +457,6 @@ class LoadBalancerFlows(object):
                 name=a10constants.AMPHORAE_POST_VIP_PLUG,
                 requires=(constants.LOADBALANCER, a10constants.VTHUNDER,
                           constants.ADDED_PORTS)))
-            new_LB_net_subflow.add(
-                vthunder_tasks.VThunderComputeConnectivityWait(
-                    name=a10constants.VTHUNDER_CONNECTIVITY_WAIT,
-                    requires=(a10constants.VTHUNDER, constants.AMPHORA)))
             if topology == constants.TOPOLOGY_ACTIVE_STANDBY:
                 new_LB_net_subflow.add(
                     a10_database_tasks.GetBackupVThunderByLoadBalancer(
@@ -467,10 +465,9 @@ class LoadBalancerFlows(object):
                         provides=a10constants.BACKUP_VTHUNDER))
                 new_LB_net_subflow.add(
                     vthunder_tasks.VThunderComputeConnectivityWait(
-                        name=a10constants.BACKUP_CONNECTIVITY_WAIT,
-                        rebind={
-                            a10constants.VTHUNDER: a10constants.BACKUP_VTHUNDER},
-                        requires=constants.AMPHORA))
+                        name=a10constants.VTHUNDER_CONNECTIVITY_WAIT,
+                        rebind={a10constants.PEER_VTHUNDER: a10constants.BACKUP_VTHUNDER},
+                        requires=(a10constants.VTHUNDER, constants.AMPHORA)))
                 new_LB_net_subflow.add(vthunder_tasks.VCSSyncWait(
                     name="wait-vcs-ready-after-reload",
                     requires=a10constants.VTHUNDER))
@@ -478,6 +475,11 @@ class LoadBalancerFlows(object):
                     name=a10constants.GET_VTHUNDER_MASTER,
                     requires=a10constants.VTHUNDER,
                     provides=a10constants.VTHUNDER))
+            else:
+                new_LB_net_subflow.add(
+                    vthunder_tasks.VThunderComputeConnectivityWait(
+                        name=a10constants.VTHUNDER_CONNECTIVITY_WAIT,
+                        requires=(a10constants.VTHUNDER, constants.AMPHORA)))
             new_LB_net_subflow.add(vthunder_tasks.GetValidIPv6Address(
                 name=a10constants.GET_MASTER_IPV6_ADDRESS,
                 requires=(constants.LOADBALANCER, a10constants.VTHUNDER,
@@ -85,9 +85,6 @@ class MemberFlows(object):
                     constants.LOADBALANCER,
                     constants.ADDED_PORTS,
                     a10constants.VTHUNDER)))
-        create_member_flow.add(vthunder_tasks.VThunderComputeConnectivityWait(
-            name=a10constants.VTHUNDER_CONNECTIVITY_WAIT,
-            requires=(a10constants.VTHUNDER, constants.AMPHORA)))
         if topology == constants.TOPOLOGY_ACTIVE_STANDBY:
             create_member_flow.add(
                 a10_database_tasks.GetBackupVThunderByLoadBalancer(
@@ -95,9 +92,9 @@ class MemberFlows(object):
                     requires=(constants.LOADBALANCER, a10constants.VTHUNDER),
                     provides=a10constants.BACKUP_VTHUNDER))
             create_member_flow.add(vthunder_tasks.VThunderComputeConnectivityWait(
-                name="backup_compute_conn_wait_before_probe_device",
-                requires=constants.AMPHORA,
-                rebind={a10constants.VTHUNDER: a10constants.BACKUP_VTHUNDER}))
+                name=a10constants.VTHUNDER_CONNECTIVITY_WAIT,
+                requires=(a10constants.VTHUNDER, constants.AMPHORA),
+                rebind={a10constants.PEER_VTHUNDER: a10constants.BACKUP_VTHUNDER}))
             create_member_flow.add(vthunder_tasks.VCSSyncWait(
                 name="backup-plug-wait-vcs-ready",
                 requires=a10constants.VTHUNDER))
@@ -105,6 +102,10 @@ class MemberFlows(object):
                 name=a10constants.GET_MASTER_VTHUNDER,
                 requires=a10constants.VTHUNDER,
                 provides=a10constants.VTHUNDER))
+        else:
+            create_member_flow.add(vthunder_tasks.VThunderComputeConnectivityWait(
+                name=a10constants.VTHUNDER_CONNECTIVITY_WAIT,
+                requires=(a10constants.VTHUNDER, constants.AMPHORA)))
         create_member_flow.add(a10_network_tasks.GetLBResourceSubnet(
             name=a10constants.GET_LB_RESOURCE_SUBNET,
             rebind={a10constants.LB_RESOURCE: constants.MEMBER},
@@ -280,9 +281,6 @@ class MemberFlows(object):
                     constants.LOADBALANCER,
                     constants.ADDED_PORTS,
                     a10constants.VTHUNDER)))
-        delete_member_flow.add(vthunder_tasks.VThunderComputeConnectivityWait(
-            name=a10constants.VTHUNDER_CONNECTIVITY_WAIT,
-            requires=(a10constants.VTHUNDER, constants.AMPHORA)))
         if topology == constants.TOPOLOGY_ACTIVE_STANDBY:
             delete_member_flow.add(
                 a10_database_tasks.GetBackupVThunderByLoadBalancer(
@@ -291,9 +289,9 @@ class MemberFlows(object):
                     provides=a10constants.BACKUP_VTHUNDER))
             delete_member_flow.add(
                 vthunder_tasks.VThunderComputeConnectivityWait(
-                    name=a10constants.BACKUP_CONNECTIVITY_WAIT + "-before-unplug",
-                    requires=constants.AMPHORA,
-                    rebind={a10constants.VTHUNDER: a10constants.BACKUP_VTHUNDER}))
+                    name=a10constants.VTHUNDER_CONNECTIVITY_WAIT,
+                    requires=(a10constants.VTHUNDER, constants.AMPHORA),
+                    rebind={a10constants.PEER_VTHUNDER: a10constants.BACKUP_VTHUNDER}))
             delete_member_flow.add(vthunder_tasks.VCSSyncWait(
                 name='member-unplug-' + a10constants.VCS_SYNC_WAIT,
                 requires=a10constants.VTHUNDER))
@@ -301,6 +299,10 @@ class MemberFlows(object):
                 name=a10constants.GET_VTHUNDER_MASTER,
                 requires=a10constants.VTHUNDER,
                 provides=a10constants.VTHUNDER))
+        else:
+            delete_member_flow.add(vthunder_tasks.VThunderComputeConnectivityWait(
+                name=a10constants.VTHUNDER_CONNECTIVITY_WAIT,
+                requires=(a10constants.VTHUNDER, constants.AMPHORA)))
         delete_member_flow.add(vthunder_tasks.GetValidIPv6Address(
             name=a10constants.GET_IPV6_ADDRESS,
             requires=(constants.LOADBALANCER, a10constants.VTHUNDER,
@@ -1105,6 +1107,9 @@ class MemberFlows(object):
                 batch_update_members_flow.add(a10_network_tasks.ValidateSubnet(
                     name='validate-subnet' + m.id,
                     inject={constants.MEMBER: m}))
+        batch_update_members_flow.add(
+            self.get_batch_reserve_subnet_addresses_task(new_members))
+        for m in new_members:
             batch_update_members_flow.add(a10_database_tasks.CountMembersWithIP(
                 name='count-member-with-ip-' + m.id,
                 inject={constants.MEMBER: m},
@@ -1361,9 +1366,6 @@ class MemberFlows(object):
                     constants.LOADBALANCER,
                     constants.ADDED_PORTS,
                     a10constants.VTHUNDER)))
-        batch_update_members_flow.add(vthunder_tasks.VThunderComputeConnectivityWait(
-            name=a10constants.VTHUNDER_CONNECTIVITY_WAIT,
-            requires=(a10constants.VTHUNDER, constants.AMPHORA)))
         if topology == constants.TOPOLOGY_ACTIVE_STANDBY:
             batch_update_members_flow.add(
                 a10_database_tasks.GetBackupVThunderByLoadBalancer(
@@ -1371,9 +1373,9 @@ class MemberFlows(object):
                     requires=(constants.LOADBALANCER, a10constants.VTHUNDER),
                     provides=a10constants.BACKUP_VTHUNDER))
             batch_update_members_flow.add(vthunder_tasks.VThunderComputeConnectivityWait(
-                name="backup_compute_conn_wait_before_probe_device",
-                requires=constants.AMPHORA,
-                rebind={a10constants.VTHUNDER: a10constants.BACKUP_VTHUNDER}))
+                name=a10constants.VTHUNDER_CONNECTIVITY_WAIT,
+                requires=(a10constants.VTHUNDER, constants.AMPHORA),
+                rebind={a10constants.PEER_VTHUNDER: a10constants.BACKUP_VTHUNDER}))
             batch_update_members_flow.add(vthunder_tasks.VCSSyncWait(
                 name="backup-plug-wait-vcs-ready",
                 requires=a10constants.VTHUNDER))
@@ -1381,6 +1383,10 @@ class MemberFlows(object):
                 name=a10constants.GET_MASTER_VTHUNDER,
                 requires=a10constants.VTHUNDER,
                 provides=a10constants.VTHUNDER))
+        else:
+            batch_update_members_flow.add(vthunder_tasks.VThunderComputeConnectivityWait(
+                name=a10constants.VTHUNDER_CONNECTIVITY_WAIT,
+                requires=(a10constants.VTHUNDER, constants.AMPHORA)))
         batch_update_members_flow.add(vthunder_tasks.GetValidIPv6Address(
             name=a10constants.GET_IPV6_ADDRESS,
             requires=(constants.LOADBALANCER, a10constants.VTHUNDER,
@@ -1416,6 +1422,8 @@ class MemberFlows(object):
             if pool_members:
                 batch_update_members_flow.add(
                     self.get_handle_member_vrid_internal_subflow(pool_members))
+        batch_update_members_flow.add(
+            self.get_batch_reserve_subnet_addresses_task(new_members))
         for m in new_members:
             batch_update_members_flow.add(self.get_batch_update_member_snat_pool_subflow(m))
 
@@ -1429,6 +1437,13 @@ class MemberFlows(object):
             requires=a10constants.VTHUNDER))
         return batch_update_members_flow
 
+    def get_batch_reserve_subnet_addresses_task(self, members):
+        return a10_network_tasks.ReserveSubnetAddressForMembers(
+            name='reserve-subnet-address-for-members',
+            inject={constants.MEMBERS: members},
+            requires=a10constants.NAT_FLAVOR,
+            provides=a10constants.SUBNET_PORTS)
+
     def get_batch_update_member_snat_pool_subflow(self, member):
         batch_update_member_snat_subflow = linear_flow.Flow(
             a10constants.CREATE_MEMBER_SNAT_POOL_SUBFLOW)
@@ -1440,7 +1455,8 @@ class MemberFlows(object):
         batch_update_member_snat_subflow.add(a10_network_tasks.ReserveSubnetAddressForMember(
             name='reserve-subnet-address-for-member' + member.id,
             inject={constants.MEMBER: member},
-            requires=[a10constants.NAT_FLAVOR, a10constants.NAT_POOL],
+            requires=[a10constants.NAT_FLAVOR, a10constants.NAT_POOL,
+                      a10constants.SUBNET_PORTS],
             provides=a10constants.SUBNET_PORT))
         batch_update_member_snat_subflow.add(a10_database_tasks.UpdateNatPoolDB(
             name='update-nat-pool-DB-' + member.id,
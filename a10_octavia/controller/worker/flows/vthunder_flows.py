@@ -286,7 +286,7 @@ class VThunderFlows(object):
         # if no compute, use spare vThunder and prepare network for spare vThunder
         vthunder_for_amphora_subflow.add(a10_database_tasks.GetSpareComputeForProject(
             name=sf_name + '-' + a10constants.GET_SPARE_COMPUTE_FOR_PROJECT,
-            requires=constants.COMPUTE_ID,
+            requires=(constants.COMPUTE_ID, constants.LOADBALANCER),
             provides=(constants.COMPUTE_ID, a10constants.SPARE_VTHUNDER)))
         vthunder_for_amphora_subflow.add(a10_network_tasks.PlugVipNetworkOnSpare(
             name=sf_name + '-' + a10constants.PLUG_VIP_NETWORK_ON_SPARE,
@@ -462,11 +462,8 @@ class VThunderFlows(object):
         # Make sure devices are ready
         vrrp_subflow.add(vthunder_tasks.VThunderComputeConnectivityWait(
             name=sf_name + '-' + a10constants.WAIT_FOR_MASTER_SYNC + '-for-thunder',
+            rebind={a10constants.PEER_VTHUNDER: a10constants.BACKUP_VTHUNDER},
             requires=(a10constants.VTHUNDER, constants.AMPHORA)))
-        vrrp_subflow.add(vthunder_tasks.VThunderComputeConnectivityWait(
-            name=sf_name + '-' + a10constants.WAIT_FOR_BACKUP_SYNC + '-for-thunder',
-            rebind={a10constants.VTHUNDER: a10constants.BACKUP_VTHUNDER},
-            requires=(constants.AMPHORA)))
         # VRRP Configuration
         vrrp_subflow.add(a10_database_tasks.AddProjectSetIdDB(
             name=sf_name + '-' + a10constants.ADD_VRRP_SET_ID_INDB,
@@ -604,6 +601,50 @@ class VThunderFlows(object):
         store.update(vthunder_store)
         return write_memory_flow
 
+    def get_device_write_memory_flow(self, vthunder, reload_check_thunders,
+                                     write_mem_thunders, store):
+        """Perform reload check and write memory for all partitions of a thunder device"""
+        sf_name = 'a10-house-keeper' + '-' + a10constants.WRITE_MEMORY_DEVICE_FLOW
+
+        write_memory_flow = linear_flow.Flow(sf_name)
+        write_memory_flow.add(a10_database_tasks.GetActiveLoadBalancersByThunders(
+            name='{flow}-{ip}'.format(
+                ip=vthunder.ip_address,
+                flow='GetActiveLoadBalancersByThunders'),
+            requires=a10constants.VTHUNDER_LIST,
+            provides=a10constants.LOADBALANCERS_MAP))
+        write_memory_flow.add(a10_database_tasks.GetPartitionChangeCounts(
+            name='{flow}-{ip}'.format(
+                ip=vthunder.ip_address,
+                flow='GetPartitionChangeCounts'),
+            requires=(a10constants.VTHUNDER, a10constants.WRITE_MEM_THUNDERS),
+            provides=a10constants.PARTITION_CHANGE_COUNTS))
+        write_memory_flow.add(vthunder_tasks.WriteMemoryDeviceHouseKeeper(
+            name='{flow}-{ip}'.format(
+                ip=vthunder.ip_address,
+                flow='WriteMemoryDeviceHouseKeeper'),
+            requires=(a10constants.VTHUNDER, a10constants.RELOAD_CHECK_THUNDERS,
+                      a10constants.WRITE_MEM_THUNDERS, a10constants.LOADBALANCERS_MAP,
+                      a10constants.WRITE_MEM_SHARED_PART),
+            provides=a10constants.WRITE_MEM_PARTITIONS))
+        write_memory_flow.add(a10_database_tasks.SetThunderPartitionsLastWriteMem(
+            name='{flow}-{ip}'.format(
+                ip=vthunder.ip_address,
+                flow='SetThunderPartitionsLastWriteMem'),
+            requires=(a10constants.VTHUNDER, a10constants.WRITE_MEM_PARTITIONS,
+                      a10constants.PARTITION_CHANGE_COUNTS)))
+
+        thunders = list(write_mem_thunders)
+        thunder_ids = set(thunder.id for thunder in thunders)
+        thunders.extend(thunder for thunder in reload_check_thunders
+                        if thunder.id not in thunder_ids)
+        store.update({a10constants.VTHUNDER: vthunder,
+                      a10constants.VTHUNDER_LIST: thunders,
+                      a10constants.RELOAD_CHECK_THUNDERS: reload_check_thunders,
+                      a10constants.WRITE_MEM_THUNDERS: write_mem_thunders,
+                      a10constants.WRITE_MEM_SHARED_PART: True})
+        return write_memory_flow
+
     def get_reload_check_flow(self, vthunder, store):
         """Perform write memory for thunder """
         sf_name = 'a10-house-keeper' + '-' + a10constants.RELOAD_CHECK_THUNDER_FLOW
@@ -646,6 +687,18 @@ class VThunderFlows(object):
 
         return failover_flow
 
+    def get_warm_spare_vthunder_flow(self):
+        """Plug the networks into a spare vthunder ahead of failover"""
+        sf_name = a10constants.WARM_SPARE_VTHUNDER_FLOW
+        warm_spare_flow = linear_flow.Flow(sf_name)
+        warm_spare_flow.add(self._get_failover_use_spare_amphora_subflow(sf_name))
+        warm_spare_flow.add(a10_database_tasks.MarkVThunderStatusInDB(
+            name=sf_name + '-' + a10constants.MARK_SPARE_VTHUNDER_READY_IN_DB,
+            rebind={a10constants.VTHUNDER: a10constants.SPARE_VTHUNDER},
+            inject={"status": a10constants.READY}))
+
+        return warm_spare_flow
+
     def _get_failover_use_spare_amphora_subflow(self, prefix):
         """Flow to get spare amphora for failvoer"""
         sf_name = 'failover_get_spare_amphora'
@@ -728,6 +781,7 @@ class VThunderFlows(object):
 
         check_spare = a10_database_tasks.TryGetSpareCompute(
             name=sf_name + '-' + 'check-spare-exist',
+            requires=a10constants.VTHUNDER,
             provides=(a10constants.SPARE_VTHUNDER))
         get_spare_amp = self._get_failover_use_spare_amphora_subflow(sf_name)
         create_amp = self._get_failover_create_amphora_subflow(sf_name)
@@ -0,0 +1,83 @@
+#    Copyright 2021, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+
+from oslo_config import cfg
+from oslo_log import log as logging
+from oslo_utils import timeutils
+
+CONF = cfg.CONF
+LOG = logging.getLogger(__name__)
+
+# Entries not written for this long are dropped, so deleted listeners don't
+# pile up. An idle listener dropped this way is written once more.
+STALE_ENTRY_SECONDS = 3600
+
+
+def _key(stats):
+    # replace_bulk stores a missing amphora_id as the listener_id
+    return (stats.listener_id, stats.amphora_id or stats.listener_id)
+
+
+class ListenerStatsTracker(object):
+    """Last written statistics counters by listener and amphora.
+
+    Used to leave out the statistics of listeners whose counters did not
+    change since they were last written, or which were written less than
+    stats_min_write_interval seconds ago.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (listener_id, amphora_id) -> (StopWatch since write, counters)
+        self._written = {}
+        self._sweep = timeutils.StopWatch(duration=STALE_ENTRY_SECONDS).start()
+
+    def clear(self):
+        with self._lock:
+            self._written.clear()
+
+    def get_changed(self, listener_stats):
+        """Returns the listener stats which need to be written."""
+        min_interval = CONF.a10_health_manager.stats_min_write_interval
+        changed = []
+        with self._lock:
+            self._drop_stale()
+            for stats in listener_stats:
+                entry = self._written.get(_key(stats))
+                if entry and (entry[1] == stats.get_stats() or
+                              entry[0].elapsed() < min_interval):
+                    continue
+                changed.append(stats)
+        LOG.debug("%d of %d listener stats changed", len(changed), len(listener_stats))
+        return changed
+
+    def record(self, listener_stats):
+        """Remembers the counters of listener stats which were written."""
+        with self._lock:
+            for stats in listener_stats:
+                self._written[_key(stats)] = (timeutils.StopWatch().start(),
+                                              stats.get_stats())
+
+    def _drop_stale(self):
+        if not self._sweep.expired():
+            return
+        for key, entry in list(self._written.items()):
+            if entry[0].elapsed() > STALE_ENTRY_SECONDS:
+                del self._written[key]
+        self._sweep.restart()
+
+
+listener_stats_tracker = ListenerStatsTracker()
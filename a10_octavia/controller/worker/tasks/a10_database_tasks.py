@@ -21,6 +21,7 @@ from sqlalchemy.orm.exc import NoResultFound
 from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_utils import uuidutils
+from stevedore import named as stevedore_named
 from taskflow import task
 from taskflow.types import failure
 
@@ -29,18 +30,33 @@ from octavia.common import exceptions as octavia_exceptions
 from octavia.controller.worker import task_utils as task_utilities
 from octavia.db import api as db_apis
 from octavia.db import repositories as repo
-from octavia.statistics import stats_base
 from octavia_lib.common import constants as lib_consts
 
 from a10_octavia.common import a10constants
 from a10_octavia.common import exceptions
+from a10_octavia.common import flavor_cache
 from a10_octavia.common import utils
+from a10_octavia.controller.worker import stats_tracker
 from a10_octavia.controller.worker.tasks import utils as a10_task_utils
+from a10_octavia.db import flow_session as a10_flow_session
 from a10_octavia.db import repositories as a10_repo
 
 CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
 
+STATS_DB_DRIVER = 'stats_db'
+_STATS_HANDLERS = {}
+
+
+def _get_stats_handlers(names):
+    if names not in _STATS_HANDLERS:
+        _STATS_HANDLERS[names] = stevedore_named.NamedExtensionManager(
+            namespace='octavia.statistics.drivers',
+            names=list(names),
+            invoke_on_load=True,
+            propagate_map_exceptions=False)
+    return _STATS_HANDLERS[names]
+
 
 class BaseDatabaseTask(task.Task):
     """Base task to load drivers common to the tasks."""
@@ -54,10 +70,12 @@ class BaseDatabaseTask(task.Task):
         self.loadbalancer_repo = a10_repo.LoadBalancerRepository()
         self.vip_repo = repo.VipRepository()
         self.listener_repo = a10_repo.ListenerRepository()
+        self.listener_stats_repo = a10_repo.ListenerStatisticsRepository()
         self.flavor_repo = repo.FlavorRepository()
         self.flavor_profile_repo = repo.FlavorProfileRepository()
         self.nat_pool_repo = a10_repo.NatPoolRepository()
         self.vrrp_set_repo = a10_repo.VrrpSetRepository()
+        self.partition_change_repo = a10_repo.PartitionChangeRepository()
         self.pool_repo = a10_repo.PoolRepository()
         self.task_utils = task_utilities.TaskUtils()
         super(BaseDatabaseTask, self).__init__(**kwargs)
@@ -142,17 +160,12 @@ class CheckExistingThunderToProjectMappedEntries(BaseDatabaseTask):
         hierarchical_mt = vthunder_config.hierarchical_multitenancy
         if hierarchical_mt == 'enable' and CONF.a10_global.use_parent_partition:
             return
-        vthunder_ids = self.vthunder_repo.get_vthunders_by_ip_address(
+        vthunders = self.vthunder_repo.get_vthunders_by_ip_address(
             db_apis.get_session(),
-            ip_address=vthunder_config.ip_address)
-
-        for vthunder_id in vthunder_ids:
-            vthunder = self.vthunder_repo.get(
-                db_apis.get_session(),
-                id=vthunder_id)
-            if vthunder is None:
-                return
+            ip_address=vthunder_config.ip_address,
+            fields=('ip_address', 'partition_name', 'project_id'))
 
+        for vthunder in vthunders:
             existing_ip_addr_partition = '{}:{}'.format(
                 vthunder.ip_address, vthunder.partition_name)
             config_ip_addr_partition = '{}:{}'.format(
@@ -245,7 +258,7 @@ class MapLoadbalancerToAmphora(BaseDatabaseTask):
                     return None
 
             vthunder = self.vthunder_repo.get_spare_vthunder(
-                db_apis.get_session())
+                db_apis.get_session(), loadbalancer.project_id)
             if vthunder is None:
                 LOG.debug("No Amphora available for load balancer with id %s",
                           loadbalancer.id)
@@ -464,12 +477,14 @@ class UpdateVRIDForLoadbalancerResource(BaseDatabaseTask):
                     raise e
 
     def revert(self, *args, **kwargs):
-        for vrid in self.vrid_created:
-            try:
-                self.vrid_repo.delete(db_apis.get_session(), id=vrid.id)
-            except Exception as e:
-                LOG.error("Failed to update VRID DB entry %s due to %s",
-                          str(vrid.vrid_floating_ip), str(e))
+        if not self.vrid_created:
+            return
+        try:
+            self.vrid_repo.delete_batch(db_apis.get_session(),
+                                        ids=[vrid.id for vrid in self.vrid_created])
+        except Exception as e:
+            LOG.error("Failed to update VRID DB entries %s due to %s",
+                      [str(vrid.vrid_floating_ip) for vrid in self.vrid_created], str(e))
 
 
 class GetLoadbalancersInProjectBySubnet(BaseDatabaseTask):
@@ -734,25 +749,15 @@ class GetChildProjectsOfParentPartition(BaseDatabaseTask):
 
 class GetFlavorData(BaseDatabaseTask):
 
-    def _format_keys(self, flavor_data):
-        if isinstance(flavor_data, list):
-            item_list = []
-            for item in flavor_data:
-                item_list.append(self._format_keys(item))
-            return item_list
-        elif isinstance(flavor_data, dict):
-            item_dict = {}
-            for k, v in flavor_data.items():
-                item_dict[k.replace('-', '_')] = self._format_keys(v)
-            return item_dict
-        else:
-            return flavor_data
-
     def execute(self, lb_resource):
         flavor_id = a10_task_utils.attribute_search(lb_resource, 'flavor_id')
         if not flavor_id:
             flavor_id = CONF.a10_global.default_flavor_id
         if flavor_id:
+            flavor_data = flavor_cache.flavor_cache.get_normalized(flavor_id)
+            if flavor_data is not None:
+                return flavor_data
+
             flavor = self.flavor_repo.get(db_apis.get_session(), id=flavor_id)
             if not flavor and lb_resource.provisioning_status != "PENDING_DELETE":
                 raise exceptions.FlavorNotFound(flavor_id)
@@ -760,8 +765,8 @@ class GetFlavorData(BaseDatabaseTask):
                 flavor_profile = self.flavor_profile_repo.get(
                     db_apis.get_session(),
                     id=flavor.flavor_profile_id)
-                flavor_data = json.loads(flavor_profile.flavor_data)
-                return self._format_keys(flavor_data)
+                return flavor_cache.flavor_cache.update(
+                    flavor_id, flavor_profile.flavor_data, normalized=True)
 
 
 class CheckForL2DSRFlavor(BaseDatabaseTask):
@@ -894,6 +899,10 @@ class SetThunderUpdatedAt(BaseDatabaseTask):
                     db_apis.get_session(),
                     vthunder.id,
                     updated_at=datetime.utcnow())
+                self.partition_change_repo.bump(
+                    db_apis.get_session(),
+                    vthunder.ip_address,
+                    vthunder.partition_name)
         except Exception as e:
             LOG.exception('Failed to set updated_at field for thunder due to: {}'
                           ', skipping.'.format(str(e)))
@@ -913,6 +922,49 @@ class SetThunderLastWriteMem(BaseDatabaseTask):
                     vthunder.ip_address,
                     vthunder.partition_name,
                     last_write_mem=datetime.utcnow())
+                self.partition_change_repo.mark_written(
+                    db_apis.get_session(),
+                    vthunder.ip_address,
+                    [vthunder.partition_name])
+        except Exception as e:
+            LOG.exception('Failed to set last_write_mem field for thunder due to: {}'
+                          ', skipping.'.format(str(e)))
+
+
+class GetPartitionChangeCounts(BaseDatabaseTask):
+
+    def execute(self, vthunder, write_mem_thunders):
+        try:
+            return self.partition_change_repo.get_change_counts(
+                db_apis.get_session(),
+                vthunder.ip_address,
+                set(thunder.partition_name for thunder in write_mem_thunders))
+        except Exception as e:
+            LOG.exception('Failed to get partition changes of thunder due to: {}'
+                          ', skipping.'.format(str(e)))
+            return {}
+
+
+class SetThunderPartitionsLastWriteMem(BaseDatabaseTask):
+
+    def execute(self, vthunder, write_mem_partitions, partition_change_counts=None):
+        if not write_mem_partitions:
+            return
+        try:
+            LOG.debug("Updated the last_write_mem field for thunder : {}:{}"
+                      .format(vthunder.ip_address, write_mem_partitions))
+            self.vthunder_repo.update_last_write_mem_bulk(
+                db_apis.get_session(),
+                vthunder.ip_address,
+                write_mem_partitions,
+                last_write_mem=datetime.utcnow())
+            # changes which were not counted before the write memory stay pending
+            if partition_change_counts:
+                self.partition_change_repo.mark_written(
+                    db_apis.get_session(),
+                    vthunder.ip_address,
+                    write_mem_partitions,
+                    change_counts=partition_change_counts)
         except Exception as e:
             LOG.exception('Failed to set last_write_mem field for thunder due to: {}'
                           ', skipping.'.format(str(e)))
@@ -932,6 +984,19 @@ class GetActiveLoadBalancersByThunder(BaseDatabaseTask):
                           'due to: {}'.format(str(e)))
 
 
+class GetActiveLoadBalancersByThunders(BaseDatabaseTask):
+
+    def execute(self, vthunder_list):
+        try:
+            return self.loadbalancer_repo.get_active_lbs_by_thunders(
+                db_apis.get_session(),
+                vthunder_list)
+        except Exception as e:
+            LOG.exception('Failed to get active Loadbalancers related to thunders '
+                          'due to: {}'.format(str(e)))
+            return {}
+
+
 class MarkLoadBalancersPendingUpdateInDB(BaseDatabaseTask):
 
     def execute(self, loadbalancers_list):
@@ -1098,12 +1163,10 @@ class ValidateComputeForProject(BaseDatabaseTask):
 
     def execute(self, loadbalancer, role):
         vthunder = None
-        vthunder_ids = self.vthunder_repo.get_vthunders_by_project_id_and_role(
-            db_apis.get_session(), loadbalancer.project_id, role)
-        for vthunder_id in vthunder_ids:
-            vthunder = self.vthunder_repo.get(
-                db_apis.get_session(),
-                id=vthunder_id)
+        vthunders = self.vthunder_repo.get_vthunders_by_project_id_and_role(
+            db_apis.get_session(), loadbalancer.project_id, role,
+            fields=('loadbalancer_id', 'compute_id', 'project_id'))
+        for vthunder in vthunders:
             lb = self.loadbalancer_repo.get_lb_excluding_deleted(
                 db_apis.get_session(), vthunder.loadbalancer_id)
             if lb:
@@ -1134,11 +1197,11 @@ class GetSpareComputeForProject(BaseDatabaseTask):
         self.spare = None
         super(GetSpareComputeForProject, self).__init__(*arg, **kwargs)
 
-    def execute(self, compute_id=None):
+    def execute(self, loadbalancer, compute_id=None):
         if compute_id is None:
             try:
                 vthunder = self.vthunder_repo.get_spare_vthunder(
-                    db_apis.get_session())
+                    db_apis.get_session(), loadbalancer.project_id)
 
                 if vthunder:
                     self.spare = vthunder
@@ -1163,13 +1226,14 @@ class GetSpareComputeForProject(BaseDatabaseTask):
 
 
 class TryGetSpareCompute(BaseDatabaseTask):
-    """Check if spare amphora exist"""
+    """Check if spare amphora exist for the project of the failed vThunder"""
 
-    def execute(self):
+    def execute(self, vthunder):
+        project_id = vthunder.project_id
         vthunder = None
         try:
             vthunder = self.vthunder_repo.get_spare_vthunder(
-                db_apis.get_session())
+                db_apis.get_session(), project_id)
         except Exception:
             LOG.debug('No spare amphora found for failover')
 
@@ -1220,14 +1284,11 @@ class CountLoadbalancersOnThunderBySubnet(BaseDatabaseTask):
         if vthunder and use_device_flavor:
             try:
                 count = 0
-                vthunder_ids = self.vthunder_repo.get_rack_vthunders_by_ip_address(
+                vthunders = self.vthunder_repo.get_rack_vthunders_by_ip_address(
                     db_apis.get_session(),
-                    ip_address=vthunder.ip_address)
-                for vthunder_id in vthunder_ids:
-                    vth = self.vthunder_repo.get(
-                        db_apis.get_session(),
-                        id=vthunder_id)
-
+                    ip_address=vthunder.ip_address,
+                    fields=('partition_name', 'loadbalancer_id'))
+                for vth in vthunders:
                     if vthunder.partition_name == vth.partition_name:
                         lb = self.loadbalancer_repo.get_lbs_on_thunder_by_subnet(
                             db_apis.get_session(),
@@ -1267,18 +1328,43 @@ class CountMembersOnThunderBySubnet(BaseDatabaseTask):
 
 
 class UpdateListenersStats(BaseDatabaseTask):
-    """Task for updating the listener stats"""
+    """Task for updating the listener stats
 
-    def execute(self, listener_stats):
+    The database statistics driver is replaced by one bulk upsert of all
+    listener stats, any other configured drivers are called as usual. With
+    stats_delta_writes only the changed listener stats are written to the
+    database.
+    """
+
+    def execute(self, listener_stats, flow_session=None):
         try:
             if listener_stats:
-                stats_base.update_stats_via_driver(listener_stats)
+                drivers = CONF.controller_worker.statistics_drivers
+                if STATS_DB_DRIVER in drivers:
+                    self._write_stats_db(listener_stats, flow_session)
+                other_drivers = tuple(driver for driver in drivers
+                                      if driver != STATS_DB_DRIVER)
+                if other_drivers:
+                    _get_stats_handlers(other_drivers).map_method(
+                        'update_stats', listener_stats, deltas=False)
                 LOG.info('Updated the listeners statistics')
 
         except Exception as e:
             LOG.warning('Failed to update the listener statistics '
                         'due to: {}'.format(str(e)))
 
+    def _write_stats_db(self, listener_stats, flow_session):
+        delta_writes = CONF.a10_health_manager.stats_delta_writes
+        if delta_writes:
+            listener_stats = stats_tracker.listener_stats_tracker.get_changed(
+                listener_stats)
+            if not listener_stats:
+                return
+        self.listener_stats_repo.replace_bulk(
+            a10_flow_session.get_session(flow_session), listener_stats)
+        if delta_writes:
+            stats_tracker.listener_stats_tracker.record(listener_stats)
+
 
 class GetMemberListByProjectID(BaseDatabaseTask):
 
@@ -228,13 +228,15 @@ class PlugNetworksByID(BaseNetworkTask):
         nics = self.network_driver.get_plugged_networks(vthunder.compute_id)
         exist_ids = set([nic.network_id for nic in nics])
 
-        self.added_network = list(nets.difference(exist_ids))
-        for net in self.added_network:
+        # Only the networks actually plugged are unplugged on revert
+        self.added_network = []
+        for net in nets.difference(exist_ids):
             try:
                 self.network_driver.plug_network(vthunder.compute_id, net)
             except Exception as e:
                 LOG.exception("Failed to plug network: %s", net)
                 raise e
+            self.added_network.append(net)
         return self.added_network
 
     def revert(self, vthunder, network_list, *args, **kwargs):
@@ -243,6 +245,9 @@ class PlugNetworksByID(BaseNetworkTask):
                 self.network_driver.unplug_network(vthunder.compute_id, net)
             except base.NetworkNotFound:
                 pass
+            except Exception as e:
+                LOG.exception("Failed to unplug network %s from vThunder %s: %s",
+                              net, vthunder.id, str(e))
 
 
 class GetMemberPorts(BaseNetworkTask):
@@ -791,6 +796,34 @@ class HandleVRIDFloatingIP(BaseNetworkTask):
             raise e
         return vrid
 
+    def _replace_vrid_ports(self, vrid_fips, lb_resource):
+        """Replace the ports of several VRIDs with one bulk neutron request
+
+        :param vrid_fips: list of (vrid, subnet, fixed_ip) tuples
+        """
+        if len(vrid_fips) == 1:
+            vrid, vrid_subnet, fixed_ip = vrid_fips[0]
+            self._replace_vrid_port(vrid, vrid_subnet, lb_resource, fixed_ip)
+            return
+
+        for vrid, _vrid_subnet, _fixed_ip in vrid_fips:
+            if vrid.vrid_port_id:
+                self._delete_vrid_port(vrid.vrid_port_id)
+
+        try:
+            amphorae = a10_task_utils.attribute_search(lb_resource, 'amphorae')
+            fip_objs = self.network_driver.allocate_vrid_fips(
+                [(vrid, vrid_subnet.network_id, fixed_ip)
+                 for vrid, vrid_subnet, fixed_ip in vrid_fips], amphorae)
+        except Exception as e:
+            LOG.error("Failed to create neutron ports for SLB resource: %s",
+                      lb_resource.id)
+            raise e
+        for (vrid, _vrid_subnet, _fixed_ip), fip_obj in zip(vrid_fips, fip_objs):
+            vrid.vrid_port_id = fip_obj.id
+            vrid.vrid_floating_ip = fip_obj.fixed_ips[0].ip_address
+            self.added_fip_ports.append(fip_obj)
+
     @axapi_client_decorator
     def execute(self, vthunder, lb_resource, vrid_list, subnet,
                 vthunder_config, use_device_flavor=False):
@@ -828,12 +861,14 @@ class HandleVRIDFloatingIP(BaseNetworkTask):
             return []
 
         vrid_floating_ips = []
-        update_vrid_flag = False
         existing_fips = []
+        vrid_subnets = []
+        replace_vrid_fips = []
         owner = vthunder.ip_address + "_" + vthunder.partition_name
         self._add_vrid_to_list(updated_vrid_list, subnet, owner)
         for vrid in updated_vrid_list:
             vrid_subnet = self.network_driver.get_subnet(vrid.subnet_id)
+            vrid_subnets.append(vrid_subnet)
             try:
                 vrid_summary = self.axapi_client.vrrpa.get(vrid.vrid)
             except Exception as e:
@@ -872,8 +907,7 @@ class HandleVRIDFloatingIP(BaseNetworkTask):
                 if not a10_utils.check_ip_in_subnet_range(vrid.vrid_floating_ip, subnet_ip,
                                                           subnet_mask, vrid_subnet.ip_version,
                                                           vrid_subnet.cidr):
-                    vrid = self._replace_vrid_port(vrid, vrid_subnet, lb_resource)
-                    update_vrid_flag = True
+                    replace_vrid_fips.append((vrid, vrid_subnet, None))
             else:
                 if vrid.vrid_floating_ip is None:
                     new_ip = a10_utils.get_patched_ip_address(
@@ -881,8 +915,14 @@ class HandleVRIDFloatingIP(BaseNetworkTask):
                 else:
                     new_ip = vrid.vrid_floating_ip
                 if new_ip != vrid.vrid_floating_ip:
-                    vrid = self._replace_vrid_port(vrid, vrid_subnet, lb_resource, new_ip)
-                    update_vrid_flag = True
+                    replace_vrid_fips.append((vrid, vrid_subnet, new_ip))
+
+        # Ports for every VRID needing a new floating IP are created together
+        update_vrid_flag = bool(replace_vrid_fips)
+        if replace_vrid_fips:
+            self._replace_vrid_ports(replace_vrid_fips, lb_resource)
+
+        for vrid, vrid_subnet in zip(updated_vrid_list, vrid_subnets):
             if isinstance(subnet, list):
                 subnet_ids = set([s.id for s in subnet])
                 if vrid_subnet.id in subnet_ids or vrid.vrid_floating_ip in existing_fips:
@@ -1093,13 +1133,83 @@ class GetAllResourceSubnet(BaseNetworkTask):
         return subnet
 
 
+class ReserveSubnetAddressForMembers(BaseNetworkTask):
+    """Reserve NAT pool addresses for the subnets of several members at once"""
+
+    def __init__(self, **kwargs):
+        super(ReserveSubnetAddressForMembers, self).__init__(**kwargs)
+        self.nat_pool_repo = a10_repo.NatPoolRepository()
+
+    def execute(self, members, nat_flavor=None):
+        if nat_flavor is None or not members:
+            return {}
+
+        subnet_ids = []
+        for member in members:
+            if member.subnet_id in subnet_ids:
+                continue
+            nat_pool = self.nat_pool_repo.get(db_apis.get_session(),
+                                              name=nat_flavor['pool_name'],
+                                              subnet_id=member.subnet_id)
+            if nat_pool is None:
+                subnet_ids.append(member.subnet_id)
+        if not subnet_ids:
+            return {}
+
+        addr_list = a10_utils.get_natpool_addr_list(nat_flavor)
+        if not CONF.vthunder.slb_no_snat_support:
+            amphorae = a10_task_utils.attribute_search(members[0], 'amphorae')
+        else:
+            amphorae = None
+        try:
+            subnet_ports = self.network_driver.reserve_subnet_addresses_bulk(
+                subnet_ids, addr_list, amphorae)
+        except neutron_exceptions.InvalidIpForSubnetClient:
+            # The NAT pool addresses are not in every member subnet, those are
+            # left to ReserveSubnetAddressForMember to skip one by one
+            LOG.debug("Falling back to per subnet reservation for NAT pool %s",
+                      nat_flavor['pool_name'])
+            return {}
+        except Exception as e:
+            LOG.exception("Failed to reserve addresses in NAT pool %s from subnets %s",
+                          nat_flavor['pool_name'], subnet_ids)
+            raise e
+        LOG.debug("Successfully allocated addresses for nat pool %s on subnets %s",
+                  nat_flavor['pool_name'], list(subnet_ports))
+        return subnet_ports
+
+    def revert(self, result, members, nat_flavor=None, *args, **kwargs):
+        if isinstance(result, failure.Failure) or not result:
+            return
+
+        addr_list = a10_utils.get_natpool_addr_list(nat_flavor)
+        if not CONF.vthunder.slb_no_snat_support:
+            amphorae = a10_task_utils.attribute_search(members[0], 'amphorae')
+        else:
+            amphorae = None
+        for subnet_id, port in result.items():
+            LOG.warning("Reverting reservation of NAT pool %s addresses on subnet %s",
+                        nat_flavor['pool_name'], subnet_id)
+            try:
+                if amphorae is not None:
+                    self.network_driver.release_subnet_addresses(
+                        subnet_id, addr_list, amphorae)
+                self.network_driver.delete_port(port.id)
+            except Exception as e:
+                LOG.exception("Failed to revert reservation of NAT pool %s addresses "
+                              "on subnet %s due to %s", nat_flavor['pool_name'],
+                              subnet_id, str(e))
+
+
 class ReserveSubnetAddressForMember(BaseNetworkTask):
 
-    def execute(self, member, nat_flavor=None, nat_pool=None):
+    def execute(self, member, nat_flavor=None, nat_pool=None, subnet_ports=None):
         if nat_flavor is None:
             return
 
         if nat_pool is None:
+            if subnet_ports and member.subnet_id in subnet_ports:
+                return subnet_ports[member.subnet_id]
             try:
                 addr_list = a10_utils.get_natpool_addr_list(nat_flavor)
                 if not CONF.vthunder.slb_no_snat_support:
@@ -0,0 +1,92 @@
+#    Copyright 2021, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import hashlib
+import threading
+
+from oslo_config import cfg
+from oslo_utils import timeutils
+
+CONF = cfg.CONF
+
+
+class AflexScriptCache(object):
+    """Hash of the aFlex script of a l7policy last set on a vThunder.
+
+    Entries are keyed by device, partition and l7policy id. The hash covers
+    the script and the vport arguments it was associated with, so a change
+    of either uploads the script again. Tasks replacing or deleting a vport
+    invalidate the entries of its listener, and entries expire after
+    aflex_cache_ttl seconds to recover from changes made on the device.
+    The entries are per process and do not see the changes made by other
+    workers, so the cache is disabled unless aflex_cache_ttl is set.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (ip_address, partition_name, l7policy id) ->
+        #     (expiry StopWatch, digest, listener id)
+        self._scripts = {}
+
+    def clear(self):
+        with self._lock:
+            self._scripts.clear()
+
+    @staticmethod
+    def _key(vthunder, l7policy_id):
+        return (vthunder.ip_address, vthunder.partition_name, l7policy_id)
+
+    @staticmethod
+    def _digest(script, vport_args):
+        digest = hashlib.sha256(script.encode('utf-8'))
+        digest.update(repr(vport_args).encode('utf-8'))
+        return digest.hexdigest()
+
+    def is_current(self, vthunder, l7policy_id, script, vport_args):
+        """Returns True if script was already set with the same vport_args."""
+        if not vthunder:
+            return False
+        with self._lock:
+            entry = self._scripts.get(self._key(vthunder, l7policy_id))
+        return bool(entry and not entry[0].expired() and
+                    entry[1] == self._digest(script, vport_args))
+
+    def update(self, vthunder, l7policy_id, script, vport_args):
+        """Records script as set, vport_args must start with the listener id."""
+        if not vthunder or not CONF.a10_controller_worker.aflex_cache_ttl:
+            return
+        watch = timeutils.StopWatch(
+            duration=CONF.a10_controller_worker.aflex_cache_ttl).start()
+        with self._lock:
+            self._scripts[self._key(vthunder, l7policy_id)] = (
+                watch, self._digest(script, vport_args), vport_args[0])
+
+    def invalidate(self, vthunder, l7policy_id):
+        if not vthunder:
+            return
+        with self._lock:
+            self._scripts.pop(self._key(vthunder, l7policy_id), None)
+
+    def invalidate_listener(self, vthunder, listener_id):
+        """Forgets the scripts associated with a listener whose vport changed."""
+        if not vthunder:
+            return
+        device = (vthunder.ip_address, vthunder.partition_name)
+        with self._lock:
+            for key, entry in list(self._scripts.items()):
+                if key[:2] == device and entry[2] == listener_id:
+                    del self._scripts[key]
+
+
+aflex_cache = AflexScriptCache()
@@ -20,6 +20,7 @@ from taskflow import task
 from octavia.controller.worker.v1.tasks import lifecycle_tasks
 
 from a10_octavia.common import openstack_mappings
+from a10_octavia.controller.worker.tasks import aflex_cache
 from a10_octavia.controller.worker.tasks.decorators import axapi_client_decorator
 from a10_octavia.controller.worker.tasks.decorators import axapi_client_decorator_for_revert
 from a10_octavia.controller.worker.tasks.policy import PolicyUtil
@@ -31,7 +32,7 @@ LOG = logging.getLogger(__name__)
 
 class L7PolicyParent(object):
 
-    def set(self, l7policy, listeners):
+    def set(self, l7policy, listeners, vthunder=None):
         filename = l7policy.id
         p = PolicyUtil()
         script = p.createPolicy(l7policy)
@@ -39,6 +40,10 @@ class L7PolicyParent(object):
         listener = listeners[0]
         c_pers, s_pers = utils.get_sess_pers_templates(listener.default_pool)
         tcp_proxy, aflex = utils.get_tcp_proxy_template(listener, listener.default_pool)
+        vport_args = (listener.id, listener.default_pool_id, s_pers, c_pers, tcp_proxy)
+        if aflex_cache.aflex_cache.is_current(vthunder, l7policy.id, script, vport_args):
+            LOG.debug("aFlex script of l7policy %s is unchanged, skipping update", l7policy.id)
+            return
         kargs = {}
         listener.protocol = openstack_mappings.virtual_port_protocol(self.axapi_client,
                                                                      listener.protocol)
@@ -82,6 +87,7 @@ class L7PolicyParent(object):
                 l7policy.id,
                 listener.id)
             raise e
+        aflex_cache.aflex_cache.update(vthunder, l7policy.id, script, vport_args)
 
 
 class CreateL7Policy(L7PolicyParent, task.Task):
@@ -89,10 +95,11 @@ class CreateL7Policy(L7PolicyParent, task.Task):
 
     @axapi_client_decorator
     def execute(self, l7policy, listeners, vthunder):
-        self.set(l7policy, listeners)
+        self.set(l7policy, listeners, vthunder)
 
     @axapi_client_decorator_for_revert
     def revert(self, l7policy, listeners, vthunder, *args, **kwargs):
+        aflex_cache.aflex_cache.invalidate(vthunder, l7policy.id)
         try:
             self.axapi_client.slb.aflex_policy.delete(l7policy.id)
         except exceptions.ConnectionError:
@@ -109,7 +116,7 @@ class UpdateL7Policy(L7PolicyParent, task.Task):
     @axapi_client_decorator
     def execute(self, l7policy, listeners, vthunder, update_dict):
         l7policy.update(update_dict)
-        self.set(l7policy, listeners)
+        self.set(l7policy, listeners, vthunder)
 
 
 class DeleteL7Policy(task.Task):
@@ -117,6 +124,7 @@ class DeleteL7Policy(task.Task):
 
     @axapi_client_decorator
     def execute(self, l7policy, vthunder):
+        aflex_cache.aflex_cache.invalidate(vthunder, l7policy.id)
         listener = l7policy.listener
         c_pers, s_pers = utils.get_sess_pers_templates(
             listener.default_pool)
@@ -20,6 +20,7 @@ from taskflow import task
 from octavia.controller.worker.v1.tasks import lifecycle_tasks
 
 from a10_octavia.common import openstack_mappings
+from a10_octavia.controller.worker.tasks import aflex_cache
 from a10_octavia.controller.worker.tasks.decorators import axapi_client_decorator
 from a10_octavia.controller.worker.tasks.policy import PolicyUtil
 from a10_octavia.controller.worker.tasks import utils
@@ -30,7 +31,7 @@ LOG = logging.getLogger(__name__)
 
 class L7RuleParent(object):
 
-    def set(self, l7rule, listeners):
+    def set(self, l7rule, listeners, vthunder=None):
         l7policy = l7rule.l7policy
         filename = l7policy.id
         p = PolicyUtil()
@@ -39,6 +40,11 @@ class L7RuleParent(object):
         listener = listeners[0]
         c_pers, s_pers = utils.get_sess_pers_templates(listener.default_pool)
         tcp_proxy, aflex = utils.get_tcp_proxy_template(listener, listener.default_pool)
+        vport_args = (listener.id, listener.default_pool_id, s_pers, c_pers, tcp_proxy)
+        if aflex_cache.aflex_cache.is_current(vthunder, l7policy.id, script, vport_args):
+            LOG.debug("aFlex script of l7policy %s is unchanged, skipping update of l7rule %s",
+                      l7policy.id, l7rule.id)
+            return
         kargs = {}
         listener.protocol = openstack_mappings.virtual_port_protocol(self.axapi_client,
                                                                      listener.protocol)
@@ -76,6 +82,7 @@ class L7RuleParent(object):
         except (acos_errors.ACOSException, exceptions.ConnectionError) as e:
             LOG.exception("Failed to associate l7rule %s to listener %s", l7rule.id, listener.id)
             raise e
+        aflex_cache.aflex_cache.update(vthunder, l7policy.id, script, vport_args)
 
 
 class CreateL7Rule(L7RuleParent, task.Task):
@@ -83,7 +90,7 @@ class CreateL7Rule(L7RuleParent, task.Task):
 
     @axapi_client_decorator
     def execute(self, l7rule, listeners, vthunder):
-        self.set(l7rule, listeners)
+        self.set(l7rule, listeners, vthunder)
 
 
 class UpdateL7Rule(L7RuleParent, task.Task):
@@ -92,7 +99,7 @@ class UpdateL7Rule(L7RuleParent, task.Task):
     @axapi_client_decorator
     def execute(self, l7rule, listeners, vthunder, update_dict):
         l7rule.update(update_dict)
-        self.set(l7rule, listeners)
+        self.set(l7rule, listeners, vthunder)
 
 
 class DeleteL7Rule(task.Task):
@@ -117,6 +124,11 @@ class DeleteL7Rule(task.Task):
         listener = listeners[0]
         c_pers, s_pers = utils.get_sess_pers_templates(listener.default_pool)
         tcp_proxy, aflex = utils.get_tcp_proxy_template(listener, listener.default_pool)
+        vport_args = (listener.id, listener.default_pool_id, s_pers, c_pers, tcp_proxy)
+        if aflex_cache.aflex_cache.is_current(vthunder, l7policy.id, script, vport_args):
+            LOG.debug("aFlex script of l7policy %s is unchanged, skipping delete of l7rule %s",
+                      l7policy.id, l7rule.id)
+            return
         kargs = {}
         listener.protocol = openstack_mappings.virtual_port_protocol(self.axapi_client,
                                                                      listener.protocol)
@@ -156,6 +168,7 @@ class DeleteL7Rule(task.Task):
                 l7rule.id,
                 listener.id)
             raise e
+        aflex_cache.aflex_cache.update(vthunder, l7policy.id, script, vport_args)
 
 
 class L7RuleToErrorOnRevertTask(lifecycle_tasks.BaseLifecycleTask):
@@ -14,7 +14,6 @@
 
 import json
 import logging
-import re
 
 from oslo_config import cfg
 
@@ -25,6 +24,7 @@ from octavia_lib.common import constants as lib_consts
 
 from a10_octavia.common import a10constants
 from a10_octavia.common.data_models import Certificate
+from a10_octavia.common import flavor_cache
 from a10_octavia.common import utils as a10_utils
 
 
@@ -139,7 +139,7 @@ def parse_name_expressions(name, name_expressions):
     if name and name_expressions:
         for expression in name_expressions:
             if 'regex' in expression:
-                if re.search(expression['regex'], name):
+                if flavor_cache.flavor_cache.get_regex(expression['regex']).search(name):
                     flavor_data.update(expression['json'])
     return flavor_data
 
@@ -23,6 +23,7 @@ from octavia.common import constants
 from a10_octavia.common import a10constants
 from a10_octavia.common import exceptions
 from a10_octavia.common import openstack_mappings
+from a10_octavia.controller.worker.tasks import aflex_cache
 from a10_octavia.controller.worker.tasks.decorators import axapi_client_decorator
 from a10_octavia.controller.worker.tasks.decorators import axapi_client_decorator_for_revert
 from a10_octavia.controller.worker.tasks import utils
@@ -223,6 +224,7 @@ class ListenerUpdate(ListenersParent, task.Task):
                 listener.__dict__.update(update_dict)
                 self.set(self.axapi_client.slb.virtual_server.vport.replace,
                          loadbalancer, listener, vthunder, flavor_data, update_dict)
+                aflex_cache.aflex_cache.invalidate_listener(vthunder, listener.id)
                 LOG.debug("Successfully updated listener: %s", listener.id)
         except (acos_errors.ACOSException, ConnectionError) as e:
             LOG.exception("Failed to update listener: %s", listener.id)
@@ -269,6 +271,7 @@ class ListenerUpdateForPool(ListenersParent, task.Task):
                     tcp_proxy_name=tcp_proxy,
                     aflex_scripts_clear=clear_aflex,
                     **kargs)
+                aflex_cache.aflex_cache.invalidate_listener(vthunder, listener.id)
                 LOG.debug("Successfully updated listener: %s", listener.id)
         except (acos_errors.ACOSException, ConnectionError) as e:
             LOG.exception("Failed to update listener: %s", listener.id)
@@ -286,6 +289,7 @@ class ListenerDelete(ListenersParent, task.Task):
             self.axapi_client.slb.virtual_server.vport.delete(
                 loadbalancer.id, listener.id, listener.protocol,
                 listener.protocol_port)
+            aflex_cache.aflex_cache.invalidate_listener(vthunder, listener.id)
             LOG.debug("Successfully deleted listener: %s", listener.id)
         except (acos_errors.ACOSException, ConnectionError) as e:
             LOG.exception("Failed to delete listener: %s", listener.id)
@@ -16,24 +16,27 @@
 import acos_client
 from acos_client import errors as acos_errors
 
+from concurrent import futures
 import datetime
 try:
     import http.client as http_client
 except ImportError:
     import httplib as http_client
+import random
 from requests import exceptions as req_exceptions
+import socket
 from taskflow import task
 import time
 
 from oslo_config import cfg
 from oslo_log import log as logging
+from oslo_utils import timeutils
 
 from octavia.amphorae.driver_exceptions import exceptions as driver_except
 from octavia.common import constants
 from octavia.common import data_models
 from octavia.common import utils
 from octavia.db import api as db_apis
-from octavia.db import repositories as repo
 
 from a10_octavia.common import a10constants
 from a10_octavia.common import exceptions
@@ -43,6 +46,8 @@ from a10_octavia.controller.worker.tasks.decorators import activate_partition
 from a10_octavia.controller.worker.tasks.decorators import axapi_client_decorator
 from a10_octavia.controller.worker.tasks.decorators import axapi_client_decorator_for_revert
 from a10_octavia.controller.worker.tasks.decorators import device_context_switch_decorator
+from a10_octavia.controller.worker import vcs_watcher
+from a10_octavia.db import flow_session as a10_flow_session
 from a10_octavia.db import repositories as a10_repo
 
 
@@ -57,7 +62,7 @@ class VThunderBaseTask(task.Task):
         self._network_driver = None
         self.vthunder_repo = a10_repo.VThunderRepository()
         self.loadbalancer_repo = a10_repo.LoadBalancerRepository()
-        self.listener_repo = repo.ListenerRepository()
+        self.listener_repo = a10_repo.ListenerRepository()
 
     @property
     def network_driver(self):
@@ -67,37 +72,28 @@ class VThunderBaseTask(task.Task):
 
 
 class VThunderComputeConnectivityWait(VThunderBaseTask):
-    """Task to wait for the compute instance to be up"""
+    """Task to wait for the compute instance to be up
 
-    def execute(self, vthunder, amphora, master_amphora_status=True):
+    The peer vThunder of an active/standby pair is probed concurrently,
+    so the pair waits for the slower boot only once.
+    """
+
+    def execute(self, vthunder, amphora, master_amphora_status=True,
+                peer_vthunder=None, peer_amphora_status=True):
         """Execute get_info routine for a vThunder until it responds."""
+        vthunders = []
+        if vthunder and master_amphora_status:
+            vthunders.append(vthunder)
+        if (peer_vthunder and peer_amphora_status and
+                not (vthunder and peer_vthunder.id == vthunder.id)):
+            vthunders.append(peer_vthunder)
         try:
-            if vthunder:
-                if not master_amphora_status:
-                    return
-                axapi_client = a10_utils.get_axapi_client(vthunder)
-                LOG.info("Attempting to connect vThunder device for connection.")
-                attempts = CONF.a10_controller_worker.amp_active_retries
-                while attempts >= 0:
-                    try:
-                        attempts = attempts - 1
-                        axapi_client.system.information()
-                        break
-                    except (acos_errors.ACOSSystemIsBusy, acos_errors.ACOSSystemNotReady,
-                            req_exceptions.ConnectionError, req_exceptions.ReadTimeout):
-                        # acos-client already wait default_axapi_timeout for these exceptions.
-                        axapi_timeout = CONF.vthunder.default_axapi_timeout
-                        attempt_wait = CONF.a10_controller_worker.amp_active_wait_sec
-                        if axapi_timeout > attempt_wait:
-                            attempts = attempts - (axapi_timeout / attempt_wait - 1)
-                        LOG.debug("VThunder connection retry cnt:" + str(attempts))
-                    except (acos_errors.ACOSException, http_client.BadStatusLine):
-                        time.sleep(CONF.a10_controller_worker.amp_active_wait_sec)
-                        LOG.debug("VThunder connection retry cnt:" + str(attempts))
-                if attempts < 0:
-                    LOG.error("Failed to connect vThunder in expected amount of boot time: %s",
-                              vthunder.id)
-                    raise req_exceptions.ConnectionError
+            if len(vthunders) > 1:
+                with futures.ThreadPoolExecutor(max_workers=len(vthunders)) as executor:
+                    list(executor.map(self._wait_for_vthunder, vthunders))
+            else:
+                for thunder in vthunders:
+                    self._wait_for_vthunder(thunder)
 
         except driver_except.TimeOutException as e:
             LOG.exception("Amphora compute instance failed to become reachable. "
@@ -110,6 +106,42 @@ class VThunderComputeConnectivityWait(VThunderBaseTask):
         except Exception as e:
             LOG.warning("Could not connect to vThunder-Amphora due to following issue %s", e)
 
+    def _wait_for_vthunder(self, vthunder):
+        """Probes the aXAPI port with jittered exponential backoff.
+
+        Each probe is a plain TCP connect bounded by amp_connect_timeout, the
+        aXAPI client is only used once the port accepts connections.
+        """
+        conf = CONF.a10_controller_worker
+        watch = timeutils.StopWatch(
+            duration=conf.amp_active_retries * conf.amp_active_wait_sec).start()
+        interval = conf.amp_ready_poll_interval
+        LOG.info("Attempting to connect vThunder device %s for connection.", vthunder.id)
+        while True:
+            if _axapi_port_open(vthunder.ip_address, conf.amp_connect_timeout):
+                try:
+                    a10_utils.get_axapi_client(vthunder).system.information()
+                    LOG.info("vThunder %s is reachable after %.1f seconds",
+                             vthunder.id, watch.elapsed())
+                    return
+                except (acos_errors.ACOSException, req_exceptions.ConnectionError,
+                        req_exceptions.ReadTimeout, http_client.BadStatusLine) as e:
+                    LOG.debug("vThunder %s is not ready yet: %s", vthunder.id, str(e))
+            if watch.expired():
+                LOG.error("Failed to connect vThunder in expected amount of boot time: %s",
+                          vthunder.id)
+                raise req_exceptions.ConnectionError
+            time.sleep(min(random.uniform(interval / 2, interval), watch.leftover()))
+            interval = min(interval * 2, conf.amp_active_wait_sec)
+
+
+def _axapi_port_open(ip_address, timeout):
+    try:
+        socket.create_connection((ip_address, a10constants.AXAPI_PORT), timeout=timeout).close()
+        return True
+    except (socket.timeout, socket.error):
+        return False
+
 
 class AmphoraePostVIPPlug(VThunderBaseTask):
     """Task to reboot and configure vThunder device"""
@@ -127,10 +159,10 @@ class AmphoraePostVIPPlug(VThunderBaseTask):
                         vthunder.ip_address,
                         vthunder.partition_name,
                         last_write_mem=datetime.datetime.utcnow())
+                triggered_at = datetime.datetime.utcnow()
                 self.axapi_client.system.action.reload_reboot_for_interface_attachment(
                     vthunder.acos_version)
-                LOG.debug("Waiting for 30 seconds to trigger vThunder reload.")
-                time.sleep(30)
+                _wait_for_thunder_ready(self.axapi_client, vthunder, triggered_at)
                 LOG.debug("Successfully reloaded/rebooted vThunder: %s", vthunder.id)
             except (acos_errors.ACOSException, req_exceptions.ConnectionError) as e:
                 LOG.exception("Failed to save configuration and reboot on vThunder "
@@ -146,10 +178,10 @@ class SparePostNetworkPlug(VThunderBaseTask):
         try:
             if vthunder and added_network and len(added_network) > 0:
                 self.axapi_client.system.action.write_memory()
+                triggered_at = datetime.datetime.utcnow()
                 self.axapi_client.system.action.reload_reboot_for_interface_attachment(
                     vthunder.acos_version)
-                LOG.debug("Waiting for 30 seconds to trigger vThunder reload.")
-                time.sleep(30)
+                _wait_for_thunder_ready(self.axapi_client, vthunder, triggered_at)
         except (acos_errors.ACOSException, req_exceptions.ConnectionError) as e:
             LOG.exception("Failed to reload vThunder for network interface plug-in"
                           " for amphora: %s", vthunder.amphora_id)
@@ -265,10 +297,10 @@ class AmphoraePostMemberNetworkPlug(VThunderBaseTask):
                         vthunder.ip_address,
                         vthunder.partition_name,
                         last_write_mem=datetime.datetime.utcnow())
+                triggered_at = datetime.datetime.utcnow()
                 self.axapi_client.system.action.reload_reboot_for_interface_attachment(
                     vthunder.acos_version)
-                LOG.debug("Waiting for 30 seconds to trigger vThunder reload/reboot.")
-                time.sleep(30)
+                _wait_for_thunder_ready(self.axapi_client, vthunder, triggered_at)
                 LOG.debug("Successfully rebooted/reloaded vThunder: %s", vthunder.id)
             else:
                 LOG.debug("vThunder reboot/relaod is not required for member addition.")
@@ -563,6 +595,7 @@ class ConfigureaVCSMaster(VThunderBaseTask):
         try:
             configure_avcs(self.axapi_client, device_id, device_priority,
                            floating_ip, floating_ip_mask)
+            vcs_watcher.vcs_state_watcher.invalidate(vthunder.ip_address)
             LOG.debug("Configured the master vThunder for aVCS: %s", vthunder.id)
         except (acos_errors.ACOSException, req_exceptions.ConnectionError) as e:
             LOG.exception("Failed to configure master vThunder aVCS: %s", str(e))
@@ -576,28 +609,24 @@ class ConfigureaVCSBackup(VThunderBaseTask):
     def execute(self, vthunder, device_id=2, device_priority=100,
                 floating_ip="192.168.0.100", floating_ip_mask="255.255.255.0"):
         try:
-            attempts = CONF.a10_controller_worker.amp_vcs_retries
-            while attempts >= 0:
+            conf = CONF.a10_controller_worker
+            watch = timeutils.StopWatch(
+                duration=conf.amp_vcs_retries * conf.amp_vcs_wait_sec).start()
+            interval = conf.amp_ready_poll_interval
+            while True:
                 try:
-                    attempts = attempts - 1
                     configure_avcs(self.axapi_client, device_id, device_priority,
                                    floating_ip, floating_ip_mask)
-                    attempts = 0
+                    vcs_watcher.vcs_state_watcher.invalidate(vthunder.ip_address)
                     LOG.debug("Configured the backup vThunder for aVCS: %s", vthunder.id)
                     break
-                except (acos_errors.ACOSSystemIsBusy, acos_errors.ACOSSystemNotReady,
-                        req_exceptions.ConnectionError, req_exceptions.ReadTimeout) as e:
-                    # acos-client already wait default_axapi_timeout for these exceptions.
-                    axapi_timeout = CONF.vthunder.default_axapi_timeout
-                    attempt_wait = CONF.a10_controller_worker.amp_vcs_wait_sec
-                    if axapi_timeout > attempt_wait:
-                        attempts = attempts - (axapi_timeout / attempt_wait - 1)
-                    if attempts < 0:
-                        raise e
                 except Exception as e:
-                    if attempts < 0:
+                    # acos-client already retries busy and unreachable devices
+                    # for default_axapi_timeout, so only the deadline is checked.
+                    if watch.expired():
                         raise e
-                    time.sleep(CONF.a10_controller_worker.amp_vcs_wait_sec)
+                    time.sleep(min(interval, watch.leftover()))
+                    interval = min(interval * 2, conf.amp_vcs_wait_sec)
         except (acos_errors.ACOSException, req_exceptions.ConnectionError) as e:
             LOG.exception("Failed to configure backup vThunder aVCS: %s", str(e))
             raise e
@@ -618,6 +647,7 @@ class ConfigureaVCSFailover(VThunderBaseTask):
             try:
                 configure_avcs(self.axapi_client, device_id, device_priority,
                                floating_ip, floating_ip_mask)
+                vcs_watcher.vcs_state_watcher.invalidate(vthunder.ip_address)
             except (acos_errors.ACOSException, req_exceptions.ConnectionError) as e:
                 LOG.exception("Failed to configure failover vThunder aVCS: %s", str(e))
                 raise e
@@ -1240,7 +1270,8 @@ class WriteMemoryHouseKeeper(VThunderBaseTask):
     """Task to write memory of the Thunder device using housekeeping"""
 
     @axapi_client_decorator
-    def execute(self, vthunder, loadbalancers_list, write_mem_shared_part=False):
+    def execute(self, vthunder, loadbalancers_list, write_mem_shared_part=False,
+                flow_session=None):
         try:
             if vthunder:
                 if write_mem_shared_part:
@@ -1257,69 +1288,214 @@ class WriteMemoryHouseKeeper(VThunderBaseTask):
         except acos_errors.ACOSException:
             LOG.warning('Failed to write memory on thunder device: {} due to ACOSException'
                         '.... skipping'.format(vthunder.ip_address))
-            self._revert_lb_to_active(vthunder, loadbalancers_list)
+            self._revert_lb_to_active(vthunder, loadbalancers_list, flow_session)
             return False
         except req_exceptions.ConnectionError:
             LOG.warning('Failed to write memory on thunder device: {} due to ConnectionError'
                         '.... skipping'.format(vthunder.ip_address))
-            self._revert_lb_to_active(vthunder, loadbalancers_list)
+            self._revert_lb_to_active(vthunder, loadbalancers_list, flow_session)
             return False
         except Exception as e:
             LOG.warning('Failed to write memory on thunder device: '
                         '{} due to {}...skipping'.format(vthunder.ip_address, str(e)))
-            self._revert_lb_to_active(vthunder, loadbalancers_list)
+            self._revert_lb_to_active(vthunder, loadbalancers_list, flow_session)
             return False
         return True
 
-    def _revert_lb_to_active(self, vthunder, loadbalancers_list):
+    def _revert_lb_to_active(self, vthunder, loadbalancers_list, flow_session=None):
         try:
-            for lb in loadbalancers_list:
-                self.loadbalancer_repo.update(
-                    db_apis.get_session(),
-                    lb.id,
-                    provisioning_status='ACTIVE')
+            with a10_flow_session.unit_of_work(flow_session) as session:
+                self.loadbalancer_repo.update_provisioning_status_bulk(
+                    session, [lb.id for lb in loadbalancers_list], constants.ACTIVE)
         except Exception as e:
             LOG.exception('Failed to set Loadbalancers to ACTIVE due to '
                           ': {}'.format(str(e)))
 
 
+def _get_thunder_reload_time(axapi_client):
+    info = axapi_client.system.action.get_thunder_up_time()
+    if ("miscellenious-alb" in info and "oper" in info['miscellenious-alb'] and
+       "uptime" in info['miscellenious-alb']['oper']):
+        uptime = info['miscellenious-alb']['oper']['uptime']
+        uptime_delta = datetime.timedelta(seconds=uptime)
+        return datetime.datetime.utcnow() - uptime_delta
+    LOG.warning("Write Memory flow failed to detect Thunder status")
+    return None
+
+
+def _thunder_interfaces_ready(axapi_client):
+    interfaces = axapi_client.interface.get_list()
+    for ethernet in interfaces.get('interface', {}).get('ethernet-list', []):
+        ifnum_oper = axapi_client.interface.ethernet.get_oper(ethernet['ifnum'])
+        if not ifnum_oper.get('ethernet', {}).get('oper', {}).get('state'):
+            return False
+    return True
+
+
+def _wait_for_thunder_ready(axapi_client, vthunder, triggered_at):
+    """Polls a thunder after a reload until aXAPI and its interfaces respond.
+
+    The reload counts as started once a poll fails or the thunder reports an
+    uptime beginning after triggered_at. If neither happens within
+    amp_reload_start_timeout, the thunder is taken as reloaded. aXAPI is only
+    polled once a TCP connect bounded by amp_connect_timeout succeeds, so a
+    thunder which is down does not block in the aXAPI client retries.
+
+    :param triggered_at: UTC time the reload or reboot was requested at
+    :returns: Seconds from triggered_at until the thunder was ready
+    :raises ThunderNotReady: When not ready within amp_ready_timeout
+    """
+    vcs_watcher.vcs_state_watcher.invalidate(vthunder.ip_address)
+    conf = CONF.a10_controller_worker
+    watch = timeutils.StopWatch(duration=conf.amp_ready_timeout).start()
+    interval = conf.amp_ready_poll_interval
+    reloaded = False
+    while True:
+        reloaded = reloaded or watch.elapsed() >= conf.amp_reload_start_timeout
+        if not _axapi_port_open(vthunder.ip_address, conf.amp_connect_timeout):
+            LOG.debug("vThunder %s is reloading: aXAPI port is closed", vthunder.id)
+            reloaded = True
+        else:
+            try:
+                axapi_client.system.information()
+                if not reloaded:
+                    reload_time = _get_thunder_reload_time(axapi_client)
+                    reloaded = reload_time is not None and reload_time >= triggered_at
+                if reloaded and _thunder_interfaces_ready(axapi_client):
+                    break
+            except (acos_errors.ACOSSystemIsBusy, acos_errors.ACOSSystemNotReady,
+                    req_exceptions.ConnectionError, req_exceptions.ReadTimeout,
+                    http_client.BadStatusLine) as e:
+                LOG.debug("vThunder %s is reloading: %s", vthunder.id, str(e))
+                reloaded = True
+            except acos_errors.ACOSException as e:
+                LOG.debug("vThunder %s is not ready yet: %s", vthunder.id, str(e))
+        if watch.expired():
+            LOG.error("vThunder %s is not ready %d seconds after reload",
+                      vthunder.id, conf.amp_ready_timeout)
+            raise exceptions.ThunderNotReady(vthunder.id, conf.amp_ready_timeout)
+        time.sleep(min(interval, watch.leftover()))
+        interval = min(interval * 2, conf.amp_active_wait_sec)
+
+    time_to_ready = (datetime.datetime.utcnow() - triggered_at).total_seconds()
+    LOG.info("vThunder %s is ready %.1f seconds after reload", vthunder.id, time_to_ready)
+    return time_to_ready
+
+
 class WriteMemoryThunderStatusCheck(VThunderBaseTask):
 
     @axapi_client_decorator
-    def execute(self, vthunder, loadbalancers_list):
+    def execute(self, vthunder, loadbalancers_list, flow_session=None):
         if not loadbalancers_list:
             return
         try:
-            info = self.axapi_client.system.action.get_thunder_up_time()
-            if ("miscellenious-alb" in info and "oper" in info['miscellenious-alb'] and
-               "uptime" in info['miscellenious-alb']['oper']):
-                uptime = info['miscellenious-alb']['oper']['uptime']
-                uptime_delta = datetime.timedelta(seconds=uptime)
-                reload_time = datetime.datetime.utcnow() - uptime_delta
-                if reload_time > vthunder.updated_at:
-                    self._mark_lb_as_error(vthunder, loadbalancers_list)
-            else:
-                LOG.warning("Write Memory flow failed to detect Thunder status")
-                raise
+            reload_time = _get_thunder_reload_time(self.axapi_client)
+            if reload_time and reload_time > vthunder.updated_at:
+                self._mark_lb_as_error(vthunder, loadbalancers_list, flow_session)
         except Exception as e:
             # log warning but continue the write memory flow
             LOG.warning("Write Memory flow failed to detect Thunder status: %s ... skipping",
                         str(e))
 
-    def _mark_lb_as_error(self, vthunder, loadbalancers_list):
+    def _mark_lb_as_error(self, vthunder, loadbalancers_list, flow_session=None):
         try:
             LOG.warning('Detect vThunder %s reload before write memory, '
                         'set loadbalancer status to ERROR', vthunder.id)
-            for lb in loadbalancers_list:
-                self.loadbalancer_repo.update(
-                    db_apis.get_session(),
-                    lb.id,
-                    provisioning_status='ERROR')
+            with a10_flow_session.unit_of_work(flow_session) as session:
+                self.loadbalancer_repo.update_provisioning_status_bulk(
+                    session, [lb.id for lb in loadbalancers_list], constants.ERROR)
         except Exception as e:
             LOG.exception('Failed to set Loadbalancers to ERROR due to '
                           ': {}'.format(str(e)))
 
 
+class WriteMemoryDeviceHouseKeeper(VThunderBaseTask):
+    """Task to check reload and write memory of all partitions of a Thunder device
+
+    Logs in to the device once in the shared partition and checks its uptime
+    once for all partitions. Returns the partitions written to memory.
+    """
+
+    @axapi_client_decorator
+    def execute(self, vthunder, reload_check_thunders, write_mem_thunders,
+                loadbalancers_map, write_mem_shared_part=True, flow_session=None):
+        error_lb_ids = set()
+        if any(loadbalancers_map.get(thunder.id) for thunder in reload_check_thunders):
+            error_lb_ids = self._check_reload(vthunder, reload_check_thunders,
+                                              loadbalancers_map, flow_session)
+
+        lb_ids = [lb.id for thunder in write_mem_thunders
+                  for lb in loadbalancers_map.get(thunder.id, [])
+                  if lb.id not in error_lb_ids]
+        self._update_lbs_status(lb_ids, constants.PENDING_UPDATE, flow_session)
+        try:
+            return self._write_memory(vthunder, write_mem_thunders)
+        finally:
+            self._update_lbs_status(lb_ids, constants.ACTIVE, flow_session)
+
+    def _check_reload(self, vthunder, reload_check_thunders, loadbalancers_map,
+                      flow_session=None):
+        try:
+            reload_time = _get_thunder_reload_time(self.axapi_client)
+        except Exception as e:
+            # log warning but continue the write memory flow
+            LOG.warning("Write Memory flow failed to detect Thunder status: %s ... skipping",
+                        str(e))
+            return set()
+
+        error_lb_ids = set()
+        if reload_time is None:
+            return error_lb_ids
+        for thunder in reload_check_thunders:
+            if reload_time > thunder.updated_at and loadbalancers_map.get(thunder.id):
+                LOG.warning('Detect vThunder %s reload before write memory, '
+                            'set loadbalancer status to ERROR', thunder.id)
+                error_lb_ids.update(lb.id for lb in loadbalancers_map[thunder.id])
+        self._update_lbs_status(error_lb_ids, constants.ERROR, flow_session)
+        return error_lb_ids
+
+    def _write_memory(self, vthunder, write_mem_thunders):
+        if not write_mem_thunders:
+            return []
+        try:
+            LOG.info("Performing write memory for thunder - {}:{}"
+                     .format(vthunder.ip_address, "shared"))
+            self.axapi_client.system.action.write_memory(partition="shared")
+        except Exception as e:
+            LOG.warning('Failed to write memory on thunder device: '
+                        '{} due to {}...skipping'.format(vthunder.ip_address, str(e)))
+            return []
+
+        written_partitions = []
+        for thunder in write_mem_thunders:
+            if thunder.partition_name in written_partitions:
+                continue
+            if thunder.partition_name != "shared":
+                try:
+                    LOG.info("Performing write memory for thunder - {}:{}"
+                             .format(thunder.ip_address, thunder.partition_name))
+                    self.axapi_client.system.action.write_memory(
+                        partition="specified",
+                        specified_partition=thunder.partition_name)
+                except Exception as e:
+                    LOG.warning('Failed to write memory on thunder device: '
+                                '{}:{} due to {}...skipping'.format(
+                                    thunder.ip_address, thunder.partition_name, str(e)))
+                    continue
+            written_partitions.append(thunder.partition_name)
+        return written_partitions
+
+    def _update_lbs_status(self, lb_ids, provisioning_status, flow_session=None):
+        if not lb_ids:
+            return
+        try:
+            self.loadbalancer_repo.update_provisioning_status_bulk(
+                a10_flow_session.get_session(flow_session), lb_ids, provisioning_status)
+        except Exception as e:
+            LOG.exception('Failed to set Loadbalancers to {} due to '
+                          ': {}'.format(provisioning_status, str(e)))
+
+
 class UpdateAcosVersionInVthunderEntry(VThunderBaseTask):
 
     @axapi_client_decorator
@@ -1363,10 +1539,10 @@ class AmphoraePostNetworkUnplug(VThunderBaseTask):
                             vthunder.ip_address,
                             vthunder.partition_name,
                             last_write_mem=datetime.datetime.utcnow())
+                    triggered_at = datetime.datetime.utcnow()
                     self.axapi_client.system.action.reload_reboot_for_interface_detachment(
                         vthunder.acos_version)
-                    LOG.debug("Waiting for 30 seconds to trigger vThunder reload/reboot.")
-                    time.sleep(30)
+                    _wait_for_thunder_ready(self.axapi_client, vthunder, triggered_at)
                     LOG.debug("Successfully rebooted/reloaded vThunder: %s", vthunder.id)
                 else:
                     LOG.debug("vThunder reboot/relaod is not required for member addition.")
@@ -1382,9 +1558,10 @@ class VCSReload(VThunderBaseTask):
     def execute(self, vthunder):
         """Execute get_info routine for a vThunder until it responds."""
         try:
-            self.axapi_client.system.action.vcs_reload()
-            time.sleep(30)
             LOG.debug("Performing VCS reload")
+            triggered_at = datetime.datetime.utcnow()
+            self.axapi_client.system.action.vcs_reload()
+            _wait_for_thunder_ready(self.axapi_client, vthunder, triggered_at)
         except (acos_errors.ACOSException, req_exceptions.ConnectionError) as e:
             LOG.exception("Failed to reload VCS on vThunder "
                           "for amphora id: %s", vthunder.amphora_id)
@@ -1394,7 +1571,6 @@ class VCSReload(VThunderBaseTask):
 class VCSSyncWait(VThunderBaseTask):
     """Task to wait VCS reload, VCS negotiagtion or VCS configuration sync ready."""
 
-    @axapi_client_decorator
     def execute(self, vthunder, master_amphora_status=True, backup_amphora_status=True):
         if not vthunder or CONF.a10_controller_worker.loadbalancer_topology != "ACTIVE_STANDBY":
             return
@@ -1402,98 +1578,27 @@ class VCSSyncWait(VThunderBaseTask):
         if not (master_amphora_status and backup_amphora_status):
             return
 
-        attempts = CONF.a10_controller_worker.amp_vcs_retries
-        while attempts >= 0:
-            try:
-                attempts = attempts - 1
-                vcs_summary = {}
-                vcs_summary = self.axapi_client.system.action.get_vcs_summary_oper()
-                vcs_summary = vcs_summary['vcs-summary']['oper']
-
-                if (vthunder.acos_version is not None and
-                    acos_client.utils.acos_version_cmp(vthunder.acos_version,
-                                                       a10constants.ACOS_5_2_1_P2) >= 0):
-                    vcs_ready = False
-                    for peer_vcs_state in vcs_summary['vcs-handshake-completed-list']:
-                        if peer_vcs_state['vcs-handshake-completed'] == 1:
-                            vcs_ready = True
-                            break
-                    if vcs_ready is True:
-                        break
-                else:
-                    vmaster_ready = False
-                    vblade_ready = False
-                    vcs_member_list = vcs_summary['member-list']
-                    for i in range(len(vcs_member_list)):
-                        role = vcs_member_list[i]['state'].split('(')[0]
-                        if role == "vMaster":
-                            vmaster_ready = True
-                        if role == "vBlade":
-                            vblade_ready = True
-                        if vmaster_ready is True and vblade_ready is True:
-                            break
-                    else:
-                        if vmaster_ready:
-                            raise acos_errors.AxapiJsonFormatError(
-                                msg="vBlade not found in vcs-summary")
-                        raise acos_errors.AxapiJsonFormatError(
-                            msg="vMaster not found in vcs-summary")
-                    if vmaster_ready is True and vblade_ready is True:
-                        break
-            except (acos_errors.ACOSSystemIsBusy, acos_errors.ACOSSystemNotReady,
-                    req_exceptions.ConnectionError, req_exceptions.ReadTimeout) as e:
-                # acos-client already wait default_axapi_timeout for these exceptions.
-                axapi_timeout = CONF.vthunder.default_axapi_timeout
-                attempt_wait = CONF.a10_controller_worker.amp_vcs_wait_sec
-                if axapi_timeout > attempt_wait:
-                    attempts = attempts - (axapi_timeout / attempt_wait - 1)
-                if attempts < 0:
-                    LOG.exception("Failed to connect VCS device: %s", str(e))
-                    raise e
-            except Exception as e:
-                if attempts < 0:
-                    LOG.exception("VCS not ready after timeout: %s", str(e))
-                    raise e
-                time.sleep(CONF.a10_controller_worker.amp_vcs_wait_sec)
+        try:
+            vcs_watcher.vcs_state_watcher.wait_ready(vthunder)
+        except (acos_errors.ACOSException, req_exceptions.ConnectionError,
+                req_exceptions.ReadTimeout) as e:
+            LOG.exception("VCS not ready after timeout: %s", str(e))
+            raise e
 
 
 class GetMasterVThunder(VThunderBaseTask):
     """Task to get Master vThunder"""
 
-    @axapi_client_decorator
     def execute(self, vthunder):
         if vthunder:
-            attempts = CONF.a10_controller_worker.amp_vcs_retries
-            while attempts >= 0:
-                try:
-                    attempts = attempts - 1
-                    vcs_summary = {}
-                    vcs_summary = self.axapi_client.system.action.get_vcs_summary_oper()
-                    vcs_member_list = vcs_summary['vcs-summary']['oper']['member-list']
-                    for i in range(len(vcs_member_list)):
-                        role = vcs_member_list[i]['state'].split('(')[0]
-                        if role == "vMaster":
-                            vthunder.ip_address = vcs_member_list[i]['ip-list'][0]['ip']
-                            break
-                    else:
-                        raise acos_errors.AxapiJsonFormatError(
-                            msg="vMaster not found in vcs-summary")
-                    return vthunder
-                except (acos_errors.ACOSSystemIsBusy, acos_errors.ACOSSystemNotReady,
-                        req_exceptions.ConnectionError, req_exceptions.ReadTimeout) as e:
-                    # acos-client already wait default_axapi_timeout for these exceptions.
-                    axapi_timeout = CONF.vthunder.default_axapi_timeout
-                    attempt_wait = CONF.a10_controller_worker.amp_vcs_wait_sec
-                    if axapi_timeout > attempt_wait:
-                        attempts = attempts - (axapi_timeout / attempt_wait - 1)
-                    if attempts < 0:
-                        LOG.exception("Failed to get Master vThunder: %s", str(e))
-                        raise e
-                except Exception as e:
-                    if attempts < 0:
-                        LOG.exception("Failed to get Master vThunder: %s", str(e))
-                        raise e
-                    time.sleep(CONF.a10_controller_worker.amp_vcs_wait_sec)
+            try:
+                vcs_state = vcs_watcher.vcs_state_watcher.wait_vmaster(vthunder)
+            except (acos_errors.ACOSException, req_exceptions.ConnectionError,
+                    req_exceptions.ReadTimeout) as e:
+                LOG.exception("Failed to get Master vThunder: %s", str(e))
+                raise e
+            vthunder.ip_address = vcs_state.vmaster_ip
+            return vthunder
         else:
             return None
 
@@ -1527,44 +1632,78 @@ class GetVthunderConfByFlavor(VThunderBaseTask):
         return vthunder_config, False
 
 
-class GetListenersStats(VThunderBaseTask):
-    """Task for retrieving listener stats from vthunder"""
+class GetDeviceListenersStats(VThunderBaseTask):
+    """Task for retrieving the listener stats of all vThunders of a device
 
-    @axapi_client_decorator
-    def execute(self, vthunder):
-        try:
-            listener_stats = []
-            lb = self.loadbalancer_repo.get(db_apis.get_session(), id=vthunder.loadbalancer_id)
-            if lb.provisioning_status == constants.ACTIVE:
-                response = self.axapi_client.slb.virtual_server.stats(
-                    name=vthunder.loadbalancer_id,
-                    timeout=CONF.a10_health_manager.stats_update_timeout,
-                    max_retries=1)
-                if response:
-                    for stats in response['port-list']:
-                        listener = self.listener_repo.get(
-                            db_apis.get_session(),
-                            load_balancer_id=vthunder.loadbalancer_id,
-                            protocol_port=stats['port-number'])
-                        if listener:
-                            stats_model = data_models.ListenerStatistics(
-                                listener_id=listener.id,
-                                amphora_id=vthunder.amphora_id,
-                                bytes_in=stats['stats']['total_fwd_bytes'],
-                                bytes_out=stats['stats']['total_rev_bytes'],
-                                active_connections=stats['stats']['curr_conn'],
-                                total_connections=stats['stats']['total_conn'],
-                                request_errors=0,  # (ACOS don’t have related stats for this)
-                            )
-                            LOG.info("Listener %s / Amphora %s stats: %s",
-                                     listener.id, vthunder.amphora_id, stats_model.get_stats())
-                            listener_stats.append(stats_model)
-        except Exception as e:
-            LOG.warning("Failed to retrieve statistics for loadbalancer: %s "
-                        "due to %s", vthunder.loadbalancer_id, str(e))
+    Logs in once per device and activates each partition once, instead of
+    one aXAPI session per vThunder.
+    """
+
+    def execute(self, vthunder_list, flow_session=None):
+        listener_stats = []
+        session = a10_flow_session.get_session(flow_session)
+        lb_ids = self.loadbalancer_repo.get_active_lb_ids(
+            session, [vthunder.loadbalancer_id for vthunder in vthunder_list])
+        port_listener_maps = self.listener_repo.get_port_listener_maps(session, lb_ids)
+
+        clients = {}
+        for vthunder in vthunder_list:
+            if vthunder.loadbalancer_id in lb_ids:
+                key = (vthunder.username, vthunder.password, vthunder.axapi_version)
+                partitions = clients.setdefault(key, (vthunder, {}))[1]
+                partitions.setdefault(vthunder.partition_name, []).append(vthunder)
+
+        for login_vthunder, partitions in clients.values():
+            axapi_client = a10_utils.get_axapi_client(login_vthunder)
+            try:
+                for partition_name, vthunders in partitions.items():
+                    try:
+                        activate_partition(axapi_client, partition_name)
+                    except Exception as e:
+                        LOG.warning("Failed to retrieve statistics for partition: %s "
+                                    "due to %s", partition_name, str(e))
+                        continue
+                    for vthunder in vthunders:
+                        try:
+                            response = axapi_client.slb.virtual_server.stats(
+                                name=vthunder.loadbalancer_id,
+                                timeout=CONF.a10_health_manager.stats_update_timeout,
+                                max_retries=1)
+                            if response:
+                                listener_stats.extend(_get_listener_stats(
+                                    vthunder, response,
+                                    port_listener_maps[vthunder.loadbalancer_id]))
+                        except Exception as e:
+                            LOG.warning("Failed to retrieve statistics for loadbalancer: %s "
+                                        "due to %s", vthunder.loadbalancer_id, str(e))
+            finally:
+                try:
+                    axapi_client.session.close()
+                except Exception as e:
+                    LOG.debug("Failed to close the vThunder session: %s", str(e))
         return listener_stats
 
 
+def _get_listener_stats(vthunder, response, port_listener_map):
+    listener_stats = []
+    for stats in response['port-list']:
+        listener_id = port_listener_map.get(stats['port-number'])
+        if listener_id:
+            stats_model = data_models.ListenerStatistics(
+                listener_id=listener_id,
+                amphora_id=vthunder.amphora_id,
+                bytes_in=stats['stats']['total_fwd_bytes'],
+                bytes_out=stats['stats']['total_rev_bytes'],
+                active_connections=stats['stats']['curr_conn'],
+                total_connections=stats['stats']['total_conn'],
+                request_errors=0,  # (ACOS don’t have related stats for this)
+            )
+            LOG.info("Listener %s / Amphora %s stats: %s",
+                     listener_id, vthunder.amphora_id, stats_model.get_stats())
+            listener_stats.append(stats_model)
+    return listener_stats
+
+
 class SetVThunderHostname(VThunderBaseTask):
     """Task for retrieving listener stats from vthunder"""
 
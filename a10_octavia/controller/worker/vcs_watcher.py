@@ -0,0 +1,209 @@
+#    Copyright 2021, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from concurrent import futures
+import copy
+import threading
+import time
+
+import acos_client
+from acos_client import errors as acos_errors
+from requests import exceptions as req_exceptions
+
+from oslo_config import cfg
+from oslo_log import log as logging
+from oslo_utils import timeutils
+
+from a10_octavia.common import a10constants
+from a10_octavia.common import utils as a10_utils
+
+CONF = cfg.CONF
+LOG = logging.getLogger(__name__)
+
+
+class VCSState(object):
+    """VCS state of a vThunder pair parsed from one vcs-summary response."""
+
+    def __init__(self, vcs_summary, acos_version=None):
+        oper = vcs_summary.get('vcs-summary', {}).get('oper', {})
+        self.roles = {}
+        for member in oper.get('member-list', []):
+            role = member.get('state', '').split('(')[0]
+            ip_list = member.get('ip-list') or [{}]
+            self.roles[ip_list[0].get('ip')] = role
+        self.handshake_completed = any(
+            peer.get('vcs-handshake-completed') == 1
+            for peer in oper.get('vcs-handshake-completed-list', []))
+        self.check_handshake = (acos_version is not None and acos_client.utils.acos_version_cmp(
+            acos_version, a10constants.ACOS_5_2_1_P2) >= 0)
+
+    @property
+    def member_ips(self):
+        return [ip for ip in self.roles if ip and ip != 'N/A']
+
+    @property
+    def vmaster_ip(self):
+        for ip, role in self.roles.items():
+            if role == 'vMaster':
+                return ip
+        return None
+
+    @property
+    def ready(self):
+        if self.check_handshake:
+            return self.handshake_completed
+        roles = set(self.roles.values())
+        return 'vMaster' in roles and 'vBlade' in roles
+
+
+class VCSStateWatcher(object):
+    """Watches the VCS state of vThunder pairs for the tasks of a flow.
+
+    Both members of a pair are probed concurrently and a wait finishes as
+    soon as one of them reports the expected state. A member whose probe
+    is still running, e.g. while it reloads, is not probed again until that
+    probe returns. The last state seen is kept per member ip for
+    amp_vcs_wait_sec, so consecutive VCS ready waits reuse it instead of
+    polling again. The vMaster is always probed, as it changes on a device
+    side failover. Tasks which reload or reconfigure a member invalidate
+    the state. Each invalidation bumps the generation of the member ips,
+    and states probed before it are not recorded.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states = {}
+        self._peers = {}
+        self._generations = {}
+        self._probes = {}
+
+    def invalidate(self, ip_address):
+        with self._lock:
+            for ip in self._peers.get(ip_address, [ip_address]):
+                self._states.pop(ip, None)
+                self._generations[ip] = self._generations.get(ip, 0) + 1
+
+    def get_state(self, ip_address):
+        """Returns the state seen within amp_vcs_wait_sec for ip_address, or None."""
+        with self._lock:
+            seen = self._states.get(ip_address)
+        if seen and not seen[0].expired():
+            return seen[1]
+        return None
+
+    def _record(self, ip_address, state, generation):
+        watch = timeutils.StopWatch(
+            duration=CONF.a10_controller_worker.amp_vcs_wait_sec).start()
+        member_ips = set(state.member_ips)
+        member_ips.add(ip_address)
+        with self._lock:
+            if self._generations.get(ip_address, 0) != generation:
+                LOG.debug("Dropping VCS state of %s probed before an invalidation",
+                          ip_address)
+                return
+            for ip in member_ips:
+                self._states[ip] = (watch, state)
+                self._peers[ip] = member_ips
+
+    def _probe(self, vthunder, ip_address):
+        with self._lock:
+            generation = self._generations.get(ip_address, 0)
+        thunder = copy.copy(vthunder)
+        thunder.ip_address = ip_address
+        axapi_client = a10_utils.get_axapi_client(thunder)
+        try:
+            state = VCSState(axapi_client.system.action.get_vcs_summary_oper(),
+                             vthunder.acos_version)
+        finally:
+            try:
+                axapi_client.session.close()
+            except Exception as e:
+                LOG.debug("Failed to close the vThunder session: %s", str(e))
+        self._record(ip_address, state, generation)
+        return state
+
+    def _probe_pair(self, vthunder):
+        """Returns a probe of each member, reusing the probes still running."""
+        probes = []
+        with self._lock:
+            ips = list(self._peers.get(vthunder.ip_address, [vthunder.ip_address]))
+            executor = futures.ThreadPoolExecutor(max_workers=len(ips))
+            for ip in ips:
+                probe = self._probes.get(ip)
+                if probe is None or probe.done():
+                    probe = executor.submit(self._probe, vthunder, ip)
+                    self._probes[ip] = probe
+                probes.append(probe)
+        return executor, probes
+
+    def wait(self, vthunder, condition, use_seen=True):
+        """Waits until a member of the pair of vthunder reports condition.
+
+        :param condition: Callable of a VCSState
+        :param use_seen: Returns the state seen within amp_vcs_wait_sec when
+                         it satisfies condition, instead of probing
+        :returns: The first VCSState satisfying condition
+        :raises: The last probe error when the pair does not reach condition
+                 within amp_vcs_retries * amp_vcs_wait_sec
+        """
+        state = self.get_state(vthunder.ip_address) if use_seen else None
+        if state is not None and condition(state):
+            return state
+
+        conf = CONF.a10_controller_worker
+        watch = timeutils.StopWatch(
+            duration=conf.amp_vcs_retries * conf.amp_vcs_wait_sec).start()
+        interval = conf.amp_ready_poll_interval
+        error = None
+        while True:
+            executor, probes = self._probe_pair(vthunder)
+            waited = False
+            try:
+                for probe in futures.as_completed(probes, timeout=interval):
+                    try:
+                        state = probe.result()
+                    except (acos_errors.ACOSException, req_exceptions.ConnectionError,
+                            req_exceptions.ReadTimeout) as e:
+                        LOG.debug("VCS of vThunder %s is not ready yet: %s",
+                                  vthunder.id, str(e))
+                        error = e
+                        continue
+                    if condition(state):
+                        LOG.debug("VCS of vThunder %s reached the expected state after "
+                                  "%.1f seconds", vthunder.id, watch.elapsed())
+                        return state
+            except futures.TimeoutError:
+                # A member still reloading may hold its probe for a long time,
+                # it must not delay a pair whose other member answers. Its
+                # probe keeps running and is reused by the next poll.
+                waited = True
+            finally:
+                executor.shutdown(wait=False)
+
+            if watch.expired():
+                raise error or acos_errors.AxapiJsonFormatError(
+                    msg="VCS of vThunder {0} not ready".format(vthunder.id))
+            if not waited:
+                time.sleep(min(interval, watch.leftover()))
+            interval = min(interval * 2, conf.amp_vcs_wait_sec)
+
+    def wait_ready(self, vthunder):
+        return self.wait(vthunder, lambda state: state.ready)
+
+    def wait_vmaster(self, vthunder):
+        return self.wait(vthunder, lambda state: state.vmaster_ip is not None,
+                         use_seen=False)
+
+
+vcs_state_watcher = VCSStateWatcher()
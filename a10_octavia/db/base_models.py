@@ -53,7 +53,35 @@ class A10Base(models.ModelBase):
         else:
             raise NotImplementedError
 
-    def to_data_model(self, _graph_nodes=None):
+    @classmethod
+    def _get_conversion_attrs(cls):
+        """Returns the column and relationship names used by to_data_model.
+
+        The names are read from the mapper once per class and cached on it,
+        instead of walking dir() of every converted row.
+        """
+        attrs = cls.__dict__.get('_conversion_attrs')
+        if attrs is None:
+            attrs = cls._build_conversion_attrs(sa.inspect(cls))
+        return attrs
+
+    @classmethod
+    def _build_conversion_attrs(cls, mapper):
+        attrs = ([column.name for column in cls.__table__.columns],
+                 [relationship.key for relationship in mapper.relationships])
+        cls._conversion_attrs = attrs
+        return attrs
+
+    def _related_to_data_model(self, obj, _graph_nodes, relationships):
+        # If this obj is already in the graph node list, just
+        # reference it there and don't recurse.
+        ukey = self._get_unique_key(obj)
+        if ukey in _graph_nodes:
+            return _graph_nodes[ukey]
+        return obj.to_data_model(_graph_nodes=_graph_nodes,
+                                 relationships=relationships)
+
+    def to_data_model(self, _graph_nodes=None, relationships=None):
         """Converts to a data model graph.
 
         In order to make the resulting data model graph usable no matter how
@@ -64,16 +92,21 @@ class A10Base(models.ModelBase):
                              method. Should not be called from the outside.
                              Contains a dictionary of all A10Base type
                              objects in the generated graph
+        :param relationships: Names of the relationships to follow. None
+                              follows all of them and builds the complete
+                              graph, otherwise only the listed relationships
+                              of this object are converted and the related
+                              objects are converted without their own
+                              relationships.
         """
         _graph_nodes = _graph_nodes or {}
         if not self.__data_model__:
             raise NotImplementedError
+        column_names, relationship_names = self._get_conversion_attrs()
         dm_kwargs = {}
-        for column in self.__table__.columns:
-            dm_kwargs[column.name] = getattr(self, column.name)
+        for column_name in column_names:
+            dm_kwargs[column_name] = getattr(self, column_name)
 
-        attr_names = [attr_name for attr_name in dir(self)
-                      if not attr_name.startswith('_')]
         # Appending early, as any unique ID should be defined already and
         # the rest of this object will get filled out more fully later on,
         # and we need to add ourselves to the _graph_nodes before we
@@ -81,30 +114,23 @@ class A10Base(models.ModelBase):
         dm_self = self.__data_model__(**dm_kwargs)
         dm_key = self._get_unique_key(dm_self)
         _graph_nodes.update({dm_key: dm_self})
-        for attr_name in attr_names:
+
+        related_relationships = None
+        if relationships is not None:
+            relationship_names = [name for name in relationship_names
+                                  if name in relationships]
+            related_relationships = ()
+        for attr_name in relationship_names:
             attr = getattr(self, attr_name)
-            if isinstance(attr, A10Base) and attr.__class__:
-                # If this attr is already in the graph node list, just
-                # reference it there and don't recurse.
-                ukey = self._get_unique_key(attr)
-                if ukey in _graph_nodes.keys():
-                    setattr(dm_self, attr_name, _graph_nodes[ukey])
-                else:
-                    setattr(dm_self, attr_name, attr.to_data_model(
-                        _graph_nodes=_graph_nodes))
+            if isinstance(attr, A10Base):
+                setattr(dm_self, attr_name, self._related_to_data_model(
+                    attr, _graph_nodes, related_relationships))
             elif isinstance(attr, (collections.InstrumentedList, list)):
-                setattr(dm_self, attr_name, [])
-                listref = getattr(dm_self, attr_name)
-                for item in attr:
-                    if isinstance(item, A10Base) and item.__class__:
-                        ukey = self._get_unique_key(item)
-                        if ukey in _graph_nodes.keys():
-                            listref.append(_graph_nodes[ukey])
-                        else:
-                            listref.append(
-                                item.to_data_model(_graph_nodes=_graph_nodes))
-                    elif not isinstance(item, A10Base):
-                        listref.append(item)
+                setattr(dm_self, attr_name, [
+                    self._related_to_data_model(item, _graph_nodes,
+                                                related_relationships)
+                    if isinstance(item, A10Base) else item
+                    for item in attr])
         return dm_self
 
     @staticmethod
@@ -133,4 +159,9 @@ class A10Base(models.ModelBase):
         return query
 
 
+@sa.event.listens_for(A10Base, 'mapper_configured', propagate=True)
+def _cache_conversion_attrs(mapper, cls):
+    cls._build_conversion_attrs(mapper)
+
+
 BASE = declarative.declarative_base(cls=A10Base)
@@ -0,0 +1,109 @@
+#    Copyright 2021, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import contextlib
+import threading
+import weakref
+
+from oslo_log import log as logging
+from oslo_utils import excutils
+from sqlalchemy import event
+
+from octavia.db import api as db_apis
+
+LOG = logging.getLogger(__name__)
+
+
+class FlowSession(object):
+    """Database sessions shared by the tasks of one flow.
+
+    The controller worker puts one in the store of every flow it loads, so
+    tasks get it as their flow_session argument. get_session() returns one
+    session per thread, as tasks of a parallel flow may run concurrently,
+    and unit_of_work() a session which commits all its updates in a single
+    transaction. Sessions and SQL statements are counted for the flow.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.stats = {'sessions': 0, 'statements': 0}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._sessions = []
+        self._connections = weakref.WeakSet()
+
+    def _count_statement(self, *args, **kwargs):
+        with self._lock:
+            self.stats['statements'] += 1
+
+    def _after_begin(self, session, transaction, connection):
+        with self._lock:
+            if connection in self._connections:
+                return
+            self._connections.add(connection)
+        event.listen(connection, 'before_cursor_execute', self._count_statement)
+
+    def _new_session(self, **kwargs):
+        session = db_apis.get_session(**kwargs)
+        event.listen(session, 'after_begin', self._after_begin)
+        with self._lock:
+            self.stats['sessions'] += 1
+            self._sessions.append(session)
+        return session
+
+    def get_session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = self._new_session()
+        return session
+
+    @contextlib.contextmanager
+    def unit_of_work(self):
+        session = self._new_session(autocommit=False)
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            with excutils.save_and_reraise_exception():
+                session.rollback()
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            try:
+                session.close()
+            except Exception as e:
+                LOG.debug("Failed to close a session of flow %s: %s", self.name, str(e))
+        LOG.debug("Flow %s used %d database sessions for %d statements",
+                  self.name, self.stats['sessions'], self.stats['statements'])
+        return dict(self.stats)
+
+
+def get_session(flow_session=None):
+    """Returns the session of flow_session, or a new one without a flow."""
+    if flow_session is not None:
+        return flow_session.get_session()
+    return db_apis.get_session()
+
+
+@contextlib.contextmanager
+def unit_of_work(flow_session=None):
+    """Yields a session whose updates are committed in one transaction."""
+    if flow_session is not None:
+        with flow_session.unit_of_work() as session:
+            yield session
+    else:
+        with db_apis.get_lock_session() as session:
+            yield session
@@ -0,0 +1,55 @@
+"""add partition_change table
+
+Revision ID: 4b8f0d2c91e7
+Revises: 6c9bb2ad7f3e
+Create Date: 2021-09-21 09:42:18.204511
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b8f0d2c91e7'
+down_revision = '6c9bb2ad7f3e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    partition_change = op.create_table(
+        'partition_change',
+        sa.Column('ip_address', sa.String(length=64), nullable=False),
+        sa.Column('partition_name', sa.String(length=14), nullable=False),
+        sa.Column('change_count', sa.Integer(), nullable=False),
+        sa.Column('written_count', sa.Integer(), nullable=False),
+        sa.Column('pending', sa.Boolean(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('ip_address', 'partition_name')
+    )
+    op.create_index('ix_partition_change_pending', 'partition_change', ['pending'])
+
+    # Partitions changed since their last write memory start out pending
+    vthunders = sa.table('vthunders',
+                         sa.column('ip_address', sa.String),
+                         sa.column('partition_name', sa.String),
+                         sa.column('role', sa.String),
+                         sa.column('status', sa.String),
+                         sa.column('updated_at', sa.DateTime),
+                         sa.column('last_write_mem', sa.DateTime))
+    changed = sa.select([vthunders.c.ip_address, vthunders.c.partition_name,
+                         sa.literal(1), sa.literal(0), sa.true(),
+                         sa.func.max(vthunders.c.updated_at)]).where(
+        sa.and_(sa.or_(vthunders.c.last_write_mem == None,  # noqa
+                       vthunders.c.updated_at >= vthunders.c.last_write_mem),
+                vthunders.c.role.in_(['STANDALONE', 'MASTER']),
+                vthunders.c.status.in_(['ACTIVE', 'DELETED']))).group_by(
+        vthunders.c.ip_address, vthunders.c.partition_name)
+    op.execute(partition_change.insert().from_select(
+        ['ip_address', 'partition_name', 'change_count', 'written_count',
+         'pending', 'updated_at'], changed))
+
+
+def downgrade():
+    op.drop_index('ix_partition_change_pending', table_name='partition_change')
+    op.drop_table('partition_change')
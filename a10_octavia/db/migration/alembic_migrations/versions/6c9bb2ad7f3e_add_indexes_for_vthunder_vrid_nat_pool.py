@@ -0,0 +1,39 @@
+"""add indexes for vthunders vrid and nat_pool lookups
+
+Revision ID: 6c9bb2ad7f3e
+Revises: 23cec8abbd48
+Create Date: 2021-09-14 10:21:37.512833
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '6c9bb2ad7f3e'
+down_revision = '23cec8abbd48'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_vthunders_ip_address_partition_name', 'vthunders',
+                    ['ip_address', 'partition_name'])
+    op.create_index('ix_vthunders_status', 'vthunders', ['status'])
+    op.create_index('ix_vthunders_loadbalancer_id', 'vthunders', ['loadbalancer_id'])
+    op.create_index('ix_vthunders_project_id_role', 'vthunders', ['project_id', 'role'])
+    op.create_index('ix_vthunders_compute_id', 'vthunders', ['compute_id'])
+    op.create_index('ix_vthunders_health_state_last_udp_update', 'vthunders',
+                    ['health_state', 'last_udp_update'])
+    op.create_index('ix_vrid_owner', 'vrid', ['owner'])
+    op.create_index('ix_nat_pool_subnet_id', 'nat_pool', ['subnet_id'])
+
+
+def downgrade():
+    op.drop_index('ix_nat_pool_subnet_id', table_name='nat_pool')
+    op.drop_index('ix_vrid_owner', table_name='vrid')
+    op.drop_index('ix_vthunders_health_state_last_udp_update', table_name='vthunders')
+    op.drop_index('ix_vthunders_compute_id', table_name='vthunders')
+    op.drop_index('ix_vthunders_project_id_role', table_name='vthunders')
+    op.drop_index('ix_vthunders_loadbalancer_id', table_name='vthunders')
+    op.drop_index('ix_vthunders_status', table_name='vthunders')
+    op.drop_index('ix_vthunders_ip_address_partition_name', table_name='vthunders')
@@ -27,6 +27,14 @@ from octavia.i18n import _
 class VThunder(base_models.BASE):
     __data_model__ = data_models.VThunder
     __tablename__ = 'vthunders'
+    __table_args__ = (
+        sa.Index('ix_vthunders_ip_address_partition_name', 'ip_address', 'partition_name'),
+        sa.Index('ix_vthunders_status', 'status'),
+        sa.Index('ix_vthunders_loadbalancer_id', 'loadbalancer_id'),
+        sa.Index('ix_vthunders_project_id_role', 'project_id', 'role'),
+        sa.Index('ix_vthunders_compute_id', 'compute_id'),
+        sa.Index('ix_vthunders_health_state_last_udp_update', 'health_state', 'last_udp_update'),
+    )
 
     id = sa.Column(sa.Integer, primary_key=True)
     vthunder_id = sa.Column(sa.String(36), nullable=False)
@@ -60,6 +68,9 @@ class VThunder(base_models.BASE):
 class VRID(base_models.BASE):
     __data_model__ = data_models.VRID
     __tablename__ = 'vrid'
+    __table_args__ = (
+        sa.Index('ix_vrid_owner', 'owner'),
+    )
 
     id = sa.Column(sa.String(36), primary_key=True)
     owner = sa.Column(sa.String(36), nullable=False)
@@ -74,6 +85,7 @@ class NATPool(base_models.BASE):
     __tablename__ = 'nat_pool'
     __table_args__ = (
         sa.UniqueConstraint('name', 'subnet_id', name='unique_name_subnet_id'),
+        sa.Index('ix_nat_pool_subnet_id', 'subnet_id'),
     )
     id = sa.Column(sa.String(64), primary_key=True)
     name = sa.Column(sa.String(64), nullable=False)
@@ -93,3 +105,22 @@ class VrrpSet(base_models.BASE):
     mgmt_subnet = sa.Column(sa.String(64), primary_key=True)
     project_id = sa.Column(sa.String(64), primary_key=True)
     set_id = sa.Column(sa.Integer, default=0, nullable=False)
+
+
+class PartitionChange(base_models.BASE):
+    """Journal of config changes per thunder partition.
+
+    Config changing flows bump change_count, write memory copies the count it
+    saved into written_count. pending is set while the two differ.
+    """
+    __data_model__ = data_models.PartitionChange
+    __tablename__ = 'partition_change'
+    __table_args__ = (
+        sa.Index('ix_partition_change_pending', 'pending'),
+    )
+    ip_address = sa.Column(sa.String(64), primary_key=True)
+    partition_name = sa.Column(sa.String(14), primary_key=True)
+    change_count = sa.Column(sa.Integer, default=0, nullable=False)
+    written_count = sa.Column(sa.Integer, default=0, nullable=False)
+    pending = sa.Column(sa.Boolean(), default=False, nullable=False)
+    updated_at = sa.Column(u'updated_at', sa.DateTime(), nullable=True)
@@ -16,10 +16,13 @@
 import datetime
 
 from oslo_config import cfg
+from oslo_db import exception as db_exception
 from oslo_log import log as logging
 from sqlalchemy.orm import noload
 from sqlalchemy import or_
 from sqlalchemy import and_
+from sqlalchemy import exists
+from sqlalchemy import func
 
 from octavia.common import constants as consts
 from octavia.db import models as base_models
@@ -32,6 +35,29 @@ CONF = cfg.CONF
 
 LOG = logging.getLogger(__name__)
 
+# Upper bound of ids bound into one DELETE ... WHERE id IN (...) statement
+DELETE_CHUNK_SIZE = 500
+
+
+def delete_in_chunks(session, model_class, column, values, chunk_size=DELETE_CHUNK_SIZE):
+    """Deletes the rows whose column is in values with set based statements.
+
+    :param session: A Sql Alchemy database session.
+    :param model_class: Model of the table to delete from.
+    :param column: Model column matched against values.
+    :param values: Values of the rows to delete.
+    :param chunk_size: Number of values bound into each statement.
+    :returns: Number of rows deleted
+    """
+    values = list(values)
+    count = 0
+    for start in range(0, len(values), chunk_size):
+        with session.begin(subtransactions=True):
+            count += session.query(model_class).filter(
+                column.in_(values[start:start + chunk_size])).delete(
+                synchronize_session=False)
+    return count
+
 
 class BaseRepository(object):
     model_class = None
@@ -62,20 +88,19 @@ class BaseRepository(object):
 
         :param session: A Sql Alchemy database session.
         :param filters: Filters to decide which entity should be deleted.
-        :returns: None
-        :raises: sqlalchemy.orm.exc.NoResultFound
+        :returns: Number of rows deleted
         """
-        models = session.query(self.model_class).filter_by(**filters).all()
-        for model in models:
-            with session.begin(subtransactions=True):
-                session.delete(model)
-                session.flush()
+        with session.begin(subtransactions=True):
+            count = session.query(self.model_class).filter_by(**filters).delete(
+                synchronize_session=False)
+        return count
 
     def delete_batch(self, session, ids=None):
-        """Batch deletes by entity ids."""
-        ids = ids or []
-        for id in ids:
-            self.delete(session, id=id)
+        """Batch deletes by entity ids.
+
+        :returns: Number of rows deleted
+        """
+        return delete_in_chunks(session, self.model_class, self.model_class.id, ids or [])
 
     def update(self, session, id, **model_kwargs):
         """Updates an entity in the database.
@@ -167,32 +192,64 @@ class BaseRepository(object):
 
         expiry_time = datetime.datetime.utcnow() - exp_age
 
-        query = session.query(self.model_class).filter(
+        query = session.query(self.model_class.id).filter(
             self.model_class.updated_at < expiry_time)
         if hasattr(self.model_class, 'status'):
             query = query.filter_by(status=consts.DELETED)
         else:
             query = query.filter_by(provisioning_status=consts.DELETED)
-        # Do not load any relationship
-        query = query.options(noload('*'))
-        model_list = query.all()
 
-        id_list = [model.id for model in model_list]
+        id_list = [model.id for model in query]
         return id_list
 
 
 class VThunderRepository(BaseRepository):
     model_class = models.VThunder
 
-    def get_recently_updated_thunders(self, session):
+    def _query_fields(self, session, fields=None):
+        """Query only the given vthunder columns instead of full rows.
+
+        :param fields: Column names to load, defaults to the id only
+        :returns: A query yielding named tuples of the requested columns
+        """
+        fields = fields or ('id',)
+        return session.query(*[getattr(self.model_class, field) for field in fields])
+
+    @staticmethod
+    def _fields_result(query, fields=None):
+        if fields is None:
+            return [row.id for row in query]
+        return query.all()
+
+    def get_thunders_by_partitions(self, session, partitions):
+        """Gets the thunders write memory runs for on the given partitions.
+
+        :param partitions: (ip_address, partition_name) tuples
+        """
+        partitions = set(partitions)
+        if not partitions:
+            return []
         query = session.query(self.model_class).filter(
-            or_(self.model_class.updated_at >= self.model_class.last_write_mem,
-                self.model_class.last_write_mem == None)).filter(
+            self.model_class.ip_address.in_(set(ip for ip, _ in partitions))).filter(
             or_(self.model_class.role == "STANDALONE",
                 self.model_class.role == "MASTER")).filter(
             or_(self.model_class.status == 'ACTIVE', self.model_class.status == 'DELETED'))
         query = query.options(noload('*'))
-        return query.all()
+        return [thunder for thunder in query.all()
+                if (thunder.ip_address, thunder.partition_name) in partitions]
+
+    def get_partitions_in_use(self, session, partitions):
+        """Gets the partitions which have thunders of any status or role.
+
+        :param partitions: (ip_address, partition_name) tuples
+        """
+        partitions = set(partitions)
+        if not partitions:
+            return set()
+        query = session.query(self.model_class.ip_address,
+                              self.model_class.partition_name).filter(
+            self.model_class.ip_address.in_(set(ip for ip, _ in partitions))).distinct()
+        return partitions.intersection(query.all())
 
     def get_stale_vthunders(self, session, initial_setup_wait_time, failover_wait_time):
         model = session.query(self.model_class).filter(
@@ -205,7 +262,12 @@ class VThunderRepository(BaseRepository):
             return None
         return model.to_data_model()
 
-    def get_compute_vthunders(self, session, compute_id):
+    def get_compute_vthunders(self, session, compute_id, fields=None):
+        if fields is not None:
+            query = self._query_fields(session, fields).filter(
+                self.model_class.compute_id == compute_id)
+            return query.all()
+
         vthunder_list = []
         query = session.query(self.model_class).filter(
             self.model_class.compute_id == compute_id)
@@ -276,26 +338,27 @@ class VThunderRepository(BaseRepository):
 
         return model.to_data_model()
 
-    def get_vthunders_by_project_id(self, session, project_id):
-        model_list = session.query(self.model_class).filter(
+    def get_vthunders_by_project_id(self, session, project_id, fields=None):
+        """Returns the active vthunder ids, or rows of fields, of a project"""
+        query = self._query_fields(session, fields).filter(
             self.model_class.project_id == project_id).filter(
             and_(self.model_class.status == "ACTIVE",
                  or_(self.model_class.role == "STANDALONE",
                      self.model_class.role == "MASTER")))
-        id_list = [model.id for model in model_list]
-        return id_list
+        return self._fields_result(query, fields)
 
-    def get_vthunders_by_ip_address(self, session, ip_address, vthunders=False):
-        model_list = session.query(self.model_class).filter(
-            self.model_class.ip_address == ip_address).filter(
+    def get_vthunders_by_ip_address(self, session, ip_address, vthunders=False, fields=None):
+        conditions = (
+            self.model_class.ip_address == ip_address,
             and_(self.model_class.status == "ACTIVE",
                  or_(self.model_class.role == "STANDALONE",
                      self.model_class.role == "MASTER")))
 
         if vthunders == False:
-            id_list = [model.id for model in model_list]
-            return id_list
+            query = self._query_fields(session, fields).filter(*conditions)
+            return self._fields_result(query, fields)
         else:
+            model_list = session.query(self.model_class).filter(*conditions)
             model_list = model_list.options(noload('*'))
             return model_list.all()
 
@@ -320,7 +383,7 @@ class VThunderRepository(BaseRepository):
             return False
 
     def get_vthunder_from_src_addr(self, session, srcaddr):
-        model = session.query(self.model_class).filter(
+        model = session.query(self.model_class.id).filter(
             self.model_class.status != "DELETED").filter(
             self.model_class.ip_address == srcaddr).first()
 
@@ -328,9 +391,20 @@ class VThunderRepository(BaseRepository):
             return None
         return model.id
 
-    def get_spare_vthunder(self, session):
-        model = session.query(self.model_class).filter(
-            self.model_class.status == "READY").first()
+    def get_spare_vthunder(self, session, project_id=None):
+        """Returns a READY spare vthunder usable by the project.
+
+        Spares warmed for the project are preferred over cold ones, spares
+        warmed for another project are never returned.
+        """
+        query = session.query(self.model_class).filter(
+            self.model_class.status == "READY")
+        if project_id:
+            query = query.filter(or_(self.model_class.project_id == None,
+                                     self.model_class.project_id == project_id))
+        else:
+            query = query.filter(self.model_class.project_id == None)
+        model = query.order_by(self.model_class.project_id.is_(None)).first()
 
         if not model:
             return None
@@ -347,6 +421,11 @@ class VThunderRepository(BaseRepository):
 
         return count
 
+    def get_spare_vthunders(self, session):
+        model_list = session.query(self.model_class).filter_by(
+            status="READY", loadbalancer_id=None).all()
+        return [model.to_data_model() for model in model_list]
+
     def get_busy_spare_vthunder_count(self, session):
         with session.begin(subtransactions=True):
             count = session.query(self.model_class).filter_by(
@@ -354,22 +433,50 @@ class VThunderRepository(BaseRepository):
 
         return count
 
+    def get_booting_spare_vthunder_count(self, session):
+        with session.begin(subtransactions=True):
+            count = session.query(self.model_class).filter_by(
+                status="BOOTING", loadbalancer_id=None).count()
+
+        return count
+
+    def claim_spare_vthunder(self, session, new_status, vthunder_id=None):
+        """Moves one READY spare vthunder to new_status so nothing else takes it.
+
+        Spares warmed for a project are claimed before cold ones, which stay
+        usable by every project.
+
+        :param vthunder_id: Claims this spare instead of any READY one
+        """
+        with session.begin(subtransactions=True):
+            query = session.query(self.model_class).filter_by(
+                status="READY", loadbalancer_id=None)
+            if vthunder_id:
+                query = query.filter_by(id=vthunder_id)
+            model = query.order_by(self.model_class.project_id.is_(None)).first()
+            if not model:
+                return None
+            count = session.query(self.model_class).filter_by(
+                id=model.id, status="READY").update(
+                {'status': new_status}, synchronize_session=False)
+        if not count:
+            return None
+        session.refresh(model)
+        return model.to_data_model()
+
     def get_all_deleted_expiring(self, session, exp_age):
 
         expiry_time = datetime.datetime.utcnow() - exp_age
 
-        query = session.query(self.model_class).filter(
+        query = session.query(self.model_class.id).filter(
             self.model_class.updated_at < expiry_time)
         if hasattr(self.model_class, 'status'):
             query = query.filter(or_(self.model_class.status == "USED_SPARE",
                                      self.model_class.status == consts.DELETED))
         else:
             query = query.filter_by(operating_status=consts.DELETED)
-        # Do not load any relationship
-        query = query.options(noload('*'))
-        model_list = query.all()
 
-        id_list = [model.id for model in model_list]
+        id_list = [model.id for model in query]
         return id_list
 
     def get_project_list_using_partition(self, session, partition_name, ip_address):
@@ -387,6 +494,15 @@ class VThunderRepository(BaseRepository):
             session.query(self.model_class).filter_by(
                     ip_address=ip_address, partition_name=partition).update(model_kwargs)
 
+    def update_last_write_mem_bulk(self, session, ip_address, partitions, **model_kwargs):
+        if not partitions:
+            return 0
+        with session.begin(subtransactions=True):
+            return session.query(self.model_class).filter(
+                self.model_class.ip_address == ip_address,
+                self.model_class.partition_name.in_(list(partitions))).update(
+                model_kwargs, synchronize_session=False)
+
     def get_vthunder_by_project_id_and_role(self, session, project_id, role):
         model = session.query(self.model_class).filter(
             self.model_class.project_id == project_id).filter(
@@ -398,24 +514,20 @@ class VThunderRepository(BaseRepository):
 
         return model.to_data_model()
 
-    def get_vthunders_by_project_id_and_role(self, session, project_id, role):
-        model_list = session.query(self.model_class).filter(
+    def get_vthunders_by_project_id_and_role(self, session, project_id, role, fields=None):
+        query = self._query_fields(session, fields).filter(
             self.model_class.project_id == project_id).filter(
             and_(self.model_class.status == "ACTIVE",
                  self.model_class.role == role))
+        return self._fields_result(query, fields)
 
-        id_list = [model.id for model in model_list]
-        return id_list
-
-    def get_rack_vthunders_by_ip_address(self, session, ip_address):
-        model_list = session.query(self.model_class).filter(
+    def get_rack_vthunders_by_ip_address(self, session, ip_address, fields=None):
+        query = self._query_fields(session, fields).filter(
             self.model_class.ip_address == ip_address).filter(
             and_(self.model_class.role == "MASTER",
                  or_(self.model_class.status == "ACTIVE",
                      self.model_class.status == "PENDING_DELETE")))
-
-        id_list = [model.id for model in model_list]
-        return id_list
+        return self._fields_result(query, fields)
 
     def get_lb_count_vthunder_partition(self, session, ip_address, partition):
         status_list = ["ACTIVE", "PENDING_UPDATE"]
@@ -437,6 +549,41 @@ class LoadBalancerRepository(repo.LoadBalancerRepository):
             lb_list.append(data.to_data_model())
         return lb_list
 
+    def get_active_lbs_by_thunders(self, session, vthunders):
+        lb_ids = set(vthunder.loadbalancer_id for vthunder in vthunders
+                     if vthunder.loadbalancer_id)
+        lbs = {}
+        if lb_ids:
+            query = session.query(self.model_class).filter(
+                and_(self.model_class.id.in_(lb_ids),
+                     self.model_class.provisioning_status == consts.ACTIVE))
+            for data in query.all():
+                lbs[data.id] = data.to_data_model()
+
+        lbs_by_thunder = {}
+        for vthunder in vthunders:
+            lb = lbs.get(vthunder.loadbalancer_id)
+            lbs_by_thunder[vthunder.id] = [lb] if lb else []
+        return lbs_by_thunder
+
+    def get_active_lb_ids(self, session, lb_ids):
+        """Returns the ids among lb_ids of load balancers in ACTIVE state."""
+        if not lb_ids:
+            return set()
+        query = session.query(self.model_class.id).filter(
+            and_(self.model_class.id.in_(list(lb_ids)),
+                 self.model_class.provisioning_status == consts.ACTIVE))
+        return {row.id for row in query}
+
+    def update_provisioning_status_bulk(self, session, lb_ids, provisioning_status):
+        if not lb_ids:
+            return 0
+        with session.begin(subtransactions=True):
+            return session.query(self.model_class).filter(
+                self.model_class.id.in_(list(lb_ids))).update(
+                {'provisioning_status': provisioning_status},
+                synchronize_session=False)
+
     def get_lb_count_by_subnet(self, session, project_ids, subnet_id):
         return session.query(self.model_class).join(base_models.Vip).filter(
             and_(self.model_class.project_id.in_(project_ids),
@@ -474,6 +621,14 @@ class LoadBalancerRepository(repo.LoadBalancerRepository):
         else:
             return True
 
+    def check_lbs_in_status(self, session, lb_ids, status_list):
+        if not lb_ids:
+            return False
+        count = session.query(self.model_class.id).filter(
+            and_(self.model_class.id.in_(lb_ids),
+                 self.model_class.provisioning_status.in_(status_list))).count()
+        return count > 0
+
     def get_lbs_by_project_id(self, session, project_id):
         lb_list = []
         query = session.query(self.model_class).filter(
@@ -520,6 +675,15 @@ class LoadBalancerRepository(repo.LoadBalancerRepository):
             return None
         return model.to_data_model()
 
+    def get_vip_subnet_usage(self, session):
+        """Returns (project_id, subnet_id, count) of the VIP subnets of active lbs."""
+        lb_count = func.count(self.model_class.id)
+        return session.query(self.model_class.project_id, base_models.Vip.subnet_id,
+                             lb_count).join(base_models.Vip).filter(
+            self.model_class.provisioning_status == consts.ACTIVE).group_by(
+            self.model_class.project_id, base_models.Vip.subnet_id).order_by(
+            lb_count.desc()).all()
+
     def get_pending_lbs_to_be_deleted(self, session, cleanup_interval):
         lb_list = []
         time_interval = datetime.datetime.utcnow() - datetime.timedelta(
@@ -548,6 +712,17 @@ class ListenerRepository(repo.ListenerRepository):
             return None
         return model.to_data_model()
 
+    def get_port_listener_maps(self, session, load_balancer_ids):
+        """Returns the listener ids by protocol port of many load balancers."""
+        port_listener_maps = {lb_id: {} for lb_id in load_balancer_ids}
+        if port_listener_maps:
+            rows = session.query(self.model_class.load_balancer_id,
+                                 self.model_class.protocol_port, self.model_class.id).filter(
+                self.model_class.load_balancer_id.in_(list(port_listener_maps)))
+            for row in rows:
+                port_listener_maps[row.load_balancer_id][row.protocol_port] = row.id
+        return port_listener_maps
+
 
 class VRIDRepository(BaseRepository):
     model_class = models.VRID
@@ -663,6 +838,16 @@ class MemberRepository(repo.MemberRepository):
             return None
         return model.to_data_model()
 
+    def get_member_subnet_usage(self, session):
+        """Returns (project_id, subnet_id, count) of the subnets of active members."""
+        member_count = func.count(self.model_class.id)
+        return session.query(self.model_class.project_id, self.model_class.subnet_id,
+                             member_count).filter(
+            and_(self.model_class.subnet_id != None,
+                 self.model_class.provisioning_status == consts.ACTIVE)).group_by(
+            self.model_class.project_id, self.model_class.subnet_id).order_by(
+            member_count.desc()).all()
+
     def get_members_by_project_id(self, session, project_id):
         member_list = []
         query = session.query(self.model_class).filter(
@@ -692,13 +877,149 @@ class VrrpSetRepository(BaseRepository):
         set_id_list = [model.set_id for model in model_list]
         return set_id_list
 
+
+class PartitionChangeRepository(BaseRepository):
+    model_class = models.PartitionChange
+
+    def _increment(self, session, ip_address, partition_name):
+        return session.query(self.model_class).filter_by(
+            ip_address=ip_address, partition_name=partition_name).update(
+            {'change_count': self.model_class.change_count + 1, 'pending': True,
+             'updated_at': datetime.datetime.utcnow()}, synchronize_session=False)
+
+    def bump(self, session, ip_address, partition_name):
+        """Records a config change which is pending write memory on a partition."""
+        try:
+            with session.begin(subtransactions=True):
+                if self._increment(session, ip_address, partition_name):
+                    return
+                session.add(self.model_class(
+                    ip_address=ip_address, partition_name=partition_name,
+                    change_count=1, written_count=0, pending=True,
+                    updated_at=datetime.datetime.utcnow()))
+        except db_exception.DBDuplicateEntry:
+            # Another flow recorded the first change of the partition meanwhile
+            with session.begin(subtransactions=True):
+                self._increment(session, ip_address, partition_name)
+
+    def get_pending(self, session):
+        """Gets the change_count of partitions pending write memory.
+
+        :returns: dict of (ip_address, partition_name) to change_count
+        """
+        query = session.query(self.model_class.ip_address,
+                              self.model_class.partition_name,
+                              self.model_class.change_count).filter(
+            self.model_class.pending == True)  # noqa
+        return {(ip_address, partition_name): change_count
+                for ip_address, partition_name, change_count in query}
+
+    def delete_unchanged(self, session, ip_address, partition_name, change_count):
+        """Deletes the journal of a partition unless it changed since change_count."""
+        with session.begin(subtransactions=True):
+            return session.query(self.model_class).filter(
+                self.model_class.ip_address == ip_address,
+                self.model_class.partition_name == partition_name,
+                self.model_class.change_count == change_count).delete(
+                synchronize_session=False)
+
+    def get_change_counts(self, session, ip_address, partitions):
+        query = session.query(self.model_class.partition_name,
+                              self.model_class.change_count).filter(
+            self.model_class.ip_address == ip_address,
+            self.model_class.partition_name.in_(list(partitions)))
+        return dict(query.all())
+
+    def mark_written(self, session, ip_address, partitions, change_counts=None):
+        """Records the changes saved by a write memory of partitions.
+
+        :param change_counts: change_count of each partition read before the
+                              write memory. Changes recorded after it stay
+                              pending. Without it all changes are written.
+        """
+        if not partitions:
+            return
+        with session.begin(subtransactions=True):
+            if change_counts is None:
+                session.query(self.model_class).filter(
+                    self.model_class.ip_address == ip_address,
+                    self.model_class.partition_name.in_(list(partitions))).update(
+                    {'written_count': self.model_class.change_count, 'pending': False},
+                    synchronize_session=False)
+                return
+            for partition_name in partitions:
+                if partition_name not in change_counts:
+                    continue
+                count = change_counts[partition_name]
+                session.query(self.model_class).filter(
+                    self.model_class.ip_address == ip_address,
+                    self.model_class.partition_name == partition_name,
+                    self.model_class.written_count < count).update(
+                    {'written_count': count,
+                     'pending': self.model_class.change_count > count},
+                    synchronize_session=False)
+
+
 class ListenerStatisticsRepository(repo.ListenerStatisticsRepository):
 
+    def replace_bulk(self, session, stats_list):
+        """Creates or overrides the statistics of many listeners at once.
+
+        Existing rows are found with one query, then updated and created
+        with one executemany statement each.
+
+        :param stats_list: List of octavia.common.data_models.ListenerStatistics
+        :returns: Number of rows written
+        """
+        if not stats_list:
+            return 0
+        rows = {}
+        for stats_obj in stats_list:
+            if not stats_obj.amphora_id:
+                # amphora_id can't be null, so clone the listener_id
+                stats_obj.amphora_id = stats_obj.listener_id
+            rows[(stats_obj.listener_id, stats_obj.amphora_id)] = stats_obj.db_fields()
+
+        with session.begin(subtransactions=True):
+            query = session.query(
+                self.model_class.listener_id, self.model_class.amphora_id).filter(
+                self.model_class.listener_id.in_({key[0] for key in rows}))
+            existing = {(row.listener_id, row.amphora_id) for row in query}
+            updates = [row for key, row in rows.items() if key in existing]
+            inserts = [row for key, row in rows.items() if key not in existing]
+            if updates:
+                session.bulk_update_mappings(self.model_class, updates)
+            if inserts:
+                session.bulk_insert_mappings(self.model_class, inserts)
+        return len(rows)
+
     def delete_multiple(self, session, **filters):
-        """Deletes entities from the database."""
+        """Deletes entities from the database.
 
-        models = session.query(self.model_class).filter_by(**filters).all()
-        for model in models:
-            with session.begin(subtransactions=True):
-                session.delete(model)
-                session.flush()
+        :returns: Number of rows deleted
+        """
+        with session.begin(subtransactions=True):
+            count = session.query(self.model_class).filter_by(**filters).delete(
+                synchronize_session=False)
+        return count
+
+    def delete_orphans(self, session, chunk_size=DELETE_CHUNK_SIZE):
+        """Deletes the statistics of listeners which no longer exist.
+
+        Orphaned listener ids are found with an anti-join against the
+        listener table and deleted chunk_size listeners at a time, so
+        memory stays bounded however many rows are purged.
+
+        :returns: Number of rows deleted
+        """
+        orphan_query = session.query(self.model_class.listener_id).filter(
+            ~exists().where(base_models.Listener.id == self.model_class.listener_id)).distinct()
+        count = 0
+        while True:
+            listener_ids = [row.listener_id for row in orphan_query.limit(chunk_size)]
+            if not listener_ids:
+                break
+            count += delete_in_chunks(session, self.model_class,
+                                      self.model_class.listener_id, listener_ids,
+                                      chunk_size=chunk_size)
+        return count
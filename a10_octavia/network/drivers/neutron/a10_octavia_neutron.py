@@ -12,6 +12,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import ipaddress
+import threading
+import time
+
 from neutronclient.common import exceptions as neutron_client_exceptions
 from oslo_config import cfg
 from oslo_log import log as logging
@@ -32,6 +36,48 @@ LOG = logging.getLogger(__name__)
 CONF = cfg.CONF
 
 
+class OctaviaPortIndex(object):
+    """Short lived index of Octavia owned ports keyed by fixed ip address.
+
+    Used when neutron can't filter ports by fixed ip, so a single port
+    listing is shared by all lookups made within the ttl. Ports may be
+    created by other workers, so a miss lists the ports again before
+    reporting the address as not found.
+    """
+
+    def __init__(self, ttl=a10constants.OCTAVIA_PORT_INDEX_TTL):
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._index = {}
+        self._expires_at = 0
+
+    def _rebuild(self, list_ports):
+        index = {}
+        for port in list_ports():
+            for fixed_ip in port.get('fixed_ips', []):
+                if fixed_ip.get('ip_address'):
+                    index[fixed_ip['ip_address']] = port['id']
+        self._index = index
+        self._expires_at = time.time() + self._ttl
+
+    def get(self, ip_address, list_ports):
+        with self._lock:
+            rebuilt = False
+            if time.time() >= self._expires_at:
+                self._rebuild(list_ports)
+                rebuilt = True
+            port_id = self._index.get(ip_address)
+            if port_id is None and not rebuilt:
+                self._rebuild(list_ports)
+                port_id = self._index.get(ip_address)
+            return port_id
+
+    def invalidate(self):
+        with self._lock:
+            self._index = {}
+            self._expires_at = 0
+
+
 class A10OctaviaNeutronDriver(aap.AllowedAddressPairsDriver):
 
     def __init__(self):
@@ -41,6 +87,7 @@ class A10OctaviaNeutronDriver(aap.AllowedAddressPairsDriver):
             name=CONF.controller_worker.compute_driver,
             invoke_on_load=True
         ).driver
+        self._port_index = OctaviaPortIndex()
 
     def _port_to_parent_port(self, port):
         fixed_ips = [n_data_models.FixedIP(subnet_id=fixed_ip.get('subnet_id'),
@@ -174,7 +221,10 @@ class A10OctaviaNeutronDriver(aap.AllowedAddressPairsDriver):
         return filtered_ports
 
     def _get_ports_by_security_group(self, sec_grp_id):
-        all_ports = self.neutron_client.list_ports()
+        if self._check_extension_enabled(a10constants.SEC_GRP_FILTER_EXT_ALIAS):
+            all_ports = self.neutron_client.list_ports(security_groups=[sec_grp_id])
+        else:
+            all_ports = self.neutron_client.list_ports()
         filtered_ports = []
         for port in all_ports.get('ports', []):
             if sec_grp_id in port.get('security_groups', []):
@@ -254,6 +304,7 @@ class A10OctaviaNeutronDriver(aap.AllowedAddressPairsDriver):
             if fixed_ip:
                 port['port']['fixed_ips'][0]['ip_address'] = fixed_ip
             new_port = self.neutron_client.create_port(port)
+            self._port_index.invalidate()
         except Exception:
             message = "Error creating port in network: {0}".format(network_id)
             LOG.exception(message)
@@ -263,23 +314,47 @@ class A10OctaviaNeutronDriver(aap.AllowedAddressPairsDriver):
     def delete_port(self, port_id):
         try:
             self.neutron_client.delete_port(port_id)
+            self._port_index.invalidate()
         except neutron_client_exceptions.PortNotFoundClient:
             pass
         except Exception:
             message = "Error deleting port: {0}".format(port_id)
             LOG.exception(message)
 
+    def _build_subnet_addresses_port(self, subnet, addr_list):
+        port = {'name': 'octavia-port-' + subnet.network_id,
+                'network_id': subnet.network_id,
+                'admin_state_up': True,
+                'device_owner': a10constants.OCTAVIA_OWNER,
+                'fixed_ips': []}
+        for addr in addr_list:
+            fixed_ip = {'subnet_id': subnet.id, 'ip_address': addr}
+            port['fixed_ips'].append(fixed_ip)
+        return port
+
+    def _add_allowed_address_pairs_to_amphorae(self, amphorae, network_ips):
+        """Add allowed address pairs with one port update per amphora interface.
+
+        :param amphorae: amphorae whose plugged interfaces get the addresses
+        :param network_ips: dict of network id to the ip addresses to allow
+        """
+        aap_ips = {}
+        for amphora in filter(
+                lambda amp: amp.status == constants.AMPHORA_ALLOCATED,
+                amphorae):
+            for network_id, ip_list in network_ips.items():
+                interface = self._get_plugged_interface(
+                    amphora.compute_id, network_id, amphora.lb_network_ip)
+                if interface is None:
+                    raise exceptions.InterfaceNotFound(amphora.compute_id, network_id)
+                aap_ips.setdefault(interface.port_id, []).extend(ip_list)
+        for port_id, ip_list in aap_ips.items():
+            self._add_allowed_address_pair_to_port(port_id, ip_list)
+
     def reserve_subnet_addresses(self, subnet_id, addr_list, amphorae):
         subnet = self.get_subnet(subnet_id)
         try:
-            port = {'port': {'name': 'octavia-port-' + subnet.network_id,
-                             'network_id': subnet.network_id,
-                             'admin_state_up': True,
-                             'device_owner': a10constants.OCTAVIA_OWNER,
-                             'fixed_ips': []}}
-            for addr in addr_list:
-                fixed_ip = {'subnet_id': subnet_id, 'ip_address': addr}
-                port['port']['fixed_ips'].append(fixed_ip)
+            port = {'port': self._build_subnet_addresses_port(subnet, addr_list)}
             new_port = self.neutron_client.create_port(port)
             new_port = utils.convert_port_dict_to_model(new_port)
             if amphorae is not None:
@@ -294,6 +369,42 @@ class A10OctaviaNeutronDriver(aap.AllowedAddressPairsDriver):
             raise e
         return new_port
 
+    def reserve_subnet_addresses_bulk(self, subnet_ids, addr_list, amphorae):
+        """Reserve the same addresses on several subnets with one bulk port create.
+
+        Subnets whose cidr doesn't contain the addresses are skipped.
+
+        :returns: dict of subnet id to the port holding its addresses
+        """
+        subnets = []
+        for subnet_id in subnet_ids:
+            subnet = self.get_subnet(subnet_id)
+            cidr = ipaddress.ip_network(subnet.cidr)
+            if all(ipaddress.ip_address(addr) in cidr for addr in (addr_list[0], addr_list[-1])):
+                subnets.append(subnet)
+        if not subnets:
+            return {}
+        new_ports = []
+        try:
+            ports = {'ports': [self._build_subnet_addresses_port(subnet, addr_list)
+                               for subnet in subnets]}
+            new_ports = self.neutron_client.create_port(ports)
+            new_ports = [utils.convert_port_dict_to_model(new_port)
+                         for new_port in new_ports['ports']]
+            if amphorae is not None:
+                network_ips = {}
+                for subnet in subnets:
+                    network_ips.setdefault(subnet.network_id, []).extend(addr_list)
+                self._add_allowed_address_pairs_to_amphorae(amphorae, network_ips)
+        except Exception as e:
+            LOG.exception(str(e))
+            # the callers only revert the ports they got back
+            for new_port in new_ports:
+                self.delete_port(new_port.id)
+            raise e
+        self._port_index.invalidate()
+        return dict(zip([subnet.id for subnet in subnets], new_ports))
+
     def release_subnet_addresses(self, subnet_id, addr_list, amphorae):
         try:
             subnet = self.get_subnet(subnet_id)
@@ -308,24 +419,34 @@ class A10OctaviaNeutronDriver(aap.AllowedAddressPairsDriver):
             LOG.exception(str(e))
             raise e
 
+    def _list_octavia_ports(self):
+        ports = self.neutron_client.list_ports(device_owner=a10constants.OCTAVIA_OWNER)
+        return ports.get('ports', []) if ports else []
+
     def get_port_id_from_ip(self, ip):
         try:
-            ports = self.neutron_client.list_ports(device_owner=a10constants.OCTAVIA_OWNER)
+            ports = self.neutron_client.list_ports(
+                device_owner=a10constants.OCTAVIA_OWNER,
+                fixed_ips=['ip_address={}'.format(ip)])
             if not ports or not ports.get('ports'):
                 return None
             for port in ports['ports']:
-                if port.get('fixed_ips'):
-                    fixed_ips = port['fixed_ips']
-                    for ipaddr in fixed_ips:
-                        if ipaddr.get('ip_address') == ip:
-                            return port['id']
+                for ipaddr in port.get('fixed_ips', []):
+                    if ipaddr.get('ip_address') == ip:
+                        return port['id']
+            return None
         except (neutron_client_exceptions.NotFound,
                 neutron_client_exceptions.PortNotFoundClient):
-            pass
+            return None
+        except Exception:
+            LOG.debug('Filtered port lookup failed for ip %s, '
+                      'falling back to port index', ip)
+
+        try:
+            return self._port_index.get(ip, self._list_octavia_ports)
         except Exception:
             message = _('Error listing ports, ip {} ').format(ip)
             LOG.exception(message)
-            pass
         return None
 
     def list_networks(self):
@@ -361,8 +482,7 @@ class A10OctaviaNeutronDriver(aap.AllowedAddressPairsDriver):
         }
         self.neutron_client.update_port(port_id, aap)
 
-    def allocate_vrid_fip(self, vrid, network_id, amphorae, fixed_ip=None):
-
+    def _build_vrid_fip_port(self, vrid, network_id, fixed_ip=None):
         fixed_ip_json = {}
         if vrid.subnet_id:
             fixed_ip_json['subnet_id'] = vrid.subnet_id
@@ -376,15 +496,18 @@ class A10OctaviaNeutronDriver(aap.AllowedAddressPairsDriver):
             project_id_key = 'tenant_id'
 
         # It can be assumed that network_id exists
-        port = {'port': {'name': 'octavia-vrid-fip-' + vrid.id,
-                         'network_id': network_id,
-                         'admin_state_up': False,
-                         'device_id': 'vrid-{0}'.format(vrid.id),
-                         'device_owner': aap.OCTAVIA_OWNER,
-                         project_id_key: vrid.owner}}
+        port = {'name': 'octavia-vrid-fip-' + vrid.id,
+                'network_id': network_id,
+                'admin_state_up': False,
+                'device_id': 'vrid-{0}'.format(vrid.id),
+                'device_owner': aap.OCTAVIA_OWNER,
+                project_id_key: vrid.owner}
         if fixed_ip_json:
-            port['port']['fixed_ips'] = [fixed_ip_json]
+            port['fixed_ips'] = [fixed_ip_json]
+        return port
 
+    def allocate_vrid_fip(self, vrid, network_id, amphorae, fixed_ip=None):
+        port = {'port': self._build_vrid_fip_port(vrid, network_id, fixed_ip)}
         try:
             new_port = self.neutron_client.create_port(port)
         except Exception as e:
@@ -409,6 +532,46 @@ class A10OctaviaNeutronDriver(aap.AllowedAddressPairsDriver):
 
         return new_port
 
+    def allocate_vrid_fips(self, vrid_fips, amphorae):
+        """Bulk variant of allocate_vrid_fip.
+
+        :param vrid_fips: list of (vrid, network_id, fixed_ip) tuples
+        :param amphorae: amphorae whose interfaces get the new addresses
+        :returns: list of the new ports, in the order of vrid_fips
+        """
+        ports = {'ports': [self._build_vrid_fip_port(vrid, network_id, fixed_ip)
+                           for vrid, network_id, fixed_ip in vrid_fips]}
+        try:
+            new_ports = self.neutron_client.create_port(ports)
+        except Exception as e:
+            message = _('Error creating neutron ports on networks '
+                        '{network_ids}.').format(
+                network_ids=[network_id for _vrid, network_id, _ip in vrid_fips])
+            LOG.exception(message)
+            raise base.AllocateVIPException(
+                message,
+                orig_msg=getattr(e, 'message', None),
+                orig_code=getattr(e, 'status_code', None),
+            )
+        new_ports = [utils.convert_port_dict_to_model(new_port)
+                     for new_port in new_ports['ports']]
+
+        network_ips = {}
+        for (vrid, network_id, _ip), new_port in zip(vrid_fips, new_ports):
+            network_ips.setdefault(network_id, []).append(new_port.fixed_ips[0].ip_address)
+        if amphorae:
+            try:
+                self._add_allowed_address_pairs_to_amphorae(amphorae, network_ips)
+            except Exception:
+                # the callers only revert the ports they got back
+                LOG.exception("Failed to add the VRID floating IPs to the amphorae")
+                for new_port in new_ports:
+                    self.delete_port(new_port.id)
+                raise
+
+        self._port_index.invalidate()
+        return new_ports
+
     def allow_use_any_source_ip_on_egress(self, network_id, amphora):
         interface = self._get_plugged_interface(
             amphora.compute_id, network_id, amphora.lb_network_ip)
@@ -0,0 +1,136 @@
+#    Copyright 2021, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from oslo_config import cfg
+from oslo_config import fixture as oslo_fixture
+
+from octavia.tests.unit import base
+
+from a10_octavia.common import config_options  # noqa
+from a10_octavia.common import flavor_cache
+from a10_octavia.controller.worker.tasks import utils as a10_task_utils
+from a10_octavia.tests.common import a10constants
+
+FLAVOR_DATA = json.dumps({
+    "service-group": {
+        "name-expressions": [{
+            "regex": "^sg[0-9]+$",
+            "json": {"health-check-disable": 1}
+        }]
+    },
+    "device-name": "rack_thunder"
+})
+
+
+class TestFlavorCache(base.TestCase):
+
+    def setUp(self):
+        super(TestFlavorCache, self).setUp()
+        self.conf = self.useFixture(oslo_fixture.Config(cfg.CONF))
+        self.cache = flavor_cache.FlavorCache()
+
+    def test_update_caches_parsed_and_normalized_data(self):
+        flavor_data = self.cache.update(a10constants.MOCK_FLAVOR_ID, FLAVOR_DATA)
+        self.assertEqual('rack_thunder', flavor_data['device-name'])
+        self.assertEqual(flavor_data, self.cache.get(a10constants.MOCK_FLAVOR_ID))
+        normalized = self.cache.get_normalized(a10constants.MOCK_FLAVOR_ID)
+        self.assertEqual({"health_check_disable": 1},
+                         normalized['service_group']['name_expressions'][0]['json'])
+
+        normalized['service_group'].pop('name_expressions')
+        self.assertIn('name_expressions', self.cache.get_normalized(
+            a10constants.MOCK_FLAVOR_ID)['service_group'])
+
+    def test_update_parses_changed_data_only(self):
+        with mock.patch.object(flavor_cache.json, 'loads',
+                               side_effect=json.loads) as mock_loads:
+            self.cache.update(a10constants.MOCK_FLAVOR_ID, FLAVOR_DATA)
+            self.cache.update(a10constants.MOCK_FLAVOR_ID, FLAVOR_DATA)
+            self.assertEqual(1, mock_loads.call_count)
+            flavor_data = self.cache.update(a10constants.MOCK_FLAVOR_ID, '{"device-name": "t2"}')
+            self.assertEqual(2, mock_loads.call_count)
+        self.assertEqual({"device-name": "t2"}, flavor_data)
+
+    def test_get_expired(self):
+        self.conf.config(group=a10constants.A10_CONTROLLER_WORKER_CONF_SECTION,
+                         flavor_cache_ttl=0)
+        self.cache.update(a10constants.MOCK_FLAVOR_ID, FLAVOR_DATA)
+        self.assertIsNone(self.cache.get(a10constants.MOCK_FLAVOR_ID))
+        self.assertIsNone(self.cache.get_normalized(a10constants.MOCK_FLAVOR_ID))
+
+    def test_name_expressions_regexes_precompiled(self):
+        self.cache.update(a10constants.MOCK_FLAVOR_ID, FLAVOR_DATA)
+        with mock.patch.object(flavor_cache.re, 'compile') as mock_compile:
+            regex = self.cache.get_regex('^sg[0-9]+$')
+            mock_compile.assert_not_called()
+        self.assertTrue(regex.search('sg1'))
+
+    def test_format_keys(self):
+        expected = {"virtual_server": {"arp_disable": 1}}
+        flavor = {"virtual-server": {"arp-disable": 1}}
+        formated_flavor = flavor_cache._format_keys(flavor)
+        self.assertEqual(formated_flavor, expected)
+
+    def test_format_list_keys(self):
+        expected = {
+            "service_group": {
+                "name_expressions": [{
+                    "regex": "sg1",
+                    "json": {"health_check_disable": 1}
+                }]
+            }
+        }
+        name_expr = {
+            "name-expressions": [{
+                "regex": "sg1",
+                "json": {"health-check-disable": 1}
+            }]
+        }
+        flavor = {"service-group": name_expr}
+        formated_flavor = flavor_cache._format_keys(flavor)
+        self.assertEqual(formated_flavor, expected)
+
+    def test_format_multi_val(self):
+        expected = {
+            "service_group": {
+                "name_expressions": [{
+                    "regex": "sg1",
+                    "json": {"health_check_disable": 1}
+                }],
+                "strict_select": 0
+            }
+        }
+        name_expr = {
+            "name-expressions": [{
+                "regex": "sg1",
+                "json": {"health-check-disable": 1}
+            }]
+        }
+        flavor = {"service-group": {"strict-select": 0}}
+        flavor['service-group'].update(name_expr)
+        formated_flavor = flavor_cache._format_keys(flavor)
+        self.assertEqual(formated_flavor, expected)
+
+    def test_parse_name_expressions(self):
+        name_expressions = [{"regex": "^sg[0-9]+$", "json": {"health_check_disable": 1}}]
+        self.assertEqual({"health_check_disable": 1},
+                         a10_task_utils.parse_name_expressions('sg1', name_expressions))
+        self.assertEqual({}, a10_task_utils.parse_name_expressions('pool1', name_expressions))
@@ -14,6 +14,7 @@
 
 import copy
 import imp
+import operator
 try:
     from unittest import mock
 except ImportError:
@@ -22,6 +23,8 @@ except ImportError:
 from oslo_config import cfg
 from oslo_config import fixture as oslo_fixture
 
+from keystoneauth1.exceptions import http as keystone_exception
+
 from a10_octavia.common import config_options
 from a10_octavia.common import data_models
 from a10_octavia.common import exceptions
@@ -145,7 +148,8 @@ NAT_FLAVOR = {"pool_name": "p1", "start_address": "1.1.1.1", "end_address": "1.1
 
 
 class FakeProject(object):
-    def __init__(self, parent_id='default'):
+    def __init__(self, parent_id='default', id=None):
+        self.id = id
         self.parent_id = parent_id
 
 
@@ -224,6 +228,23 @@ class TestUtils(base.BaseTaskTestCase):
         self.assertEqual(utils.convert_to_hardware_thunder_conf(HARDWARE_INFO_WITH_HMT_ENABLED),
                          RESULT_HMT_HARDWARE_DEVICE_LIST)
 
+    def test_hardware_thunder_index(self):
+        index = utils.HardwareThunderIndex(RESULT_HARDWARE_DEVICE_LIST)
+        self.assertEqual({'project-1', 'project-2'}, set(index.by_project))
+        self.assertEqual(VTHUNDER_2_DEV, index.by_device_name['rack_thunder_2'])
+        self.assertRaises(TypeError, operator.setitem, index.by_project, 'project-3', VTHUNDER_1)
+
+    def test_get_hardware_thunder_index_rebuilt_on_change(self):
+        self.conf.conf.hardware_thunder.devices = RESULT_HARDWARE_DEVICE_LIST
+        index = utils.get_hardware_thunder_index()
+        self.assertIs(index, utils.get_hardware_thunder_index())
+        self.assertIn('rack_thunder_1', index.by_device_name)
+
+        self.conf.conf.hardware_thunder.devices = RESULT_HMT_HARDWARE_DEVICE_LIST
+        index = utils.get_hardware_thunder_index()
+        self.assertEqual({a10constants.MOCK_CHILD_PROJECT_ID}, set(index.by_project))
+        self.assertNotIn('rack_thunder_1', index.by_device_name)
+
     @mock.patch('octavia.common.keystone.KeystoneSession')
     @mock.patch('a10_octavia.common.utils.keystone_client.Client')
     def test_get_parent_project_exists(self, mock_key_client, mock_get_session):
@@ -242,6 +263,67 @@ class TestUtils(base.BaseTaskTestCase):
         mock_key_client.return_value = client_mock
         self.assertEqual(utils.get_parent_project(a10constants.MOCK_CHILD_PROJECT_ID), 'default')
 
+    @mock.patch('octavia.common.keystone.KeystoneSession')
+    @mock.patch('a10_octavia.common.utils.keystone_client.Client')
+    def test_get_parent_project_cached(self, mock_key_client, mock_get_session):
+        client_mock = mock.Mock()
+        client_mock.projects.get.return_value = FakeProject(
+            parent_id=a10constants.MOCK_PARENT_PROJECT_ID)
+        mock_key_client.return_value = client_mock
+        for _ in range(3):
+            self.assertEqual(utils.get_parent_project(a10constants.MOCK_CHILD_PROJECT_ID),
+                             a10constants.MOCK_PARENT_PROJECT_ID)
+        client_mock.projects.get.assert_called_once_with(a10constants.MOCK_CHILD_PROJECT_ID)
+
+    @mock.patch('octavia.common.keystone.KeystoneSession')
+    @mock.patch('a10_octavia.common.utils.keystone_client.Client')
+    def test_get_parent_project_not_found_cached(self, mock_key_client, mock_get_session):
+        client_mock = mock.Mock()
+        client_mock.projects.get.side_effect = keystone_exception.NotFound()
+        mock_key_client.return_value = client_mock
+        self.assertIsNone(utils.get_parent_project(a10constants.MOCK_CHILD_PROJECT_ID))
+        self.assertIsNone(utils.get_parent_project(a10constants.MOCK_CHILD_PROJECT_ID))
+        client_mock.projects.get.assert_called_once_with(a10constants.MOCK_CHILD_PROJECT_ID)
+
+    @mock.patch('octavia.common.keystone.KeystoneSession')
+    @mock.patch('a10_octavia.common.utils.keystone_client.Client')
+    def test_get_parent_project_cache_disabled(self, mock_key_client, mock_get_session):
+        self.conf.config(group=a10constants.A10_GLOBAL_CONF_SECTION,
+                         parent_project_cache_ttl=0)
+        client_mock = mock.Mock()
+        client_mock.projects.get.return_value = FakeProject()
+        mock_key_client.return_value = client_mock
+        utils.get_parent_project(a10constants.MOCK_CHILD_PROJECT_ID)
+        utils.get_parent_project(a10constants.MOCK_CHILD_PROJECT_ID)
+        self.assertEqual(2, client_mock.projects.get.call_count)
+
+    @mock.patch('octavia.common.keystone.KeystoneSession')
+    @mock.patch('a10_octavia.common.utils.keystone_client.Client')
+    def test_warm_parent_project_cache(self, mock_key_client, mock_get_session):
+        self.conf.conf.hardware_thunder.devices = {'missing-project': copy.deepcopy(VTHUNDER_1)}
+        client_mock = mock.Mock()
+        client_mock.projects.list.return_value = [
+            FakeProject(id=a10constants.MOCK_CHILD_PROJECT_ID,
+                        parent_id=a10constants.MOCK_PARENT_PROJECT_ID)]
+        mock_key_client.return_value = client_mock
+        utils.warm_parent_project_cache()
+        self.assertEqual(utils.get_parent_project(a10constants.MOCK_CHILD_PROJECT_ID),
+                         a10constants.MOCK_PARENT_PROJECT_ID)
+        self.assertIsNone(utils.get_parent_project('missing-project'))
+        client_mock.projects.get.assert_not_called()
+
+    def test_parent_projects_in_use(self):
+        self.conf.conf.hardware_thunder.devices = {'project-1': copy.deepcopy(VTHUNDER_1)}
+        self.assertFalse(utils.parent_projects_in_use())
+        self.conf.config(group=a10constants.A10_GLOBAL_CONF_SECTION, use_parent_partition=True)
+        self.assertTrue(utils.parent_projects_in_use())
+
+    def test_parent_projects_in_use_hierarchical_multitenancy(self):
+        hmt_device = copy.deepcopy(VTHUNDER_1)
+        hmt_device.hierarchical_multitenancy = 'enable'
+        self.conf.conf.hardware_thunder.devices = {'project-1': hmt_device}
+        self.assertTrue(utils.parent_projects_in_use())
+
     def test_get_net_info_from_cidr_valid(self):
         self.assertEqual(utils.get_net_info_from_cidr('10.10.10.1/32', 4),
                          ('10.10.10.1', '255.255.255.255'))
@@ -0,0 +1,332 @@
+#    Copyright 2021, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import datetime
+
+from oslo_config import cfg
+from oslo_config import fixture as oslo_fixture
+from oslo_utils import timeutils
+from sqlalchemy.orm import exc as db_exceptions
+
+from octavia.tests.unit import base
+
+from a10_octavia.common import config_options  # noqa
+from a10_octavia.controller.housekeeping import house_keeping
+from a10_octavia.tests.common import a10constants
+
+
+class TestSpareDemandForecaster(base.TestCase):
+
+    def setUp(self):
+        super(TestSpareDemandForecaster, self).setUp()
+        self.conf = self.useFixture(oslo_fixture.Config(cfg.CONF))
+        self.conf.config(group=a10constants.A10_HOUSE_KEEPING,
+                         spare_forecast_window=3600, spare_forecast_horizon=1800,
+                         spare_pool_min_size=1, spare_pool_max_size=8)
+        self.forecaster = house_keeping.SpareDemandForecaster()
+        self.now = datetime.datetime(2021, 9, 20, 9, 0)
+
+    def test_observe_counts_taken_spares(self):
+        self.assertEqual(0, self.forecaster.observe(4, self.now))
+        self.forecaster.expect(2)
+        self.assertEqual(3, self.forecaster.observe(3, self.now))
+        self.assertEqual(0, self.forecaster.observe(5, self.now))
+
+    def test_predict_recent_demand(self):
+        self.forecaster.observe(10, self.now - datetime.timedelta(minutes=50))
+        self.forecaster.observe(7, self.now - datetime.timedelta(minutes=30))
+        self.forecaster.observe(4, self.now)
+        # 6 spares taken in the last hour need 3 spares for the next half hour
+        self.assertEqual(3, self.forecaster.predict(self.now))
+        self.assertEqual(3, self.forecaster.forecast['predicted_demand'])
+
+    def test_predict_same_time_previous_day(self):
+        yesterday = self.now - datetime.timedelta(days=1)
+        self.forecaster.observe(10, yesterday - datetime.timedelta(minutes=1))
+        self.forecaster.observe(5, yesterday + datetime.timedelta(minutes=20))
+        self.forecaster.observe(5, self.now - datetime.timedelta(minutes=10))
+        self.forecaster.observe(5, self.now)
+        self.assertEqual(5, self.forecaster.predict(self.now))
+        self.assertGreater(self.forecaster.forecast['seasonal_rate'], 0)
+        self.assertEqual(0, self.forecaster.forecast['recent_rate'])
+
+    def test_predict_bounds(self):
+        self.assertEqual(1, self.forecaster.predict(self.now))
+        self.forecaster.observe(30, self.now - datetime.timedelta(minutes=10))
+        self.forecaster.observe(0, self.now)
+        self.assertEqual(8, self.forecaster.predict(self.now))
+
+
+class TestSpareAmphora(base.TestCase):
+
+    def setUp(self):
+        super(TestSpareAmphora, self).setUp()
+        self.conf = self.useFixture(oslo_fixture.Config(cfg.CONF))
+        self.conf.config(group=a10constants.A10_HOUSE_KEEPING, spare_pool_mode='adaptive',
+                         spare_boot_rate_limit=2)
+        for target in ('cw', 'db_api'):
+            patcher = mock.patch.object(house_keeping, target)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.spare_amp = house_keeping.SpareAmphora()
+        self.spare_amp.vthunder_repo = mock.Mock()
+        self.spare_amp.vthunder_repo.get_busy_spare_vthunder_count.return_value = 0
+        self.spare_amp.vthunder_repo.get_booting_spare_vthunder_count.return_value = 0
+        self.spare_amp.forecaster = mock.Mock(forecast={})
+
+    def test_adaptive_spare_check_boots_rate_limited(self):
+        self.spare_amp.vthunder_repo.get_spare_vthunder_count.return_value = 1
+        self.spare_amp.forecaster.predict.return_value = 6
+        self.spare_amp.spare_check()
+        self.assertEqual(2, self.spare_amp.cw.create_amphora.call_count)
+        self.spare_amp.forecaster.expect.assert_called_once_with(2)
+
+    def test_adaptive_spare_check_failed_boot_not_expected(self):
+        self.spare_amp.vthunder_repo.get_spare_vthunder_count.return_value = 1
+        self.spare_amp.forecaster.predict.return_value = 6
+        self.spare_amp.cw.create_amphora.side_effect = [None, Exception('No valid host')]
+        self.spare_amp.spare_check()
+        self.assertEqual(2, self.spare_amp.cw.create_amphora.call_count)
+        self.spare_amp.forecaster.expect.assert_called_once_with(1)
+
+    def test_adaptive_spare_check_deletes_idle_spare(self):
+        self.spare_amp.vthunder_repo.get_spare_vthunder_count.return_value = 4
+        self.spare_amp.forecaster.predict.return_value = 1
+        spare = mock.Mock()
+        self.spare_amp.vthunder_repo.claim_spare_vthunder.return_value = spare
+        self.spare_amp.spare_check()
+        self.spare_amp.cw.create_amphora.assert_not_called()
+        self.spare_amp.cw.delete_spare_amphora.assert_called_once_with(spare)
+        self.spare_amp.forecaster.expect.assert_called_once_with(-1)
+
+    def test_adaptive_spare_check_failed_delete_releases_spare(self):
+        self.spare_amp.vthunder_repo.get_spare_vthunder_count.return_value = 4
+        self.spare_amp.forecaster.predict.return_value = 1
+        spare = mock.Mock(id=3)
+        self.spare_amp.vthunder_repo.claim_spare_vthunder.return_value = spare
+        self.spare_amp.cw.delete_spare_amphora.side_effect = Exception('compute error')
+        self.spare_amp.spare_check()
+        self.spare_amp.vthunder_repo.set_spare_vthunder_status.assert_called_once_with(
+            mock.ANY, 3, 'READY')
+        self.assertEqual([mock.call(-1), mock.call(1)],
+                         self.spare_amp.forecaster.expect.call_args_list)
+
+    def test_adaptive_spare_check_satisfied(self):
+        self.spare_amp.vthunder_repo.get_spare_vthunder_count.return_value = 2
+        self.spare_amp.forecaster.predict.return_value = 2
+        self.assertEqual({'current': 2}, self.spare_amp.spare_check())
+        self.spare_amp.cw.create_amphora.assert_not_called()
+        self.spare_amp.cw.delete_spare_amphora.assert_not_called()
+
+    def _setup_warm_spares(self):
+        self.conf.config(group=a10constants.A10_HOUSE_KEEPING, spare_warm_network_count=2)
+        self.spare_amp.lb_repo = mock.Mock()
+        self.spare_amp.lb_repo.get_vip_subnet_usage.return_value = [
+            ('project-1', 'vip-subnet-1', 5), ('project-2', 'vip-subnet-2', 4),
+            ('project-1', 'vip-subnet-3', 1)]
+        self.spare_amp.member_repo = mock.Mock()
+        self.spare_amp.member_repo.get_member_subnet_usage.return_value = [
+            ('project-1', 'member-subnet-1', 3), ('project-1', 'vip-subnet-1', 2)]
+        self.spare_amp._network_driver = mock.Mock()
+        self.spare_amp._network_driver.get_subnet.side_effect = (
+            lambda subnet_id: mock.Mock(network_id=subnet_id.replace('subnet', 'net')))
+
+    def test_get_warm_network_ids(self):
+        self._setup_warm_spares()
+        self.assertEqual([('project-1', ['vip-net-1', 'member-net-1']),
+                          ('project-2', ['vip-net-2'])],
+                         self.spare_amp.get_warm_network_ids(mock.Mock(), 2))
+        self.spare_amp.get_warm_network_ids(mock.Mock(), 2)
+        self.assertEqual(4, self.spare_amp._network_driver.get_subnet.call_count)
+
+    def test_warm_spare_check(self):
+        self._setup_warm_spares()
+        warm_spare = mock.Mock(id=1, compute_id='compute-1', project_id='project-1')
+        cold_spares = [mock.Mock(id=2, compute_id='compute-2', project_id=None),
+                       mock.Mock(id=3, compute_id='compute-3', project_id=None)]
+        self.spare_amp.vthunder_repo.get_spare_vthunders.return_value = (
+            [warm_spare] + cold_spares)
+        self.spare_amp._network_driver.get_plugged_networks.return_value = []
+        self.spare_amp.vthunder_repo.claim_spare_vthunder.return_value = cold_spares[0]
+        self.assertEqual(cold_spares[0], self.spare_amp.warm_spare_check())
+        self.spare_amp.vthunder_repo.claim_spare_vthunder.assert_called_once_with(
+            mock.ANY, 'BUSY', vthunder_id=2)
+        self.spare_amp.vthunder_repo.update.assert_called_once_with(
+            mock.ANY, 2, project_id='project-2')
+        self.spare_amp.cw.warm_spare_amphora.assert_called_once_with(
+            cold_spares[0], ['vip-net-2'])
+
+    def test_warm_spare_check_keeps_one_cold_spare(self):
+        self._setup_warm_spares()
+        self.spare_amp.vthunder_repo.get_spare_vthunders.return_value = [
+            mock.Mock(id=2, compute_id='compute-2', project_id=None)]
+        self.assertIsNone(self.spare_amp.warm_spare_check())
+        self.spare_amp.vthunder_repo.claim_spare_vthunder.assert_not_called()
+
+    def _setup_failed_warm_spare(self):
+        self._setup_warm_spares()
+        spare = mock.Mock(id=2, compute_id='compute-2', project_id=None)
+        self.spare_amp.vthunder_repo.get_spare_vthunders.return_value = [
+            spare, mock.Mock(id=3, compute_id='compute-3', project_id=None)]
+        self.spare_amp._network_driver.get_plugged_networks.side_effect = [
+            [mock.Mock(network_id='mgmt-net')],
+            [mock.Mock(network_id='mgmt-net'), mock.Mock(network_id='vip-net-1')]]
+        self.spare_amp.vthunder_repo.claim_spare_vthunder.return_value = spare
+        self.spare_amp.cw.warm_spare_amphora.side_effect = Exception('reload failed')
+        return spare
+
+    def test_warm_spare_check_failure_releases_spare(self):
+        self._setup_failed_warm_spare()
+        self.spare_amp.warm_spare_check()
+        self.spare_amp._network_driver.unplug_network.assert_called_once_with(
+            'compute-2', 'vip-net-1')
+        self.spare_amp.vthunder_repo.update.assert_called_with(
+            mock.ANY, 2, status='READY', project_id=None)
+        self.spare_amp.cw.delete_spare_amphora.assert_not_called()
+
+    def test_warm_spare_check_failed_unplug_deletes_spare(self):
+        spare = self._setup_failed_warm_spare()
+        self.spare_amp._network_driver.unplug_network.side_effect = Exception('unplug')
+        self.spare_amp.warm_spare_check()
+        self.spare_amp.cw.delete_spare_amphora.assert_called_once_with(spare)
+        self.assertEqual(1, self.spare_amp.vthunder_repo.update.call_count)
+
+    def test_warm_spare_check_disabled(self):
+        self.assertIsNone(self.spare_amp.warm_spare_check())
+        self.spare_amp.vthunder_repo.get_spare_vthunders.assert_not_called()
+
+
+class TestPurgeEngine(base.TestCase):
+
+    def setUp(self):
+        super(TestPurgeEngine, self).setUp()
+        self.conf = self.useFixture(oslo_fixture.Config(cfg.CONF))
+        self.conf.config(group=a10constants.A10_HOUSE_KEEPING,
+                         purge_chunk_size=2, purge_chunk_interval=0)
+        self.get_expired_ids = mock.Mock(return_value=[1, 2, 3, 4, 5])
+        self.delete_ids = mock.Mock(side_effect=lambda session, ids: len(ids))
+        self.engine = house_keeping.PurgeEngine('things', self.get_expired_ids,
+                                                self.delete_ids)
+
+    def test_purge_in_chunks(self):
+        self.assertEqual(5, self.engine.purge(mock.Mock()))
+        self.assertEqual([mock.call(mock.ANY, [1, 2]), mock.call(mock.ANY, [3, 4]),
+                          mock.call(mock.ANY, [5])], self.delete_ids.call_args_list)
+        self.assertEqual(5, self.engine.stats['purged_total'])
+        self.assertEqual(3, self.engine.stats['chunks_total'])
+        self.assertEqual(0, self.engine.stats['pending'])
+
+    def test_purge_pauses_between_chunks(self):
+        stop_event = mock.Mock()
+        stop_event.is_set.return_value = False
+        self.conf.config(group=a10constants.A10_HOUSE_KEEPING, purge_chunk_interval=0.25)
+        engine = house_keeping.PurgeEngine('things', self.get_expired_ids,
+                                           self.delete_ids, stop_event)
+        engine.purge(mock.Mock())
+        self.assertEqual([mock.call(0.25), mock.call(0.25)], stop_event.wait.call_args_list)
+
+    def test_purge_resumes_after_time_limit(self):
+        watch = mock.Mock(spec=timeutils.StopWatch)
+        watch.expired.side_effect = [False, True]
+        self.assertEqual(2, self.engine.purge(mock.Mock(), watch))
+        self.assertEqual([3, 4, 5], self.engine.pending_ids)
+        self.assertEqual(3, self.engine.stats['pending'])
+
+        self.assertEqual(3, self.engine.purge(mock.Mock()))
+        self.get_expired_ids.assert_called_once_with(mock.ANY)
+        self.assertEqual(5, self.engine.stats['purged_total'])
+
+    def test_purge_nothing_expired(self):
+        self.get_expired_ids.return_value = []
+        self.assertEqual(0, self.engine.purge(mock.Mock()))
+        self.delete_ids.assert_not_called()
+
+    def test_purge_failed_chunk_not_retried(self):
+        self.delete_ids.side_effect = Exception('db error')
+        self.assertRaises(Exception, self.engine.purge, mock.Mock())
+        self.assertEqual([3, 4, 5], self.engine.pending_ids)
+
+
+class TestDatabaseCleanup(base.TestCase):
+
+    def setUp(self):
+        super(TestDatabaseCleanup, self).setUp()
+        self.conf = self.useFixture(oslo_fixture.Config(cfg.CONF))
+        self.conf.config(group=a10constants.A10_HOUSE_KEEPING,
+                         purge_chunk_size=10, purge_chunk_interval=0)
+        self.db_cleanup = house_keeping.DatabaseCleanup()
+        self.db_cleanup.lb_repo = mock.Mock()
+
+    def test_cleanup_load_balancers_already_purged(self):
+        self.db_cleanup.lb_repo.get_all_deleted_expiring.return_value = [
+            'lb-1', 'lb-2', 'lb-3']
+        self.db_cleanup.lb_repo.delete.side_effect = [
+            None, db_exceptions.NoResultFound(), None]
+        with mock.patch.object(house_keeping, 'db_api'):
+            self.assertEqual(2, self.db_cleanup.cleanup_load_balancers())
+        self.assertEqual(3, self.db_cleanup.lb_repo.delete.call_count)
+        self.assertEqual([], self.db_cleanup.lb_purge.pending_ids)
+
+
+class TestWriteMemory(base.TestCase):
+
+    def setUp(self):
+        super(TestWriteMemory, self).setUp()
+        for target in ('cw', 'db_api'):
+            patcher = mock.patch.object(house_keeping, target)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.write_memory = house_keeping.WriteMemory()
+        self.write_memory.thunder_repo = mock.Mock()
+        self.write_memory.partition_change_repo = mock.Mock()
+
+    def _thunder(self, id, partition_name, **kwargs):
+        now = datetime.datetime.utcnow()
+        values = {'id': id, 'ip_address': '10.0.0.1', 'partition_name': partition_name,
+                  'status': 'ACTIVE', 'loadbalancer_id': 'lb-{}'.format(id),
+                  'updated_at': now, 'last_write_mem': now - datetime.timedelta(hours=1)}
+        values.update(kwargs)
+        return mock.Mock(**values)
+
+    def test_perform_memory_writes_pending_partitions(self):
+        saved = self._thunder(1, 'p1', updated_at=datetime.datetime(2021, 1, 1))
+        changed = self._thunder(2, 'p1')
+        other = self._thunder(3, 'p2')
+        self.write_memory.partition_change_repo.get_pending.return_value = {
+            ('10.0.0.1', 'p1'): 2, ('10.0.0.1', 'p2'): 1, ('10.0.0.1', 'failover'): 4,
+            ('10.0.0.9', 'gone'): 3}
+        self.write_memory.thunder_repo.get_thunders_by_partitions.return_value = [
+            saved, changed, other]
+        # The master of the failover partition is not ACTIVE right now
+        self.write_memory.thunder_repo.get_partitions_in_use.return_value = {
+            ('10.0.0.1', 'failover')}
+        self.write_memory.perform_memory_writes()
+        self.write_memory.cw.perform_write_memory_pass.assert_called_once_with(
+            [changed, other], [saved, other])
+        self.write_memory.thunder_repo.get_partitions_in_use.assert_called_once_with(
+            mock.ANY, {('10.0.0.1', 'failover'), ('10.0.0.9', 'gone')})
+        self.write_memory.partition_change_repo.delete_unchanged.assert_called_once_with(
+            mock.ANY, '10.0.0.9', 'gone', 3)
+
+    def test_perform_memory_writes_nothing_pending(self):
+        self.write_memory.partition_change_repo.get_pending.return_value = {}
+        self.write_memory.thunder_repo.get_thunders_by_partitions.return_value = []
+        self.write_memory.thunder_repo.get_partitions_in_use.return_value = set()
+        self.write_memory.perform_memory_writes()
+        self.write_memory.cw.perform_write_memory_pass.assert_not_called()
@@ -17,6 +17,7 @@ from oslo_config import fixture as oslo_fixture
 from taskflow.patterns import linear_flow as flow
 
 from octavia.common import constants
+from octavia.common import data_models as o_data_models
 from octavia.tests.unit import base
 
 from a10_octavia.common import config_options
@@ -80,3 +81,13 @@ class TestMemberFlows(base.TestCase):
                          devices=[RACK_DEVICE])
         del_flow = self.flows.get_delete_member_flow(constants.TOPOLOGY_SINGLE)
         self.assertIsInstance(del_flow, flow.Flow)
+
+    def test_rack_batch_update_members_flow_reserves_after_validation(self):
+        self.conf.register_opts(config_options.A10_GLOBAL_OPTS,
+                                group=a10constants.A10_GLOBAL_CONF_SECTION)
+        member = o_data_models.Member(id='member-1', subnet_id='subnet-1')
+        batch_flow = self.flows.get_rack_vthunder_batch_update_members_flow(
+            [], [member], [], RACK_DEVICE, RACK_DEVICE_LIST)
+        task_names = [node.name for node, _ in batch_flow.iter_nodes()]
+        self.assertLess(task_names.index('validate-subnetmember-1'),
+                        task_names.index('reserve-subnet-address-for-members'))
@@ -32,7 +32,9 @@ from octavia.tests.common import constants as t_constants
 from a10_octavia.common import config_options
 from a10_octavia.common import data_models
 from a10_octavia.common import exceptions
+from a10_octavia.common import flavor_cache
 from a10_octavia.common import utils
+from a10_octavia.controller.worker import stats_tracker
 from a10_octavia.controller.worker.tasks import a10_database_tasks as task
 from a10_octavia.tests.common import a10constants
 from a10_octavia.tests.unit import base
@@ -87,6 +89,7 @@ class TestA10DatabaseTasks(base.BaseTaskTestCase):
     def setUp(self):
         super(TestA10DatabaseTasks, self).setUp()
         imp.reload(task)
+        self.addCleanup(flavor_cache.flavor_cache.clear)
         self.vrid_repo = mock.Mock()
         self.nat_pool_repo = mock.Mock()
         self.conf = self.useFixture(oslo_fixture.Config(cfg.CONF))
@@ -324,55 +327,6 @@ class TestA10DatabaseTasks(base.BaseTaskTestCase):
             assert_called_once_with(mock.ANY, partition_name='mock-partition-name',
                                     ip_address="mock-ip-addr")
 
-    def test_GetFlavorData_format_flavor_keys(self):
-        expected = {"virtual_server": {"arp_disable": 1}}
-        flavor = {"virtual-server": {"arp-disable": 1}}
-        flavor_task = task.GetFlavorData()
-        formated_flavor = flavor_task._format_keys(flavor)
-        self.assertEqual(formated_flavor, expected)
-
-    def test_GetFlavorData_format_flavor_list_keys(self):
-        expected = {
-            "service_group": {
-                "name_expressions": [{
-                    "regex": "sg1",
-                    "json": {"health_check_disable": 1}
-                }]
-            }
-        }
-        name_expr = {
-            "name-expressions": [{
-                "regex": "sg1",
-                "json": {"health-check-disable": 1}
-            }]
-        }
-        flavor = {"service-group": name_expr}
-        flavor_task = task.GetFlavorData()
-        formated_flavor = flavor_task._format_keys(flavor)
-        self.assertEqual(formated_flavor, expected)
-
-    def test_GetFlavorData_format_flavor_multi_val(self):
-        expected = {
-            "service_group": {
-                "name_expressions": [{
-                    "regex": "sg1",
-                    "json": {"health_check_disable": 1}
-                }],
-                "strict_select": 0
-            }
-        }
-        name_expr = {
-            "name-expressions": [{
-                "regex": "sg1",
-                "json": {"health-check-disable": 1}
-            }]
-        }
-        flavor = {"service-group": {"strict-select": 0}}
-        flavor['service-group'].update(name_expr)
-        flavor_task = task.GetFlavorData()
-        formated_flavor = flavor_task._format_keys(flavor)
-        self.assertEqual(formated_flavor, expected)
-
     @mock.patch('a10_octavia.controller.worker.tasks.a10_database_tasks.a10_task_utils')
     def test_GetFlavorData_execute_no_flavor_id(self, mock_utils):
         mock_utils.attribute_search.return_value = None
@@ -415,17 +369,31 @@ class TestA10DatabaseTasks(base.BaseTaskTestCase):
         flavor_task = task.GetFlavorData()
         flavor_task._flavor_search = mock.Mock(
             return_value=a10constants.MOCK_FLAVOR_ID)
-        flavor_task._format_keys = mock.Mock()
-        flavor_task._format_keys.return_value = {}
         flavor_task.flavor_repo = mock.Mock()
         flavor_task.flavor_repo.get.return_value = FLAVOR
 
         flavor_prof = copy.deepcopy(FLAVOR_PROFILE)
-        flavor_prof.flavor_data = "{}"
+        flavor_prof.flavor_data = '{"virtual-server": {"arp-disable": 1}}'
         flavor_task.flavor_profile_repo = mock.Mock()
         flavor_task.flavor_profile_repo.get.return_value = flavor_prof
         ret_val = flavor_task.execute(LB)
-        self.assertEqual(ret_val, {})
+        self.assertEqual(ret_val, {"virtual_server": {"arp_disable": 1}})
+
+    def test_GetFlavorData_execute_uses_cached_flavor(self):
+        flavor_task = task.GetFlavorData()
+        flavor_task.flavor_repo = mock.Mock()
+        flavor_task.flavor_repo.get.return_value = FLAVOR
+        flavor_prof = copy.deepcopy(FLAVOR_PROFILE)
+        flavor_prof.flavor_data = '{"virtual-server": {"arp-disable": 1}}'
+        flavor_task.flavor_profile_repo = mock.Mock()
+        flavor_task.flavor_profile_repo.get.return_value = flavor_prof
+        expected = {"virtual_server": {"arp_disable": 1}}
+        flavor_data = flavor_task.execute(LB)
+        self.assertEqual(expected, flavor_data)
+        flavor_data['virtual_server'].pop('arp_disable')
+        self.assertEqual(expected, flavor_task.execute(LB))
+        flavor_task.flavor_repo.get.assert_called_once_with(mock.ANY, id=LB.flavor_id)
+        flavor_task.flavor_profile_repo.get.assert_called_once()
 
     def test_GetNatPoolEntry(self):
         db_task = task.GetNatPoolEntry()
@@ -478,18 +446,75 @@ class TestA10DatabaseTasks(base.BaseTaskTestCase):
         db_task = task.SetThunderUpdatedAt()
         vthunder = copy.deepcopy(VTHUNDER)
         db_task.vthunder_repo.update = mock.Mock()
+        db_task.partition_change_repo = mock.Mock()
         db_task.execute(vthunder)
         db_task.vthunder_repo.update.assert_called_once_with(mock.ANY,
                                                              vthunder.id,
                                                              updated_at=mock.ANY)
+        db_task.partition_change_repo.bump.assert_called_once_with(
+            mock.ANY, vthunder.ip_address, vthunder.partition_name)
 
     def test_SetThunderLastWriteMem_execute_update(self):
         db_task = task.SetThunderLastWriteMem()
         vthunder = copy.deepcopy(VTHUNDER)
         db_task.vthunder_repo.update_last_write_mem = mock.Mock()
+        db_task.partition_change_repo = mock.Mock()
         db_task.execute(vthunder, True, True)
         db_task.vthunder_repo.update_last_write_mem.assert_called_once_with(
             mock.ANY, vthunder.ip_address, vthunder.partition_name, last_write_mem=mock.ANY)
+        db_task.partition_change_repo.mark_written.assert_called_once_with(
+            mock.ANY, vthunder.ip_address, [vthunder.partition_name])
+
+    def test_SetThunderPartitionsLastWriteMem_execute_update(self):
+        db_task = task.SetThunderPartitionsLastWriteMem()
+        vthunder = copy.deepcopy(VTHUNDER)
+        db_task.vthunder_repo.update_last_write_mem_bulk = mock.Mock()
+        db_task.partition_change_repo = mock.Mock()
+        db_task.execute(vthunder, ['shared', 'p1'], {'shared': 3, 'p1': 1})
+        db_task.vthunder_repo.update_last_write_mem_bulk.assert_called_once_with(
+            mock.ANY, vthunder.ip_address, ['shared', 'p1'], last_write_mem=mock.ANY)
+        db_task.partition_change_repo.mark_written.assert_called_once_with(
+            mock.ANY, vthunder.ip_address, ['shared', 'p1'],
+            change_counts={'shared': 3, 'p1': 1})
+
+    def test_SetThunderPartitionsLastWriteMem_execute_no_change_counts(self):
+        db_task = task.SetThunderPartitionsLastWriteMem()
+        vthunder = copy.deepcopy(VTHUNDER)
+        db_task.vthunder_repo.update_last_write_mem_bulk = mock.Mock()
+        db_task.partition_change_repo = mock.Mock()
+        db_task.execute(vthunder, ['shared', 'p1'], {})
+        db_task.vthunder_repo.update_last_write_mem_bulk.assert_called_once_with(
+            mock.ANY, vthunder.ip_address, ['shared', 'p1'], last_write_mem=mock.ANY)
+        db_task.partition_change_repo.mark_written.assert_not_called()
+
+    def test_SetThunderPartitionsLastWriteMem_execute_nothing_written(self):
+        db_task = task.SetThunderPartitionsLastWriteMem()
+        db_task.vthunder_repo.update_last_write_mem_bulk = mock.Mock()
+        db_task.execute(copy.deepcopy(VTHUNDER), [])
+        db_task.vthunder_repo.update_last_write_mem_bulk.assert_not_called()
+
+    def test_GetPartitionChangeCounts_execute(self):
+        db_task = task.GetPartitionChangeCounts()
+        vthunder = copy.deepcopy(VTHUNDER)
+        db_task.partition_change_repo = mock.Mock()
+        db_task.partition_change_repo.get_change_counts.return_value = {'shared': 2}
+        self.assertEqual({'shared': 2}, db_task.execute(vthunder, [vthunder, vthunder]))
+        db_task.partition_change_repo.get_change_counts.assert_called_once_with(
+            mock.ANY, vthunder.ip_address, {vthunder.partition_name})
+
+    def test_GetPartitionChangeCounts_execute_failed(self):
+        db_task = task.GetPartitionChangeCounts()
+        vthunder = copy.deepcopy(VTHUNDER)
+        db_task.partition_change_repo = mock.Mock()
+        db_task.partition_change_repo.get_change_counts.side_effect = Exception('db error')
+        self.assertEqual({}, db_task.execute(vthunder, [vthunder]))
+
+    def test_GetActiveLoadBalancersByThunders_return_map(self):
+        lb_task = task.GetActiveLoadBalancersByThunders()
+        vthunder = copy.deepcopy(VTHUNDER)
+        lb_task.loadbalancer_repo.get_active_lbs_by_thunders = mock.Mock(
+            return_value={vthunder.id: [LB]})
+        self.assertEqual({vthunder.id: [LB]}, lb_task.execute([vthunder]))
 
     def test_GetActiveLoadBalancersByThunder_return_empty(self):
         lb_task = task.GetActiveLoadBalancersByThunder()
@@ -567,16 +592,40 @@ class TestA10DatabaseTasks(base.BaseTaskTestCase):
         lb_task.vthunder_repo.get_vthunder_by_project_id.return_value = vthunder
         self.assertRaises(o_exceptions.InvalidTopology, lb_task.execute, LB, "SINGLE")
 
-    @mock.patch('octavia.statistics.stats_base.update_stats_via_driver')
-    def test_update_listeners_stats_with_statistics(self, mock_stats_base):
+    def test_update_listeners_stats_with_statistics(self):
+        LISTENER_STATS = o_data_models.ListenerStatistics(listener_id=uuidutils.generate_uuid())
+        mock_get_listener = task.UpdateListenersStats()
+        mock_get_listener.listener_stats_repo = mock.MagicMock()
+        flow_session = mock.MagicMock()
+        mock_get_listener.execute([LISTENER_STATS], flow_session=flow_session)
+        mock_get_listener.listener_stats_repo.replace_bulk.assert_called_once_with(
+            flow_session.get_session.return_value, [LISTENER_STATS])
+
+    @mock.patch('a10_octavia.controller.worker.tasks.a10_database_tasks._get_stats_handlers')
+    def test_update_listeners_stats_other_drivers(self, mock_handlers):
+        self.conf.config(group='controller_worker',
+                         statistics_drivers=['stats_db', 'stats_logger'])
         LISTENER_STATS = o_data_models.ListenerStatistics(listener_id=uuidutils.generate_uuid())
         mock_get_listener = task.UpdateListenersStats()
-        mock_get_listener.listener_repo = mock.MagicMock()
-        mock_get_listener.listener_repo.get_all.return_value = [LISTENER], None
         mock_get_listener.listener_stats_repo = mock.MagicMock()
-        mock_get_listener.listener_stats_repo.get_all.return_value = [LISTENER_STATS], None
-        mock_get_listener.execute([LISTENER_STATS])
-        mock_stats_base.assert_called_once_with([LISTENER_STATS])
+        mock_get_listener.execute([LISTENER_STATS], flow_session=mock.MagicMock())
+        mock_get_listener.listener_stats_repo.replace_bulk.assert_called_once_with(
+            mock.ANY, [LISTENER_STATS])
+        mock_handlers.assert_called_once_with(('stats_logger',))
+        mock_handlers.return_value.map_method.assert_called_once_with(
+            'update_stats', [LISTENER_STATS], deltas=False)
+
+    def test_update_listeners_stats_delta_writes(self):
+        self.conf.config(group='a10_health_manager', stats_delta_writes=True)
+        self.addCleanup(stats_tracker.listener_stats_tracker.clear)
+        LISTENER_STATS = o_data_models.ListenerStatistics(
+            listener_id=uuidutils.generate_uuid(), bytes_in=10)
+        mock_get_listener = task.UpdateListenersStats()
+        mock_get_listener.listener_stats_repo = mock.MagicMock()
+        mock_get_listener.execute([LISTENER_STATS], flow_session=mock.MagicMock())
+        mock_get_listener.execute([LISTENER_STATS], flow_session=mock.MagicMock())
+        mock_get_listener.listener_stats_repo.replace_bulk.assert_called_once_with(
+            mock.ANY, [LISTENER_STATS])
 
     def test_GetVThunderAmphora(self):
         db_task = task.GetVThunderAmphora()
@@ -603,16 +652,24 @@ class TestA10DatabaseTasks(base.BaseTaskTestCase):
         db_task.vthunder_repo = mock.MagicMock()
         db_task.vthunder_repo.get_spare_vthunder.return_value = vthunder
         db_task.vthunder_repo.set_spare_vthunder_status = mock.Mock()
-        cid, vth = db_task.execute()
+        lb = copy.deepcopy(LB)
+        lb.project_id = a10constants.MOCK_PROJECT_ID
+        cid, vth = db_task.execute(lb)
         self.assertEqual(cid, a10constants.MOCK_COMPUTE_ID)
+        db_task.vthunder_repo.get_spare_vthunder.assert_called_once_with(
+            mock.ANY, a10constants.MOCK_PROJECT_ID)
 
     def test_TryGetSpareCompute(self):
         db_task = task.TryGetSpareCompute()
         vthunder = copy.deepcopy(VTHUNDER)
         db_task.vthunder_repo = mock.MagicMock()
         db_task.vthunder_repo.get_spare_vthunder.return_value = vthunder
-        vth = db_task.execute()
+        failed_vthunder = copy.deepcopy(VTHUNDER)
+        failed_vthunder.project_id = a10constants.MOCK_PROJECT_ID
+        vth = db_task.execute(failed_vthunder)
         self.assertEqual(vth, vthunder)
+        db_task.vthunder_repo.get_spare_vthunder.assert_called_once_with(
+            mock.ANY, a10constants.MOCK_PROJECT_ID)
 
     def test_GetComputeVThundersAndLoadBalancers(self):
         db_task = task.GetComputeVThundersAndLoadBalancers()
@@ -626,6 +683,35 @@ class TestA10DatabaseTasks(base.BaseTaskTestCase):
         self.assertEqual(vlist[0], vthunder)
         self.assertEqual(llist[0], LB)
 
+    @mock.patch('a10_octavia.common.utils.get_parent_project', return_value='parent-project')
+    def test_CheckExistingThunderToProjectMappedEntries_projects_vthunder_fields(
+            self, mock_parent_project):
+        db_task = task.CheckExistingThunderToProjectMappedEntries()
+        db_task.vthunder_repo = mock.MagicMock()
+        db_task.vthunder_repo.get_vthunders_by_ip_address.return_value = [
+            data_models.VThunder(ip_address="10.10.10.10", partition_name="shared",
+                                 project_id='other-project')]
+        lb = o_data_models.LoadBalancer(project_id=a10constants.MOCK_PROJECT_ID)
+        self.assertRaises(exceptions.ProjectInUseByExistingThunderError,
+                          db_task.execute, lb, HW_THUNDER)
+        db_task.vthunder_repo.get_vthunders_by_ip_address.assert_called_once_with(
+            mock.ANY, ip_address="10.10.10.10",
+            fields=('ip_address', 'partition_name', 'project_id'))
+        db_task.vthunder_repo.get.assert_not_called()
+
+    def test_CountLoadbalancersOnThunderBySubnet_projects_vthunder_fields(self):
+        db_task = task.CountLoadbalancersOnThunderBySubnet()
+        db_task.vthunder_repo = mock.MagicMock()
+        db_task.vthunder_repo.get_rack_vthunders_by_ip_address.return_value = [
+            data_models.VThunder(partition_name="shared", loadbalancer_id='lb-1'),
+            data_models.VThunder(partition_name="p1", loadbalancer_id='lb-2')]
+        db_task.loadbalancer_repo = mock.MagicMock()
+        vthunder = data_models.VThunder(ip_address="10.10.10.10", partition_name="shared")
+        self.assertEqual(1, db_task.execute(vthunder, SUBNET, True))
+        db_task.loadbalancer_repo.get_lbs_on_thunder_by_subnet.assert_called_once_with(
+            mock.ANY, 'lb-1', subnet_id=SUBNET.id)
+        db_task.vthunder_repo.get.assert_not_called()
+
     def test_DeleteStaleSpareVThunder(self):
         db_task = task.DeleteStaleSpareVThunder()
         vthunder = copy.deepcopy(VTHUNDER)
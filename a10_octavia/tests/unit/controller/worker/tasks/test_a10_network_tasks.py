@@ -591,6 +591,56 @@ class TestNetworkTasks(base.BaseTaskTestCase):
         self.client_mock.reserve_subnet_addresses.assert_called_with(
             MEMBER.subnet_id, ["1.1.1.1", "1.1.1.2"], mock.ANY)
 
+    def test_reserve_subnet_addr_for_member_from_subnet_ports(self):
+        mock_network_task = a10_network_tasks.ReserveSubnetAddressForMember()
+        mock_network_task.network_driver = self.client_mock
+        port = mock_network_task.execute(MEMBER, NAT_FLAVOR, None,
+                                         {a10constants.MOCK_SUBNET_ID: PORT})
+        self.assertEqual(PORT, port)
+        self.client_mock.reserve_subnet_addresses.assert_not_called()
+
+    @mock.patch('a10_octavia.controller.worker.tasks.a10_network_tasks.db_apis.get_session')
+    @mock.patch('a10_octavia.controller.worker.tasks.a10_network_tasks.a10_task_utils')
+    def test_reserve_subnet_addr_for_members(self, mock_utils, mock_get_session):
+        member_1 = o_data_models.Member(id='member-1', subnet_id=a10constants.MOCK_SUBNET_ID)
+        member_2 = o_data_models.Member(id='member-2', subnet_id=a10constants.MOCK_SUBNET_ID)
+        member_3 = o_data_models.Member(id='member-3', subnet_id=a10constants.MOCK_SUBNET_ID_2)
+        member_4 = o_data_models.Member(id='member-4', subnet_id='mock-subnet-3')
+        mock_network_task = a10_network_tasks.ReserveSubnetAddressForMembers()
+        mock_network_task.network_driver = self.client_mock
+        mock_network_task.nat_pool_repo = mock.Mock()
+        mock_network_task.nat_pool_repo.get.side_effect = (
+            lambda session, name, subnet_id: NAT_POOL if subnet_id == 'mock-subnet-3' else None)
+        self.client_mock.reserve_subnet_addresses_bulk.return_value = {
+            a10constants.MOCK_SUBNET_ID: PORT}
+        subnet_ports = mock_network_task.execute(
+            [member_1, member_2, member_3, member_4], NAT_FLAVOR)
+        self.client_mock.reserve_subnet_addresses_bulk.assert_called_once_with(
+            [a10constants.MOCK_SUBNET_ID, a10constants.MOCK_SUBNET_ID_2],
+            ["1.1.1.1", "1.1.1.2"], mock.ANY)
+        self.assertEqual({a10constants.MOCK_SUBNET_ID: PORT}, subnet_ports)
+
+    @mock.patch('a10_octavia.controller.worker.tasks.a10_network_tasks.a10_task_utils')
+    def test_reserve_subnet_addr_for_members_revert(self, mock_utils):
+        mock_network_task = a10_network_tasks.ReserveSubnetAddressForMembers()
+        mock_network_task.network_driver = self.client_mock
+        port_1 = o_net_data_models.Port(id='port-1')
+        port_2 = o_net_data_models.Port(id='port-2')
+        mock_network_task.revert({a10constants.MOCK_SUBNET_ID: port_1,
+                                  a10constants.MOCK_SUBNET_ID_2: port_2},
+                                 [MEMBER], NAT_FLAVOR)
+        self.assertEqual([mock.call('port-1'), mock.call('port-2')],
+                         self.client_mock.delete_port.call_args_list)
+        self.client_mock.release_subnet_addresses.assert_any_call(
+            a10constants.MOCK_SUBNET_ID, ["1.1.1.1", "1.1.1.2"],
+            mock_utils.attribute_search.return_value)
+
+    def test_reserve_subnet_addr_for_members_no_nat_flavor(self):
+        mock_network_task = a10_network_tasks.ReserveSubnetAddressForMembers()
+        mock_network_task.network_driver = self.client_mock
+        self.assertEqual({}, mock_network_task.execute([MEMBER], None))
+        self.client_mock.reserve_subnet_addresses_bulk.assert_not_called()
+
     def test_release_subnet_addr_referenced(self):
         mock_network_task = a10_network_tasks.ReleaseSubnetAddressForMember()
         NAT_POOL.member_ref_count = 2
@@ -614,6 +664,18 @@ class TestNetworkTasks(base.BaseTaskTestCase):
         added_list = net_task.execute(vthunder, NET_LIST)
         self.assertEqual(added_list, NET_LIST)
 
+    def test_PlugNetworksByID_revert_unplugs_plugged_networks_only(self):
+        net_task = a10_network_tasks.PlugNetworksByID()
+        net_task.network_driver = self.client_mock
+        vthunder = copy.deepcopy(VTHUNDER)
+        net_task.network_driver.get_plugged_networks.return_value = [MockNic(1)]
+        net_task.network_driver.plug_network.side_effect = [None, Exception]
+        self.assertRaises(Exception, net_task.execute, vthunder, [1, 2, 3])
+        plugged = net_task.network_driver.plug_network.call_args_list[0][0][1]
+        net_task.revert(vthunder, [1, 2, 3])
+        net_task.network_driver.unplug_network.assert_called_once_with(
+            vthunder.compute_id, plugged)
+
     def test_GetVThunderNetworkList(self):
         net_task = a10_network_tasks.GetVThunderNetworkList()
         net_task.network_driver = self.client_mock
@@ -651,6 +713,44 @@ class TestNetworkTasks(base.BaseTaskTestCase):
             VRID_VALUE, floating_ips=[a10constants.MOCK_VRID_FLOATING_IP_1],
             is_partition=False)
 
+    @mock.patch('a10_octavia.common.utils.get_vrid_floating_ip_for_project',
+                return_value=a10constants.MOCK_VRID_FLOATING_IP_1)
+    @mock.patch('a10_octavia.common.utils.get_patched_ip_address',
+                return_value=a10constants.MOCK_VRID_FLOATING_IP_1)
+    def test_HandleVRIDFloatingIP_create_floating_ips_for_subnet_list_in_bulk(
+            self, mock_patched_ip, mock_floating_ip):
+        vthunder = copy.deepcopy(VTHUNDER)
+        vthunder.ip_address = '10.0.0.1'
+        subnet_1 = copy.deepcopy(SUBNET_1)
+        subnet_1.cidr = a10constants.MOCK_SUBNET_CIDR
+        subnet_2 = copy.deepcopy(SUBNET_1)
+        subnet_2.id = a10constants.MOCK_SUBNET_ID_2
+        subnet_2.cidr = a10constants.MOCK_SUBNET_CIDR
+        subnets = {subnet_1.id: subnet_1, subnet_2.id: subnet_2}
+        port_1 = o_net_data_models.Port(id='port-1')
+        port_1.fixed_ips.append(MockIP(a10constants.MOCK_VRID_FLOATING_IP_1))
+        port_2 = o_net_data_models.Port(id='port-2')
+        port_2.fixed_ips.append(MockIP(a10constants.MOCK_VRID_FLOATING_IP_2))
+        self.client_mock.vrrpa.get.return_value = EXISTING_FIP_SHARED_PARTITION
+        mock_network_task = a10_network_tasks.HandleVRIDFloatingIP()
+        mock_network_task.axapi_client = self.client_mock
+        self.network_driver_mock.get_subnet.side_effect = lambda subnet_id: subnets[subnet_id]
+        self.network_driver_mock.allocate_vrid_fips.return_value = [port_1, port_2]
+        self.conf.config(group=a10constants.A10_GLOBAL_OPTS,
+                         vrid=VRID_VALUE)
+        vrid_list = mock_network_task.execute(vthunder, POOL, [], [subnet_1, subnet_2],
+                                              HW_THUNDER)
+        self.network_driver_mock.allocate_vrid_fip.assert_not_called()
+        self.network_driver_mock.allocate_vrid_fips.assert_called_once_with(
+            [(mock.ANY, None, a10constants.MOCK_VRID_FLOATING_IP_1),
+             (mock.ANY, None, a10constants.MOCK_VRID_FLOATING_IP_1)], mock.ANY)
+        self.assertEqual(['port-1', 'port-2'], [vrid.vrid_port_id for vrid in vrid_list])
+        self.assertEqual([port_1, port_2], mock_network_task.added_fip_ports)
+        self.client_mock.vrrpa.update.assert_called_with(
+            VRID_VALUE, floating_ips=[a10constants.MOCK_VRID_FLOATING_IP_1,
+                                      a10constants.MOCK_VRID_FLOATING_IP_2],
+            is_partition=False)
+
     def test_get_all_resource_subnet(self):
         mock_network_task = a10_network_tasks.GetAllResourceSubnet()
         self.network_driver_mock.get_subnet.return_value = SUBNET_1
@@ -0,0 +1,93 @@
+#    Copyright 2021, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from oslo_config import cfg
+from oslo_config import fixture as oslo_fixture
+
+from octavia.common import data_models as o_data_models
+from octavia.tests.unit import base
+
+from a10_octavia.common import config_options  # noqa
+from a10_octavia.common import data_models
+from a10_octavia.controller.worker.tasks import aflex_cache
+from a10_octavia.controller.worker.tasks import l7policy_tasks
+from a10_octavia.tests.common import a10constants
+
+VTHUNDER = data_models.VThunder(ip_address='10.0.0.1', partition_name='shared')
+VPORT_ARGS = (a10constants.MOCK_LISTENER_ID, None, None, None, None)
+
+
+class TestAflexScriptCache(base.TestCase):
+
+    def setUp(self):
+        super(TestAflexScriptCache, self).setUp()
+        self.conf = self.useFixture(oslo_fixture.Config(cfg.CONF))
+        self.conf.config(group=a10constants.A10_CONTROLLER_WORKER_CONF_SECTION,
+                         aflex_cache_ttl=3600)
+        self.cache = aflex_cache.AflexScriptCache()
+
+    def test_is_current(self):
+        self.assertFalse(self.cache.is_current(VTHUNDER, 'policy-1', 'script', VPORT_ARGS))
+        self.cache.update(VTHUNDER, 'policy-1', 'script', VPORT_ARGS)
+        self.assertTrue(self.cache.is_current(VTHUNDER, 'policy-1', 'script', VPORT_ARGS))
+        self.assertFalse(self.cache.is_current(VTHUNDER, 'policy-1', 'script2', VPORT_ARGS))
+        self.assertFalse(self.cache.is_current(
+            VTHUNDER, 'policy-1', 'script', VPORT_ARGS[:1] + ('pool-1',) + VPORT_ARGS[2:]))
+        other = data_models.VThunder(ip_address='10.0.0.1', partition_name='p1')
+        self.assertFalse(self.cache.is_current(other, 'policy-1', 'script', VPORT_ARGS))
+        self.assertFalse(self.cache.is_current(None, 'policy-1', 'script', VPORT_ARGS))
+
+    def test_invalidate(self):
+        self.cache.update(VTHUNDER, 'policy-1', 'script', VPORT_ARGS)
+        self.cache.update(VTHUNDER, 'policy-2', 'script', ('listener-2',))
+        self.cache.invalidate(VTHUNDER, 'policy-1')
+        self.assertFalse(self.cache.is_current(VTHUNDER, 'policy-1', 'script', VPORT_ARGS))
+
+        self.cache.update(VTHUNDER, 'policy-1', 'script', VPORT_ARGS)
+        self.cache.invalidate_listener(VTHUNDER, a10constants.MOCK_LISTENER_ID)
+        self.assertFalse(self.cache.is_current(VTHUNDER, 'policy-1', 'script', VPORT_ARGS))
+        self.assertTrue(self.cache.is_current(VTHUNDER, 'policy-2', 'script', ('listener-2',)))
+
+    def test_ttl_disabled(self):
+        self.conf.config(group=a10constants.A10_CONTROLLER_WORKER_CONF_SECTION,
+                         aflex_cache_ttl=0)
+        self.cache.update(VTHUNDER, 'policy-1', 'script', VPORT_ARGS)
+        self.assertFalse(self.cache.is_current(VTHUNDER, 'policy-1', 'script', VPORT_ARGS))
+
+    @mock.patch('a10_octavia.controller.worker.tasks.l7policy_tasks.openstack_mappings')
+    def test_l7policy_set_skips_unchanged_script(self, mock_mappings):
+        self.addCleanup(aflex_cache.aflex_cache.clear)
+        l7policy = o_data_models.L7Policy(id=a10constants.MOCK_L7POLICY_ID,
+                                          action="REDIRECT_TO_URL",
+                                          redirect_url="www.example.com", l7rules=[])
+        listener = o_data_models.Listener(id=a10constants.MOCK_LISTENER_ID,
+                                          load_balancer_id=a10constants.MOCK_LOAD_BALANCER_ID,
+                                          protocol='HTTP', protocol_port=80)
+        mock_task = l7policy_tasks.UpdateL7Policy()
+        mock_task.axapi_client = mock.MagicMock()
+        mock_task.axapi_client.slb.virtual_server.vport.get.return_value = {'port': {}}
+
+        mock_task.set(l7policy, [listener], VTHUNDER)
+        mock_task.set(l7policy, [listener], VTHUNDER)
+        mock_task.axapi_client.slb.aflex_policy.create.assert_called_once()
+        mock_task.axapi_client.slb.virtual_server.vport.update.assert_called_once()
+
+        l7policy.redirect_url = "www.example.org"
+        mock_task.set(l7policy, [listener], VTHUNDER)
+        self.assertEqual(2, mock_task.axapi_client.slb.aflex_policy.create.call_count)
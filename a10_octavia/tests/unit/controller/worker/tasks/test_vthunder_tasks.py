@@ -14,6 +14,7 @@
 
 
 import copy
+import datetime
 import imp
 import json
 try:
@@ -254,7 +255,9 @@ class TestVThunderTasks(base.BaseTaskTestCase):
         self.client_mock.interface.ethernet.get.return_value = ETH_DATA
         self.client_mock.vlan.exists.return_value = False
         mock_task._network_driver.neutron_client.create_port = mock.Mock()
-        utils.convert_port_dict_to_model = mock.Mock()
+        patcher = mock.patch.object(utils, 'convert_port_dict_to_model')
+        patcher.start()
+        self.addCleanup(patcher.stop)
         mock_task._network_driver.get_network = mock.Mock()
         mock_task._network_driver.get_network.return_value = NETWORK_11
         mock_task._network_driver.list_networks = mock.Mock()
@@ -582,8 +585,6 @@ class TestVThunderTasks(base.BaseTaskTestCase):
         self.assertIsNone(ret_val)
 
     def test_WriteMemory_execute_save_shared_mem(self):
-        self.conf.register_opts(config_options.A10_HOUSE_KEEPING_OPTS,
-                                group=a10constants.A10_HOUSE_KEEPING)
         self.conf.config(group=a10constants.A10_HOUSE_KEEPING,
                          use_periodic_write_memory='disable')
         mock_thunder = copy.deepcopy(VTHUNDER)
@@ -594,8 +595,6 @@ class TestVThunderTasks(base.BaseTaskTestCase):
             partition='shared')
 
     def test_WriteMemory_execute_save_specific_partition_mem(self):
-        self.conf.register_opts(config_options.A10_HOUSE_KEEPING_OPTS,
-                                group=a10constants.A10_HOUSE_KEEPING)
         self.conf.config(group=a10constants.A10_HOUSE_KEEPING,
                          use_periodic_write_memory='disable')
         thunder = copy.deepcopy(VTHUNDER)
@@ -631,9 +630,83 @@ class TestVThunderTasks(base.BaseTaskTestCase):
             partition='specified',
             specified_partition='testPartition')
 
+    def test_WriteMemoryHouseKeeper_execute_failed_reverts_lbs_in_one_update(self):
+        thunder = copy.deepcopy(VTHUNDER)
+        flow_session = mock.MagicMock()
+        session = flow_session.unit_of_work.return_value.__enter__.return_value
+        mock_task = task.WriteMemoryHouseKeeper()
+        mock_task.axapi_client = self.client_mock
+        mock_task.loadbalancer_repo = mock.Mock()
+        self.client_mock.system.action.write_memory.side_effect = acos_errors.ACOSException()
+        self.assertFalse(mock_task.execute(thunder, [LB, LB], True, flow_session))
+        mock_task.loadbalancer_repo.update_provisioning_status_bulk.assert_called_once_with(
+            session, [LB.id, LB.id], 'ACTIVE')
+
+    def _device_thunders(self):
+        thunders = []
+        for i, partition in enumerate(('shared', 'p1')):
+            thunder = copy.deepcopy(VTHUNDER)
+            thunder.id = i + 1
+            thunder.ip_address = '10.0.0.1'
+            thunder.partition_name = partition
+            thunder.updated_at = datetime.datetime.utcnow() - datetime.timedelta(hours=1)
+            thunders.append(thunder)
+        lbs = {1: [mock.Mock(id='lb-1')], 2: [mock.Mock(id='lb-2')]}
+        return thunders, lbs
+
+    def test_WriteMemoryDeviceHouseKeeper_execute_writes_all_partitions(self):
+        thunders, lbs = self._device_thunders()
+        self.client_mock.system.action.get_thunder_up_time.return_value = {
+            'miscellenious-alb': {'oper': {'uptime': 86400}}}
+        mock_task = task.WriteMemoryDeviceHouseKeeper()
+        mock_task.axapi_client = self.client_mock
+        mock_task.loadbalancer_repo = mock.Mock()
+        written = mock_task.execute(thunders[0], thunders, thunders, lbs)
+        self.assertEqual(['shared', 'p1'], written)
+        self.client_mock.system.action.get_thunder_up_time.assert_called_once_with()
+        self.assertEqual([mock.call(partition='shared'),
+                          mock.call(partition='specified', specified_partition='p1')],
+                         self.client_mock.system.action.write_memory.call_args_list)
+        self.assertEqual([mock.call(mock.ANY, ['lb-1', 'lb-2'], 'PENDING_UPDATE'),
+                          mock.call(mock.ANY, ['lb-1', 'lb-2'], 'ACTIVE')],
+                         mock_task.loadbalancer_repo.update_provisioning_status_bulk
+                         .call_args_list)
+
+    def test_WriteMemoryDeviceHouseKeeper_execute_reload_detected(self):
+        thunders, lbs = self._device_thunders()
+        self.client_mock.system.action.get_thunder_up_time.return_value = {
+            'miscellenious-alb': {'oper': {'uptime': 60}}}
+        mock_task = task.WriteMemoryDeviceHouseKeeper()
+        mock_task.axapi_client = self.client_mock
+        mock_task.loadbalancer_repo = mock.Mock()
+        mock_task.execute(thunders[0], thunders[1:], thunders, lbs)
+        self.assertEqual([mock.call(mock.ANY, {'lb-2'}, 'ERROR'),
+                          mock.call(mock.ANY, ['lb-1'], 'PENDING_UPDATE'),
+                          mock.call(mock.ANY, ['lb-1'], 'ACTIVE')],
+                         mock_task.loadbalancer_repo.update_provisioning_status_bulk
+                         .call_args_list)
+
+    def test_WriteMemoryDeviceHouseKeeper_execute_partition_write_fails(self):
+        thunders, lbs = self._device_thunders()
+        self.client_mock.system.action.write_memory.side_effect = [
+            None, acos_errors.ACOSException()]
+        mock_task = task.WriteMemoryDeviceHouseKeeper()
+        mock_task.axapi_client = self.client_mock
+        mock_task.loadbalancer_repo = mock.Mock()
+        self.assertEqual(['shared'], mock_task.execute(thunders[0], [], thunders, lbs))
+        self.client_mock.system.action.get_thunder_up_time.assert_not_called()
+
+    def test_WriteMemoryDeviceHouseKeeper_execute_shared_write_fails(self):
+        thunders, lbs = self._device_thunders()
+        self.client_mock.system.action.write_memory.side_effect = acos_errors.ACOSException()
+        mock_task = task.WriteMemoryDeviceHouseKeeper()
+        mock_task.axapi_client = self.client_mock
+        mock_task.loadbalancer_repo = mock.Mock()
+        self.assertEqual([], mock_task.execute(thunders[0], [], thunders, lbs))
+        mock_task.loadbalancer_repo.update_provisioning_status_bulk.assert_called_with(
+            mock.ANY, ['lb-1', 'lb-2'], 'ACTIVE')
+
     def test_WriteMemory_execute_not_called(self):
-        self.conf.register_opts(config_options.A10_HOUSE_KEEPING_OPTS,
-                                group=a10constants.A10_HOUSE_KEEPING)
         self.conf.config(group=a10constants.A10_HOUSE_KEEPING,
                          use_periodic_write_memory='enable')
         mock_thunder = copy.deepcopy(VTHUNDER)
@@ -643,8 +716,6 @@ class TestVThunderTasks(base.BaseTaskTestCase):
         self.client_mock.system.action.write_memory.assert_not_called()
 
     def test_WriteMemory_execute_delete_flow_after_error_no_fail(self):
-        self.conf.register_opts(config_options.A10_HOUSE_KEEPING_OPTS,
-                                group=a10constants.A10_HOUSE_KEEPING)
         self.conf.config(group=a10constants.A10_HOUSE_KEEPING,
                          use_periodic_write_memory='enable')
         ret_val = task.WriteMemory().execute(vthunder=None)
@@ -846,8 +917,8 @@ class TestVThunderTasks(base.BaseTaskTestCase):
         self.assertEqual(vthunder_config.partition_name,
                          a10constants.MOCK_CHILD_PROJECT_ID[:13])
 
-    @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks.time')
-    def test_AmphoraPostVipPlug_execute_for_reload_reboot(self, mock_time):
+    @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks._wait_for_thunder_ready')
+    def test_AmphoraPostVipPlug_execute_for_reload_reboot(self, mock_wait):
         thunder = copy.deepcopy(VTHUNDER)
         added_ports = {'amphora_id': '123'}
         mock_task = task.AmphoraePostVIPPlug()
@@ -861,6 +932,7 @@ class TestVThunderTasks(base.BaseTaskTestCase):
         self.client_mock.system.action.write_memory.assert_called_with()
         self.client_mock.system.action.reload_reboot_for_interface_attachment.assert_called_with(
             vthunder.acos_version)
+        mock_wait.assert_called_once_with(self.client_mock, thunder, mock.ANY)
 
     @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks.time')
     def test_AmphoraPostVipPlug_execute_for_no_reload_reboot(self, mock_time):
@@ -894,8 +966,8 @@ class TestVThunderTasks(base.BaseTaskTestCase):
         mock_task.execute(thunder, LB)
         mock_task.axapi_client.system.action.get_acos_version.assert_not_called()
 
-    @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks.time')
-    def test_AmphoraePostMemberNetworkPlug_execute_for_reload_reboot(self, mock_time):
+    @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks._wait_for_thunder_ready')
+    def test_AmphoraePostMemberNetworkPlug_execute_for_reload_reboot(self, mock_wait):
         thunder = copy.deepcopy(VTHUNDER)
         thunder.acos_version = "5.2.1"
         added_ports = {'amphora_id': '123'}
@@ -905,6 +977,7 @@ class TestVThunderTasks(base.BaseTaskTestCase):
         self.client_mock.system.action.write_memory.assert_called_with()
         self.client_mock.system.action.reload_reboot_for_interface_attachment.assert_called_with(
             "5.2.1")
+        mock_wait.assert_called_once_with(self.client_mock, thunder, mock.ANY)
 
     @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks.time')
     def test_AmphoraePostMemberNetworkPlug_execute_for_no_reload_reboot(self, mock_time):
@@ -917,8 +990,8 @@ class TestVThunderTasks(base.BaseTaskTestCase):
         self.client_mock.system.action.write_memory.assert_not_called()
         self.client_mock.system.action.reload_reboot_for_interface_attachment.assert_not_called()
 
-    @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks.time')
-    def test_AmphoraePostNetworkUnplug_execute_for_reload_reboot(self, mock_time):
+    @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks._wait_for_thunder_ready')
+    def test_AmphoraePostNetworkUnplug_execute_for_reload_reboot(self, mock_wait):
         thunder = copy.deepcopy(VTHUNDER)
         added_ports = {'amphora_id': '123'}
         mock_task = task.AmphoraePostNetworkUnplug()
@@ -927,6 +1000,7 @@ class TestVThunderTasks(base.BaseTaskTestCase):
         self.client_mock.system.action.write_memory.assert_called_with()
         self.client_mock.system.action.reload_reboot_for_interface_detachment.assert_called_with(
             "5.2.1")
+        mock_wait.assert_called_once_with(self.client_mock, thunder, mock.ANY)
 
     @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks.time')
     def test_AmphoraePostNetworkUnplug_execute_no_port_no_verion_no_reload_reboot(self, mock_time):
@@ -1024,34 +1098,39 @@ class TestVThunderTasks(base.BaseTaskTestCase):
         self.client_mock.remove_any_source_ip_on_egress.assert_called_with(
             SUBNET.network_id, AMPHORAE[0])
 
-    def test_get_listeners_stats(self):
-        vthunder = copy.deepcopy(VTHUNDER)
-        vthunder.loadbalancer_id = a10constants.MOCK_LOAD_BALANCER_ID
-        lb = copy.deepcopy(LB)
-        lb.provisioning_status = "ACTIVE"
-        STATS = {
-            "port-list": [
-                {
-                    "stats": {
-                        "curr_conn": 0, "total_conn": 1,
-                        "total_fwd_bytes": 684, "total_rev_bytes": 705
-                    },
-                    "port-number": 80,
-                    "protocol": "http"
-                }
-            ]
-        }
-        mock_task = task.GetListenersStats()
+    @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks.a10_utils')
+    def test_GetDeviceListenersStats(self, mock_utils):
+        mock_client = mock.MagicMock()
+        mock_utils.get_axapi_client.return_value = mock_client
+        mock_client.slb.virtual_server.stats.side_effect = lambda name, **kwargs: {
+            "port-list": [{
+                "stats": {"curr_conn": 0, "total_conn": 1,
+                          "total_fwd_bytes": 684, "total_rev_bytes": 705},
+                "port-number": 80, "protocol": "http"}]}
+        vthunders = []
+        for i, partition_name in enumerate(('p1', 'p1', 'p2', 'p2')):
+            vthunder = copy.deepcopy(VTHUNDER)
+            vthunder.loadbalancer_id = 'lb-{}'.format(i)
+            vthunder.partition_name = partition_name
+            vthunders.append(vthunder)
+        mock_task = task.GetDeviceListenersStats()
         mock_task.loadbalancer_repo = mock.MagicMock()
-        mock_task.loadbalancer_repo.get.return_value = lb
-        mock_task.axapi_client = self.client_mock
-        mock_task.axapi_client.slb.virtual_server.stats.return_value = STATS
-        mock_task.execute(vthunder)
-        self.client_mock.slb.virtual_server.stats.assert_called_with(
-            name=a10constants.MOCK_LOAD_BALANCER_ID, timeout=mock.ANY, max_retries=mock.ANY)
-
-    @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks.time')
-    def test_SparePostNetowrkPlug(self, mock_time):
+        mock_task.loadbalancer_repo.get_active_lb_ids.return_value = {'lb-0', 'lb-1', 'lb-2'}
+        mock_task.listener_repo = mock.MagicMock()
+        mock_task.listener_repo.get_port_listener_maps.return_value = {
+            'lb-0': {80: 'listener-0'}, 'lb-1': {80: 'listener-1'}, 'lb-2': {}}
+
+        listener_stats = mock_task.execute(vthunders, flow_session=mock.MagicMock())
+        mock_utils.get_axapi_client.assert_called_once_with(vthunders[0])
+        self.assertEqual([mock.call('p1'), mock.call('p2')],
+                         mock_client.system.partition.active.call_args_list)
+        self.assertEqual(3, mock_client.slb.virtual_server.stats.call_count)
+        self.assertEqual(['listener-0', 'listener-1'],
+                         [stats.listener_id for stats in listener_stats])
+        mock_client.session.close.assert_called_once_with()
+
+    @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks._wait_for_thunder_ready')
+    def test_SparePostNetowrkPlug(self, mock_wait):
         mock_task = task.SparePostNetworkPlug()
         mock_task.axapi_client = self.client_mock
         thunder = copy.deepcopy(VTHUNDER)
@@ -1060,6 +1139,118 @@ class TestVThunderTasks(base.BaseTaskTestCase):
         self.client_mock.system.action.write_memory.assert_called_with()
         self.client_mock.system.action.reload_reboot_for_interface_attachment.assert_called_with(
             thunder.acos_version)
+        mock_wait.assert_called_once_with(self.client_mock, thunder, mock.ANY)
+
+    @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks.a10_utils.get_axapi_client')
+    @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks._axapi_port_open',
+                return_value=True)
+    def test_VThunderComputeConnectivityWait_probes_peer(self, mock_port_open, mock_client):
+        thunder = copy.deepcopy(VTHUNDER)
+        peer = copy.deepcopy(VTHUNDER)
+        peer.id = 'peer-vthunder'
+        peer.ip_address = '10.0.0.2'
+        mock_task = task.VThunderComputeConnectivityWait()
+        mock_task.execute(thunder, AMPHORA, peer_vthunder=peer)
+        self.assertEqual(sorted([mock.call(thunder), mock.call(peer)], key=str),
+                         sorted(mock_client.call_args_list, key=str))
+        self.assertEqual(2, mock_client.return_value.system.information.call_count)
+
+    @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks.a10_utils.get_axapi_client')
+    @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks._axapi_port_open',
+                return_value=True)
+    def test_VThunderComputeConnectivityWait_peer_not_available(self, mock_port_open,
+                                                                mock_client):
+        thunder = copy.deepcopy(VTHUNDER)
+        mock_task = task.VThunderComputeConnectivityWait()
+        mock_task.execute(thunder, AMPHORA, peer_vthunder=mock.Mock(),
+                          peer_amphora_status=False)
+        mock_client.assert_called_once_with(thunder)
+
+    @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks.time')
+    @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks.a10_utils.get_axapi_client')
+    @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks._axapi_port_open')
+    def test_VThunderComputeConnectivityWait_backoff(self, mock_port_open, mock_client,
+                                                     mock_time):
+        mock_port_open.side_effect = [False, False, True, True]
+        mock_client.return_value.system.information.side_effect = [
+            acos_errors.ACOSSystemNotReady(), None]
+        mock_task = task.VThunderComputeConnectivityWait()
+        mock_task.execute(copy.deepcopy(VTHUNDER), AMPHORA)
+        delays = [call[0][0] for call in mock_time.sleep.call_args_list]
+        self.assertEqual(3, len(delays))
+        for delay, interval in zip(delays, (1.0, 2.0, 4.0)):
+            self.assertTrue(interval / 2 <= delay <= interval)
+        mock_port_open.assert_called_with(VTHUNDER.ip_address, 3.0)
+
+    @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks._wait_for_thunder_ready')
+    def test_VCSReload(self, mock_wait):
+        mock_task = task.VCSReload()
+        mock_task.axapi_client = self.client_mock
+        thunder = copy.deepcopy(VTHUNDER)
+        mock_task.execute(thunder)
+        self.client_mock.system.action.vcs_reload.assert_called_with()
+        mock_wait.assert_called_once_with(self.client_mock, thunder, mock.ANY)
+
+    def _mock_reloading_client(self, uptimes):
+        self.client_mock.system.action.get_thunder_up_time.side_effect = [
+            {'miscellenious-alb': {'oper': {'uptime': uptime}}} for uptime in uptimes]
+        self.client_mock.interface.get_list.return_value = {
+            'interface': {'ethernet-list': [{'ifnum': 1}]}}
+        self.client_mock.interface.ethernet.get_oper.return_value = {
+            'ethernet': {'oper': {'state': 'UP'}}}
+
+    @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks._axapi_port_open',
+                return_value=True)
+    @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks.time')
+    def test_wait_for_thunder_ready_after_uptime_reset(self, mock_time, mock_port_open):
+        self._mock_reloading_client([86400, 86400, 2])
+        thunder = copy.deepcopy(VTHUNDER)
+        triggered_at = datetime.datetime.utcnow() - datetime.timedelta(seconds=20)
+        time_to_ready = task._wait_for_thunder_ready(self.client_mock, thunder, triggered_at)
+        self.assertGreaterEqual(time_to_ready, 20)
+        self.assertEqual([mock.call(1.0), mock.call(2.0)], mock_time.sleep.call_args_list)
+        self.client_mock.interface.ethernet.get_oper.assert_called_once_with(1)
+
+    @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks._axapi_port_open',
+                return_value=True)
+    @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks.time')
+    def test_wait_for_thunder_ready_after_unreachable(self, mock_time, mock_port_open):
+        self._mock_reloading_client([86400])
+        self.client_mock.interface.ethernet.get_oper.side_effect = [
+            {'ethernet': {}}, {'ethernet': {'oper': {'state': 'DISABLED'}}}]
+        self.client_mock.system.information.side_effect = [
+            None, acos_errors.ACOSSystemNotReady(), None, None]
+        thunder = copy.deepcopy(VTHUNDER)
+        task._wait_for_thunder_ready(self.client_mock, thunder, datetime.datetime.utcnow())
+        self.assertEqual(4, self.client_mock.system.information.call_count)
+        self.assertEqual(3, mock_time.sleep.call_count)
+        self.client_mock.system.action.get_thunder_up_time.assert_called_once_with()
+
+    @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks._axapi_port_open',
+                return_value=True)
+    @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks.timeutils')
+    @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks.time')
+    def test_wait_for_thunder_ready_timeout(self, mock_time, mock_timeutils, mock_port_open):
+        watch = mock_timeutils.StopWatch.return_value.start.return_value
+        watch.elapsed.return_value = 0
+        watch.leftover.return_value = 600
+        watch.expired.side_effect = [False, True]
+        self._mock_reloading_client([86400, 86400])
+        thunder = copy.deepcopy(VTHUNDER)
+        self.assertRaises(exceptions.ThunderNotReady, task._wait_for_thunder_ready,
+                          self.client_mock, thunder, datetime.datetime.utcnow())
+        self.client_mock.interface.get_list.assert_not_called()
+
+    @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks._axapi_port_open',
+                side_effect=[False, True])
+    @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks.time')
+    def test_wait_for_thunder_ready_port_closed(self, mock_time, mock_port_open):
+        self._mock_reloading_client([86400])
+        thunder = copy.deepcopy(VTHUNDER)
+        task._wait_for_thunder_ready(self.client_mock, thunder, datetime.datetime.utcnow())
+        self.assertEqual(1, self.client_mock.system.information.call_count)
+        self.client_mock.system.action.get_thunder_up_time.assert_not_called()
+        mock_port_open.assert_called_with(thunder.ip_address, mock.ANY)
 
     def test_EnableInterfaceOnSpare(self):
         mock_task = task.EnableInterfaceOnSpare()
@@ -1090,6 +1281,29 @@ class TestVThunderTasks(base.BaseTaskTestCase):
         self.client_mock.system.action.write_memory.assert_called_with()
         self.client_mock.system.action.vcs_reload.assert_called_with()
 
+    @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks.vcs_watcher')
+    def test_ConfigureaVCSBackup_retries_until_configured(self, mock_watcher):
+        self.conf.config(group=a10constants.A10_CONTROLLER_WORKER_CONF_SECTION,
+                         amp_ready_poll_interval=0.1)
+        mock_task = task.ConfigureaVCSBackup()
+        mock_task.axapi_client = self.client_mock
+        self.client_mock.system.action.set_vcs_device.side_effect = [
+            acos_errors.ACOSException(), None]
+        thunder = copy.deepcopy(VTHUNDER)
+        mock_task.execute(thunder)
+        self.assertEqual(2, self.client_mock.system.action.set_vcs_device.call_count)
+        self.client_mock.system.action.vcs_reload.assert_called_once_with()
+        mock_watcher.vcs_state_watcher.invalidate.assert_called_once_with(
+            thunder.ip_address)
+
+    @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks.vcs_watcher')
+    def test_GetMasterVThunder_uses_watched_vcs_state(self, mock_watcher):
+        mock_watcher.vcs_state_watcher.wait_vmaster.return_value.vmaster_ip = '10.0.0.2'
+        thunder = copy.deepcopy(VTHUNDER)
+        master = task.GetMasterVThunder().execute(thunder)
+        mock_watcher.vcs_state_watcher.wait_vmaster.assert_called_once_with(thunder)
+        self.assertEqual('10.0.0.2', master.ip_address)
+
     def test_SetHostName_execute_set_hostname(self):
         vthunder = copy.deepcopy(VTHUNDER)
         amphora = copy.deepcopy(AMPHORA)
@@ -0,0 +1,111 @@
+#    Copyright 2021, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import threading
+import time
+
+from oslo_config import cfg
+from oslo_config import fixture as oslo_fixture
+
+from octavia.tests.unit import base
+
+from a10_octavia.common import config_options  # noqa
+from a10_octavia.common import data_models
+from a10_octavia.controller.worker import device_executor
+from a10_octavia.tests.common import a10constants
+
+
+class TestDeviceExecutor(base.TestCase):
+
+    def setUp(self):
+        super(TestDeviceExecutor, self).setUp()
+        self.conf = self.useFixture(oslo_fixture.Config(cfg.CONF))
+        self.thunders = [data_models.VThunder(ip_address=ip, partition_name=partition)
+                         for ip in ('10.0.0.1', '10.0.0.2', '10.0.0.3')
+                         for partition in ('shared', 'p1', 'p2')]
+        self.lock = threading.Lock()
+        self.running = collections.Counter()
+        self.max_running = collections.Counter()
+        self.done = []
+
+    def _job(self, thunder):
+        with self.lock:
+            self.running[thunder.ip_address] += 1
+            self.max_running[thunder.ip_address] = max(
+                self.max_running[thunder.ip_address], self.running[thunder.ip_address])
+            self.max_running['total'] = max(self.max_running['total'],
+                                            sum(self.running.values()))
+        time.sleep(0.02)
+        with self.lock:
+            self.running[thunder.ip_address] -= 1
+            self.done.append((thunder.ip_address, thunder.partition_name))
+
+    def test_run_serializes_partitions_of_a_device(self):
+        executor = device_executor.DeviceExecutor('write memory')
+        stats = executor.run(self.thunders, self._job)
+        self.assertEqual(9, len(self.done))
+        self.assertEqual(1, self.max_running['10.0.0.1'])
+        self.assertEqual(1, self.max_running['10.0.0.2'])
+        self.assertGreater(self.max_running['total'], 1)
+        device_order = [p for ip, p in self.done if ip == '10.0.0.1']
+        self.assertEqual(['shared', 'p1', 'p2'], device_order)
+        self.assertEqual(3, stats['devices'])
+        self.assertEqual(9, stats['partitions'])
+        self.assertEqual(0, stats['pending'])
+        self.assertEqual(0, stats['failed'])
+        self.assertGreater(stats['last_cycle_seconds'], 0)
+
+    def test_run_per_device_limit(self):
+        self.conf.config(group=a10constants.A10_HOUSE_KEEPING,
+                         write_mem_device_threads=1, write_mem_partitions_per_device=3)
+        executor = device_executor.DeviceExecutor('write memory')
+        executor.run(self.thunders, self._job)
+        self.assertEqual(9, len(self.done))
+        self.assertEqual(3, self.max_running['total'])
+
+    def test_run_continues_after_failure(self):
+        def job(thunder):
+            if thunder.partition_name == 'p1':
+                raise Exception('write memory failed')
+            self._job(thunder)
+
+        executor = device_executor.DeviceExecutor('write memory')
+        stats = executor.run(self.thunders, job)
+        self.assertEqual(6, len(self.done))
+        self.assertEqual(3, stats['failed'])
+        self.assertEqual(0, stats['pending'])
+
+    def test_run_no_thunders(self):
+        executor = device_executor.DeviceExecutor('reload check')
+        stats = executor.run([], self._job)
+        self.assertEqual(0, stats['devices'])
+        self.assertEqual(0, stats['partitions'])
+
+    def test_run_devices_once_per_device(self):
+        devices = []
+
+        def job(device_thunders):
+            if device_thunders[0].ip_address == '10.0.0.3':
+                raise Exception('login failed')
+            with self.lock:
+                devices.append([(t.ip_address, t.partition_name) for t in device_thunders])
+
+        executor = device_executor.DeviceExecutor('write memory')
+        stats = executor.run_devices(self.thunders, job)
+        self.assertEqual([[('10.0.0.1', 'shared'), ('10.0.0.1', 'p1'), ('10.0.0.1', 'p2')],
+                          [('10.0.0.2', 'shared'), ('10.0.0.2', 'p1'), ('10.0.0.2', 'p2')]],
+                         sorted(devices))
+        self.assertEqual(3, stats['failed'])
+        self.assertEqual(0, stats['pending'])
@@ -0,0 +1,68 @@
+#    Copyright 2021, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from oslo_config import cfg
+from oslo_config import fixture as oslo_fixture
+
+from octavia.common import data_models as o_data_models
+from octavia.tests.unit import base
+
+from a10_octavia.common import config_options  # noqa
+from a10_octavia.controller.worker import stats_tracker
+
+
+def _stats(listener_id, bytes_in=0, amphora_id='amphora-1'):
+    return o_data_models.ListenerStatistics(listener_id=listener_id, amphora_id=amphora_id,
+                                            bytes_in=bytes_in)
+
+
+class TestListenerStatsTracker(base.TestCase):
+
+    def setUp(self):
+        super(TestListenerStatsTracker, self).setUp()
+        self.conf = self.useFixture(oslo_fixture.Config(cfg.CONF))
+        self.tracker = stats_tracker.ListenerStatsTracker()
+
+    def test_get_changed_skips_unchanged(self):
+        written = [_stats('listener-1', 10), _stats('listener-2', 20)]
+        self.assertEqual(written, self.tracker.get_changed(written))
+        self.tracker.record(written)
+
+        listener_stats = [_stats('listener-1', 10), _stats('listener-2', 25),
+                          _stats('listener-2', 20, amphora_id='amphora-2')]
+        self.assertEqual(listener_stats[1:], self.tracker.get_changed(listener_stats))
+
+    def test_get_changed_min_write_interval(self):
+        self.conf.config(group='a10_health_manager', stats_min_write_interval=60)
+        self.tracker.record([_stats('listener-1', 10)])
+        self.assertEqual([], self.tracker.get_changed([_stats('listener-1', 15)]))
+
+        with mock.patch.object(stats_tracker.timeutils.StopWatch, 'elapsed',
+                               return_value=61):
+            listener_stats = [_stats('listener-1', 15)]
+            self.assertEqual(listener_stats, self.tracker.get_changed(listener_stats))
+
+    def test_stale_entries_dropped(self):
+        self.tracker.record([_stats('listener-1', 10)])
+        with mock.patch.object(stats_tracker.timeutils.StopWatch, 'expired',
+                               return_value=True), \
+                mock.patch.object(stats_tracker.timeutils.StopWatch, 'elapsed',
+                                  return_value=stats_tracker.STALE_ENTRY_SECONDS + 1):
+            listener_stats = [_stats('listener-1', 10)]
+            self.assertEqual(listener_stats, self.tracker.get_changed(listener_stats))
@@ -0,0 +1,175 @@
+#    Copyright 2021, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from concurrent import futures
+import threading
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from oslo_config import cfg
+from oslo_config import fixture as oslo_fixture
+from requests import exceptions as req_exceptions
+
+from octavia.tests.unit import base
+
+from a10_octavia.common import config_options  # noqa
+from a10_octavia.common import data_models
+from a10_octavia.controller.worker import vcs_watcher
+from a10_octavia.tests.common import a10constants
+
+
+VCS_MASTER_VBLADE = {
+    "vcs-summary": {
+        "oper": {
+            "member-list": [{
+                "state": "vMaster(*)", "ip-list": [{"ip": "10.0.0.1"}], "id": 1
+            }, {
+                "state": "vBlade", "ip-list": [{"ip": "10.0.0.2"}], "id": 2
+            }]
+        }
+    }
+}
+
+VCS_MASTER_ONLY = {
+    "vcs-summary": {
+        "oper": {
+            "member-list": [{
+                "state": "Unknown", "ip-list": [{"ip": "N/A"}], "id": 1
+            }, {
+                "state": "vMaster(*)", "ip-list": [{"ip": "10.0.0.2"}], "id": 2
+            }]
+        }
+    }
+}
+
+VCS_HANDSHAKE_COMPLETED = {
+    "vcs-summary": {
+        "oper": {
+            "member-list": [],
+            "vcs-handshake-completed-list": [{"vcs-handshake-completed": 1}]
+        }
+    }
+}
+
+
+class TestVCSState(base.TestCase):
+
+    def test_ready_with_vmaster_and_vblade(self):
+        state = vcs_watcher.VCSState(VCS_MASTER_VBLADE)
+        self.assertTrue(state.ready)
+        self.assertEqual('10.0.0.1', state.vmaster_ip)
+        self.assertEqual({'10.0.0.1', '10.0.0.2'}, set(state.member_ips))
+
+    def test_not_ready_without_vblade(self):
+        state = vcs_watcher.VCSState(VCS_MASTER_ONLY)
+        self.assertFalse(state.ready)
+        self.assertEqual('10.0.0.2', state.vmaster_ip)
+        self.assertEqual(['10.0.0.2'], state.member_ips)
+
+    def test_ready_with_handshake_completed(self):
+        state = vcs_watcher.VCSState(VCS_HANDSHAKE_COMPLETED, '5.2.1-P2')
+        self.assertTrue(state.ready)
+        self.assertFalse(vcs_watcher.VCSState(VCS_MASTER_VBLADE, '5.2.1-P2').ready)
+
+
+class TestVCSStateWatcher(base.TestCase):
+
+    def setUp(self):
+        super(TestVCSStateWatcher, self).setUp()
+        self.conf = self.useFixture(oslo_fixture.Config(cfg.CONF))
+        self.conf.config(group=a10constants.A10_CONTROLLER_WORKER_CONF_SECTION,
+                         amp_vcs_retries=2, amp_vcs_wait_sec=1,
+                         amp_ready_poll_interval=0.1)
+        self.vthunder = data_models.VThunder(id='vthunder-1', ip_address='10.0.0.1')
+        self.watcher = vcs_watcher.VCSStateWatcher()
+        self.clients = {}
+        patcher = mock.patch('a10_octavia.controller.worker.vcs_watcher.a10_utils')
+        self.mock_utils = patcher.start()
+        self.addCleanup(patcher.stop)
+        # probes left running by a finished wait must not outlive the patch
+        self.addCleanup(lambda: futures.wait(list(self.watcher._probes.values())))
+        self.mock_utils.get_axapi_client.side_effect = (
+            lambda thunder: self.clients.setdefault(thunder.ip_address, mock.Mock()))
+
+    def _vcs_summary(self, ip_address, *responses):
+        client = self.clients.setdefault(ip_address, mock.Mock())
+        client.system.action.get_vcs_summary_oper.side_effect = responses
+
+    def test_wait_ready_shares_state_with_following_waits(self):
+        self._vcs_summary('10.0.0.1', VCS_MASTER_VBLADE)
+        self.watcher.wait_ready(self.vthunder)
+        self.assertTrue(self.watcher.wait_ready(self.vthunder).ready)
+        self.clients['10.0.0.1'].system.action.get_vcs_summary_oper.assert_called_once()
+        self.clients['10.0.0.1'].session.close.assert_called_once()
+
+    def test_wait_vmaster_probes_again(self):
+        self._vcs_summary('10.0.0.1', VCS_MASTER_VBLADE, VCS_MASTER_VBLADE)
+        self._vcs_summary('10.0.0.2', req_exceptions.ConnectionError())
+        self.watcher.wait_ready(self.vthunder)
+        state = self.watcher.wait_vmaster(self.vthunder)
+        self.assertEqual('10.0.0.1', state.vmaster_ip)
+        self.assertEqual(2, self.clients['10.0.0.1'].system.action.
+                         get_vcs_summary_oper.call_count)
+
+    def test_member_with_running_probe_not_probed_again(self):
+        self._vcs_summary('10.0.0.1', VCS_MASTER_VBLADE)
+        self.watcher.wait_ready(self.vthunder)
+        self.watcher.invalidate(self.vthunder.ip_address)
+
+        reloading = threading.Event()
+        self.addCleanup(reloading.set)
+        self.clients['10.0.0.1'].reset_mock()
+        self._vcs_summary('10.0.0.1', req_exceptions.ConnectionError(),
+                          req_exceptions.ConnectionError(), VCS_MASTER_VBLADE)
+        client = self.clients.setdefault('10.0.0.2', mock.Mock())
+        client.system.action.get_vcs_summary_oper.side_effect = (
+            lambda: reloading.wait(5) and VCS_MASTER_VBLADE)
+        self.assertTrue(self.watcher.wait_ready(self.vthunder).ready)
+        self.assertEqual(3, self.clients['10.0.0.1'].system.action.
+                         get_vcs_summary_oper.call_count)
+        client.system.action.get_vcs_summary_oper.assert_called_once_with()
+
+    def test_wait_ready_probes_peer_of_reloading_member(self):
+        self._vcs_summary('10.0.0.1', VCS_MASTER_VBLADE,
+                          req_exceptions.ConnectionError(), req_exceptions.ConnectionError())
+        self.watcher.wait_ready(self.vthunder)
+        self.watcher.invalidate(self.vthunder.ip_address)
+        self.assertIsNone(self.watcher.get_state('10.0.0.2'))
+
+        self._vcs_summary('10.0.0.2', VCS_MASTER_ONLY, VCS_MASTER_VBLADE)
+        state = self.watcher.wait_ready(self.vthunder)
+        self.assertTrue(state.ready)
+        self.assertEqual(2, self.clients['10.0.0.2'].system.action.
+                         get_vcs_summary_oper.call_count)
+
+    def test_state_probed_before_invalidate_not_recorded(self):
+        def vcs_summary_oper():
+            # a reload task invalidates the member while the probe is running
+            self.watcher.invalidate('10.0.0.1')
+            return VCS_MASTER_VBLADE
+        client = self.clients.setdefault('10.0.0.1', mock.Mock())
+        client.system.action.get_vcs_summary_oper.side_effect = vcs_summary_oper
+        state = self.watcher.wait_ready(self.vthunder)
+        self.assertTrue(state.ready)
+        self.assertIsNone(self.watcher.get_state('10.0.0.1'))
+        self.assertIsNone(self.watcher.get_state('10.0.0.2'))
+
+    def test_wait_raises_last_error_after_deadline(self):
+        self.conf.config(group=a10constants.A10_CONTROLLER_WORKER_CONF_SECTION,
+                         amp_vcs_retries=0)
+        self._vcs_summary('10.0.0.1', req_exceptions.ConnectionError())
+        self.assertRaises(req_exceptions.ConnectionError,
+                          self.watcher.wait_ready, self.vthunder)
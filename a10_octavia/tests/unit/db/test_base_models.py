@@ -0,0 +1,160 @@
+#    Copyright 2021, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import sqlalchemy as sa
+from sqlalchemy.ext import declarative
+from sqlalchemy import orm
+from sqlalchemy.orm import collections
+import timeit
+
+from octavia.tests.unit import base
+
+from a10_octavia.db import base_models
+from a10_octavia.db import models
+
+FakeBase = declarative.declarative_base(cls=base_models.A10Base)
+
+
+class DataModel(object):
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+# _get_unique_key keys graph nodes on the class name, so the fake models
+# reuse names it knows about
+LoadBalancerDataModel = type('LoadBalancer', (DataModel,), {})
+MemberDataModel = type('Member', (DataModel,), {})
+
+
+class LoadBalancer(FakeBase):
+    __data_model__ = LoadBalancerDataModel
+    __tablename__ = 'fake_load_balancer'
+
+    id = sa.Column(sa.String(36), primary_key=True)
+    name = sa.Column(sa.String(255))
+    members = orm.relationship('Member', backref=orm.backref('load_balancer'))
+
+
+class Member(FakeBase):
+    __data_model__ = MemberDataModel
+    __tablename__ = 'fake_member'
+
+    id = sa.Column(sa.String(36), primary_key=True)
+    load_balancer_id = sa.Column(sa.String(36), sa.ForeignKey('fake_load_balancer.id'))
+
+
+def _build_load_balancer(member_count):
+    lb = LoadBalancer(id='lb-1', name='lb')
+    for i in range(member_count):
+        lb.members.append(Member(id='member-{}'.format(i), load_balancer_id=lb.id))
+    return lb
+
+
+def _dir_to_data_model(self, _graph_nodes=None):
+    """The dir() based conversion to_data_model replaced, kept for benchmarks"""
+    _graph_nodes = _graph_nodes or {}
+    dm_kwargs = {}
+    for column in self.__table__.columns:
+        dm_kwargs[column.name] = getattr(self, column.name)
+    attr_names = [attr_name for attr_name in dir(self)
+                  if not attr_name.startswith('_')]
+    dm_self = self.__data_model__(**dm_kwargs)
+    _graph_nodes.update({self._get_unique_key(dm_self): dm_self})
+    for attr_name in attr_names:
+        attr = getattr(self, attr_name)
+        if isinstance(attr, base_models.A10Base):
+            ukey = self._get_unique_key(attr)
+            if ukey in _graph_nodes:
+                setattr(dm_self, attr_name, _graph_nodes[ukey])
+            else:
+                setattr(dm_self, attr_name, _dir_to_data_model(attr, _graph_nodes))
+        elif isinstance(attr, (collections.InstrumentedList, list)):
+            setattr(dm_self, attr_name, [])
+            listref = getattr(dm_self, attr_name)
+            for item in attr:
+                if isinstance(item, base_models.A10Base):
+                    ukey = self._get_unique_key(item)
+                    if ukey in _graph_nodes:
+                        listref.append(_graph_nodes[ukey])
+                    else:
+                        listref.append(_dir_to_data_model(item, _graph_nodes))
+    return dm_self
+
+
+class TestA10Base(base.TestCase):
+
+    def setUp(self):
+        super(TestA10Base, self).setUp()
+        orm.configure_mappers()
+
+    def test_conversion_attrs_cached_on_mapper_configure(self):
+        self.assertEqual((['id', 'name'], ['members']),
+                         LoadBalancer.__dict__['_conversion_attrs'])
+        self.assertEqual((['id', 'load_balancer_id'], ['load_balancer']),
+                         Member.__dict__['_conversion_attrs'])
+        self.assertEqual([], models.VThunder._get_conversion_attrs()[1])
+
+    def test_to_data_model_full_graph(self):
+        lb = _build_load_balancer(3)
+        lb_dm = lb.to_data_model()
+        self.assertEqual('lb', lb_dm.name)
+        self.assertEqual(['member-0', 'member-1', 'member-2'],
+                         [member.id for member in lb_dm.members])
+        for member in lb_dm.members:
+            self.assertIs(lb_dm, member.load_balancer)
+
+    def test_to_data_model_matches_dir_conversion(self):
+        lb = _build_load_balancer(3)
+        lb_dm = lb.to_data_model()
+        dir_lb_dm = _dir_to_data_model(lb)
+        self.assertEqual(sorted(vars(dir_lb_dm)), sorted(vars(lb_dm)))
+        self.assertEqual([vars(m)['id'] for m in dir_lb_dm.members],
+                         [vars(m)['id'] for m in lb_dm.members])
+
+    def test_to_data_model_requested_relationships(self):
+        lb = _build_load_balancer(2)
+        lb_dm = lb.to_data_model(relationships=['members'])
+        self.assertEqual(2, len(lb_dm.members))
+        for member in lb_dm.members:
+            self.assertFalse(hasattr(member, 'load_balancer'))
+
+    def test_to_data_model_no_relationships(self):
+        member = _build_load_balancer(1).members[0]
+        member_dm = member.to_data_model(relationships=())
+        self.assertEqual('lb-1', member_dm.load_balancer_id)
+        self.assertFalse(hasattr(member_dm, 'load_balancer'))
+
+
+def benchmark(sizes=(10, 100, 1000), number=20):
+    """Compare to_data_model with the dir() based conversion
+
+    Run with: python -m a10_octavia.tests.unit.db.test_base_models
+    """
+    orm.configure_mappers()
+    print('{:>8} {:>12} {:>12} {:>16}'.format(
+        'members', 'dir() ms', 'cached ms', 'members only ms'))
+    for size in sizes:
+        lb = _build_load_balancer(size)
+        results = [
+            timeit.timeit(lambda: _dir_to_data_model(lb), number=number),
+            timeit.timeit(lambda: lb.to_data_model(), number=number),
+            timeit.timeit(lambda: lb.to_data_model(relationships=['members']),
+                          number=number)]
+        print('{:>8} {:>12.2f} {:>12.2f} {:>16.2f}'.format(
+            size, *[result * 1000 / number for result in results]))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,84 @@
+#    Copyright 2021, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import threading
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from a10_octavia.db import flow_session
+from a10_octavia.db import models
+from a10_octavia.tests.unit.db import test_repositories
+
+
+class TestFlowSession(test_repositories.BaseRepositoryTest):
+
+    def setUp(self):
+        super(TestFlowSession, self).setUp()
+        patcher = mock.patch('a10_octavia.db.flow_session.db_apis.get_session',
+                             side_effect=lambda **kwargs: test_repositories.Session(
+                                 bind=self.engine))
+        self.mock_get_session = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.flow_session = flow_session.FlowSession('test-flow')
+
+    def _vthunder(self, id):
+        return models.VThunder(id=id, vthunder_id='vthunder-{}'.format(id),
+                               device_name='device', ip_address='10.0.0.1',
+                               partition_name='p{}'.format(id), username='admin',
+                               password='a10', status='ACTIVE', role='MASTER',
+                               last_udp_update=datetime.datetime.utcnow())
+
+    def test_get_session_per_thread(self):
+        session = self.flow_session.get_session()
+        self.assertIs(session, self.flow_session.get_session())
+
+        other = []
+        thread = threading.Thread(
+            target=lambda: other.append(self.flow_session.get_session()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(session, other[0])
+        self.assertEqual(2, self.flow_session.stats['sessions'])
+
+    def test_statements_counted(self):
+        session = self.flow_session.get_session()
+        session.query(models.VThunder).all()
+        session.query(models.VThunder).count()
+        stats = self.flow_session.close()
+        self.assertEqual({'sessions': 1, 'statements': 2}, stats)
+
+    def test_unit_of_work_commits_once(self):
+        with self.flow_session.unit_of_work() as session:
+            session.add(self._vthunder(1))
+            session.add(self._vthunder(2))
+        self.assertEqual(2, self.session.query(models.VThunder).count())
+
+    def test_unit_of_work_rolls_back(self):
+        def _failed_unit_of_work():
+            with self.flow_session.unit_of_work() as session:
+                session.add(self._vthunder(1))
+                session.flush()
+                raise ValueError()
+        self.assertRaises(ValueError, _failed_unit_of_work)
+        self.assertEqual(0, self.session.query(models.VThunder).count())
+
+    def test_get_session_without_flow_session(self):
+        flow_session.get_session()
+        self.mock_get_session.assert_called_once_with()
+        self.assertIs(self.flow_session.get_session(),
+                      flow_session.get_session(self.flow_session))
@@ -0,0 +1,422 @@
+#    Copyright 2021, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy import orm
+
+from octavia.common import data_models as o_data_models
+from octavia.db import models as o_models
+from octavia.tests.unit import base
+
+from a10_octavia.db import models
+from a10_octavia.db import repositories as repo
+
+
+class Session(orm.Session):
+
+    def begin(self, subtransactions=False, **kwargs):
+        # Newer SQLAlchemy dropped subtransactions, which the repositories
+        # pass for the releases octavia runs on. Join the open transaction.
+        if subtransactions and self.in_transaction():
+            return self.begin_nested()
+        return super(Session, self).begin(**kwargs)
+
+
+class BaseRepositoryTest(base.TestCase):
+
+    def setUp(self):
+        super(BaseRepositoryTest, self).setUp()
+        self.engine = sa.create_engine('sqlite://')
+        models.base_models.BASE.metadata.create_all(self.engine)
+        self.session = Session(bind=self.engine)
+        self.addCleanup(self.session.close)
+
+    def _create_vthunder(self, **kwargs):
+        values = {'vthunder_id': 'vthunder-{}'.format(kwargs.get('id')),
+                  'device_name': 'device', 'ip_address': '10.0.0.1',
+                  'username': 'admin', 'password': 'a10',
+                  'last_udp_update': datetime.datetime.utcnow(),
+                  'status': 'ACTIVE', 'role': 'MASTER',
+                  'partition_name': 'shared'}
+        values.update(kwargs)
+        self.session.add(models.VThunder(**values))
+        self.session.flush()
+
+
+class TestVThunderRepository(BaseRepositoryTest):
+
+    def setUp(self):
+        super(TestVThunderRepository, self).setUp()
+        self.repo = repo.VThunderRepository()
+        self._create_vthunder(id=1, project_id='project-1', loadbalancer_id='lb-1',
+                              compute_id='compute-1', partition_name='p1')
+        self._create_vthunder(id=2, project_id='project-1', loadbalancer_id='lb-2',
+                              compute_id='compute-1', role='BACKUP')
+        self._create_vthunder(id=3, project_id='project-2', ip_address='10.0.0.2',
+                              status='DELETED')
+
+    def test_get_vthunders_by_project_id_returns_ids(self):
+        self.assertEqual([1], self.repo.get_vthunders_by_project_id(
+            self.session, 'project-1'))
+
+    def test_get_vthunders_by_ip_address_fields(self):
+        rows = self.repo.get_vthunders_by_ip_address(
+            self.session, '10.0.0.1', fields=('partition_name', 'project_id'))
+        self.assertEqual([('p1', 'project-1')], [tuple(row) for row in rows])
+        self.assertEqual('p1', rows[0].partition_name)
+
+    def test_get_vthunders_by_project_id_and_role_fields(self):
+        rows = self.repo.get_vthunders_by_project_id_and_role(
+            self.session, 'project-1', 'BACKUP', fields=('loadbalancer_id', 'compute_id'))
+        self.assertEqual([('lb-2', 'compute-1')], [tuple(row) for row in rows])
+
+    def test_get_rack_vthunders_by_ip_address(self):
+        self.assertEqual([1], self.repo.get_rack_vthunders_by_ip_address(
+            self.session, '10.0.0.1'))
+
+    def test_get_compute_vthunders_fields(self):
+        rows = self.repo.get_compute_vthunders(self.session, 'compute-1',
+                                               fields=('loadbalancer_id',))
+        self.assertEqual(['lb-1', 'lb-2'], sorted(row.loadbalancer_id for row in rows))
+
+    def test_get_all_deleted_expiring(self):
+        self.session.query(models.VThunder).filter_by(id=3).update(
+            {'updated_at': datetime.datetime.utcnow() - datetime.timedelta(days=2)})
+        self.assertEqual([3], self.repo.get_all_deleted_expiring(
+            self.session, datetime.timedelta(days=1)))
+
+    def test_get_vthunder_from_src_addr(self):
+        self.assertEqual(1, self.repo.get_vthunder_from_src_addr(self.session, '10.0.0.1'))
+        self.assertIsNone(self.repo.get_vthunder_from_src_addr(self.session, '10.0.0.2'))
+
+    def test_update_last_write_mem_bulk(self):
+        self._create_vthunder(id=4, partition_name='p2')
+        last_write_mem = datetime.datetime(2021, 1, 1)
+        self.assertEqual(2, self.repo.update_last_write_mem_bulk(
+            self.session, '10.0.0.1', ['p1', 'p2'], last_write_mem=last_write_mem))
+        self.assertEqual({1: last_write_mem, 2: None, 4: last_write_mem}, dict(
+            self.session.query(models.VThunder.id, models.VThunder.last_write_mem).filter(
+                models.VThunder.ip_address == '10.0.0.1')))
+        self.assertEqual(0, self.repo.update_last_write_mem_bulk(
+            self.session, '10.0.0.1', [], last_write_mem=last_write_mem))
+
+    def test_get_thunders_by_partitions(self):
+        self._create_vthunder(id=4, partition_name='p2')
+        self._create_vthunder(id=5, partition_name='p2', ip_address='10.0.0.2')
+        thunders = self.repo.get_thunders_by_partitions(
+            self.session, [('10.0.0.1', 'p1'), ('10.0.0.1', 'shared'), ('10.0.0.2', 'p2')])
+        self.assertEqual([1, 5], sorted(thunder.id for thunder in thunders))
+        self.assertEqual([], self.repo.get_thunders_by_partitions(self.session, []))
+
+    def test_get_partitions_in_use(self):
+        self._create_vthunder(id=4, partition_name='p2', status='PENDING_UPDATE',
+                              role='BACKUP')
+        self.assertEqual({('10.0.0.1', 'p1'), ('10.0.0.1', 'p2')},
+                         self.repo.get_partitions_in_use(
+                             self.session, [('10.0.0.1', 'p1'), ('10.0.0.1', 'p2'),
+                                            ('10.0.0.1', 'p3'), ('10.0.0.9', 'p1')]))
+        self.assertEqual(set(), self.repo.get_partitions_in_use(self.session, []))
+
+    def test_claim_spare_vthunder(self):
+        self._create_vthunder(id=4, status='READY', role='MASTER', topology='SPARE')
+        self._create_vthunder(id=5, status='BOOTING', role='MASTER', topology='SPARE')
+        self.assertEqual(1, self.repo.get_booting_spare_vthunder_count(self.session))
+        spare = self.repo.claim_spare_vthunder(self.session, 'PENDING_DELETE')
+        self.assertEqual(4, spare.id)
+        self.assertEqual('PENDING_DELETE', spare.status)
+        self.assertIsNone(self.repo.claim_spare_vthunder(self.session, 'PENDING_DELETE'))
+
+    def test_claim_spare_vthunder_warm_first(self):
+        self._create_vthunder(id=4, status='READY', role='MASTER', topology='SPARE')
+        self._create_vthunder(id=5, status='READY', role='MASTER', topology='SPARE',
+                              project_id='project-1')
+        self.assertEqual(5, self.repo.claim_spare_vthunder(self.session, 'PENDING_DELETE').id)
+
+    def test_get_spare_vthunder(self):
+        self._create_vthunder(id=4, status='READY', role='MASTER', topology='SPARE')
+        self._create_vthunder(id=5, status='READY', role='MASTER', topology='SPARE',
+                              project_id='project-1')
+        self.assertEqual(5, self.repo.get_spare_vthunder(self.session, 'project-1').id)
+        self.assertEqual(4, self.repo.get_spare_vthunder(self.session, 'project-2').id)
+        self.assertEqual(4, self.repo.get_spare_vthunder(self.session).id)
+        self.repo.set_spare_vthunder_status(self.session, 4, 'BUSY')
+        self.assertIsNone(self.repo.get_spare_vthunder(self.session, 'project-2'))
+
+    def test_claim_spare_vthunder_by_id(self):
+        self._create_vthunder(id=4, status='READY', role='MASTER', topology='SPARE')
+        self._create_vthunder(id=5, status='READY', role='MASTER', topology='SPARE')
+        spare = self.repo.claim_spare_vthunder(self.session, 'BUSY', vthunder_id=5)
+        self.assertEqual(5, spare.id)
+        self.assertEqual('BUSY', spare.status)
+        self.assertIsNone(self.repo.claim_spare_vthunder(self.session, 'BUSY', vthunder_id=5))
+        self.assertEqual([4], [spare.id for spare in self.repo.get_spare_vthunders(self.session)])
+
+
+class TestPartitionChangeRepository(BaseRepositoryTest):
+
+    def setUp(self):
+        super(TestPartitionChangeRepository, self).setUp()
+        self.repo = repo.PartitionChangeRepository()
+
+    def _counts(self, partition_name):
+        change = self.session.query(models.PartitionChange).filter_by(
+            ip_address='10.0.0.1', partition_name=partition_name).one()
+        self.session.refresh(change)
+        return change.change_count, change.written_count, change.pending
+
+    def test_bump(self):
+        self.repo.bump(self.session, '10.0.0.1', 'p1')
+        self.repo.bump(self.session, '10.0.0.1', 'p1')
+        self.repo.bump(self.session, '10.0.0.1', 'p2')
+        self.assertEqual((2, 0, True), self._counts('p1'))
+        self.assertEqual({('10.0.0.1', 'p1'): 2, ('10.0.0.1', 'p2'): 1},
+                         self.repo.get_pending(self.session))
+
+    def test_mark_written(self):
+        self.repo.bump(self.session, '10.0.0.1', 'p1')
+        self.repo.bump(self.session, '10.0.0.1', 'p2')
+        self.repo.mark_written(self.session, '10.0.0.1', ['p1', 'p2'])
+        self.assertEqual((1, 1, False), self._counts('p1'))
+        self.assertEqual({}, self.repo.get_pending(self.session))
+
+    def test_mark_written_keeps_later_changes_pending(self):
+        self.repo.bump(self.session, '10.0.0.1', 'p1')
+        self.repo.bump(self.session, '10.0.0.1', 'p2')
+        change_counts = self.repo.get_change_counts(self.session, '10.0.0.1', ['p1', 'p2'])
+        self.assertEqual({'p1': 1, 'p2': 1}, change_counts)
+        # A change recorded while write memory runs
+        self.repo.bump(self.session, '10.0.0.1', 'p2')
+        self.repo.mark_written(self.session, '10.0.0.1', ['p1', 'p2'], change_counts)
+        self.assertEqual((1, 1, False), self._counts('p1'))
+        self.assertEqual((2, 1, True), self._counts('p2'))
+        self.assertEqual({('10.0.0.1', 'p2'): 2}, self.repo.get_pending(self.session))
+
+    def test_delete_unchanged(self):
+        self.repo.bump(self.session, '10.0.0.1', 'p1')
+        change_count = self.repo.get_pending(self.session)[('10.0.0.1', 'p1')]
+        # A change recorded after the journal was read
+        self.repo.bump(self.session, '10.0.0.1', 'p1')
+        self.assertEqual(0, self.repo.delete_unchanged(
+            self.session, '10.0.0.1', 'p1', change_count))
+        self.assertEqual((2, 0, True), self._counts('p1'))
+        self.assertEqual(1, self.repo.delete_unchanged(
+            self.session, '10.0.0.1', 'p1', change_count + 1))
+        self.assertEqual({}, self.repo.get_pending(self.session))
+
+
+class TestLoadBalancerRepository(BaseRepositoryTest):
+
+    def setUp(self):
+        super(TestLoadBalancerRepository, self).setUp()
+        o_models.LoadBalancer.__table__.create(self.engine)
+        self.repo = repo.LoadBalancerRepository()
+        for lb_id in ('lb-1', 'lb-2', 'lb-3'):
+            self.session.execute(o_models.LoadBalancer.__table__.insert().values(
+                id=lb_id, project_id='project-1', provisioning_status='ACTIVE',
+                operating_status='ONLINE', enabled=True))
+
+    def test_update_provisioning_status_bulk(self):
+        self.assertEqual(2, self.repo.update_provisioning_status_bulk(
+            self.session, ['lb-1', 'lb-3'], 'PENDING_UPDATE'))
+        self.assertEqual({'lb-1': 'PENDING_UPDATE', 'lb-2': 'ACTIVE', 'lb-3': 'PENDING_UPDATE'},
+                         dict(self.session.query(o_models.LoadBalancer.id,
+                                                 o_models.LoadBalancer.provisioning_status)))
+        self.assertEqual(0, self.repo.update_provisioning_status_bulk(
+            self.session, [], 'ACTIVE'))
+
+    def test_get_active_lb_ids(self):
+        self.repo.update_provisioning_status_bulk(self.session, ['lb-2'], 'PENDING_UPDATE')
+        self.assertEqual({'lb-1', 'lb-3'}, self.repo.get_active_lb_ids(
+            self.session, ['lb-1', 'lb-2', 'lb-3', 'lb-4']))
+        self.assertEqual(set(), self.repo.get_active_lb_ids(self.session, []))
+
+    def test_get_vip_subnet_usage(self):
+        o_models.Vip.__table__.create(self.engine)
+        self.session.execute(o_models.LoadBalancer.__table__.insert().values(
+            id='lb-4', project_id='project-1', provisioning_status='ERROR',
+            operating_status='ONLINE', enabled=True))
+        self.session.execute(o_models.LoadBalancer.__table__.insert().values(
+            id='lb-5', project_id='project-2', provisioning_status='ACTIVE',
+            operating_status='ONLINE', enabled=True))
+        for lb_id, subnet_id in (('lb-1', 'subnet-1'), ('lb-2', 'subnet-2'),
+                                 ('lb-3', 'subnet-2'), ('lb-4', 'subnet-1'),
+                                 ('lb-5', 'subnet-2')):
+            self.session.execute(o_models.Vip.__table__.insert().values(
+                load_balancer_id=lb_id, subnet_id=subnet_id))
+        self.assertEqual(
+            [('project-1', 'subnet-2', 2), ('project-1', 'subnet-1', 1),
+             ('project-2', 'subnet-2', 1)],
+            sorted(self.repo.get_vip_subnet_usage(self.session),
+                   key=lambda usage: (-usage[2], usage[0])))
+
+
+class TestMemberRepository(BaseRepositoryTest):
+
+    def setUp(self):
+        super(TestMemberRepository, self).setUp()
+        o_models.Member.__table__.create(self.engine)
+        self.repo = repo.MemberRepository()
+
+    def test_get_member_subnet_usage(self):
+        members = (('project-1', 'subnet-1', 'ACTIVE'), ('project-1', 'subnet-2', 'ACTIVE'),
+                   ('project-1', 'subnet-2', 'ACTIVE'), ('project-1', 'subnet-1', 'ERROR'),
+                   ('project-1', None, 'ACTIVE'), ('project-2', 'subnet-1', 'ACTIVE'))
+        for i, (project_id, subnet_id, status) in enumerate(members):
+            self.session.execute(o_models.Member.__table__.insert().values(
+                id='member-{}'.format(i), project_id=project_id, pool_id='pool-1',
+                subnet_id=subnet_id,
+                ip_address='10.0.0.{}'.format(i), protocol_port=80, weight=1,
+                provisioning_status=status, operating_status='ONLINE', enabled=True,
+                backup=False))
+        self.assertEqual(
+            [('project-1', 'subnet-2', 2), ('project-1', 'subnet-1', 1),
+             ('project-2', 'subnet-1', 1)],
+            sorted(self.repo.get_member_subnet_usage(self.session),
+                   key=lambda usage: (-usage[2], usage[0])))
+
+
+class TestBulkDelete(BaseRepositoryTest):
+
+    def setUp(self):
+        super(TestBulkDelete, self).setUp()
+        self.repo = repo.VThunderRepository()
+        for i in range(1, 12):
+            self._create_vthunder(id=i, status='DELETED' if i % 2 else 'ACTIVE')
+
+    def test_delete(self):
+        self.assertEqual(6, self.repo.delete(self.session, status='DELETED'))
+        self.assertEqual(5, self.repo.count(self.session))
+
+    def test_delete_batch_in_chunks(self):
+        statements = []
+        event.listen(self.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+        self.assertEqual(7, repo.delete_in_chunks(
+            self.session, models.VThunder, models.VThunder.id,
+            [1, 2, 3, 4, 5, 6, 7, 100], chunk_size=3))
+        self.assertEqual(3, len([stmt for stmt in statements if stmt.startswith('DELETE')]))
+        self.assertEqual(4, self.repo.count(self.session))
+
+    def test_delete_batch_no_ids(self):
+        self.assertEqual(0, self.repo.delete_batch(self.session, ids=[]))
+        self.assertEqual(11, self.repo.count(self.session))
+
+
+class TestListenerStatisticsRepository(BaseRepositoryTest):
+
+    def setUp(self):
+        super(TestListenerStatisticsRepository, self).setUp()
+        o_models.Listener.__table__.create(self.engine)
+        o_models.ListenerStatistics.__table__.create(self.engine)
+        self.repo = repo.ListenerStatisticsRepository()
+        for listener_id in ('listener-1', 'listener-2', 'listener-3'):
+            for amphora_id in ('amphora-1', 'amphora-2'):
+                self.session.add(o_models.ListenerStatistics(
+                    listener_id=listener_id, amphora_id=amphora_id, bytes_in=0,
+                    bytes_out=0, active_connections=0, total_connections=0,
+                    request_errors=0))
+        self.session.flush()
+
+    def test_delete_multiple(self):
+        self.assertEqual(2, self.repo.delete_multiple(self.session, listener_id='listener-1'))
+        self.assertEqual(4, self.session.query(o_models.ListenerStatistics).count())
+
+    def test_delete_orphans(self):
+        self.session.execute(o_models.Listener.__table__.insert().values(
+            id='listener-2', protocol='HTTP', protocol_port=80, enabled=True,
+            provisioning_status='ACTIVE', operating_status='ONLINE'))
+        self.assertEqual(4, self.repo.delete_orphans(self.session, chunk_size=1))
+        self.assertEqual(['listener-2', 'listener-2'], [
+            stats.listener_id for stats in self.session.query(o_models.ListenerStatistics)])
+        self.assertEqual(0, self.repo.delete_orphans(self.session))
+
+    def test_replace_bulk(self):
+        statements = []
+        event.listen(self.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+        stats_list = [
+            o_data_models.ListenerStatistics(listener_id='listener-1', amphora_id='amphora-1',
+                                             bytes_in=10, total_connections=1),
+            o_data_models.ListenerStatistics(listener_id='listener-4', amphora_id='amphora-1',
+                                             bytes_in=20, total_connections=2),
+            o_data_models.ListenerStatistics(listener_id='listener-5', bytes_in=30)]
+        self.assertEqual(3, self.repo.replace_bulk(self.session, stats_list))
+        self.assertEqual(1, len([stmt for stmt in statements if stmt.startswith('SELECT')]))
+        self.assertEqual({('listener-1', 'amphora-1'): 10, ('listener-1', 'amphora-2'): 0,
+                          ('listener-4', 'amphora-1'): 20, ('listener-5', 'listener-5'): 30},
+                         {(stats.listener_id, stats.amphora_id): stats.bytes_in
+                          for stats in self.session.query(o_models.ListenerStatistics)
+                          if stats.listener_id in ('listener-1', 'listener-4', 'listener-5')})
+        self.assertEqual(0, self.repo.replace_bulk(self.session, []))
+
+
+class TestListenerRepository(BaseRepositoryTest):
+
+    def setUp(self):
+        super(TestListenerRepository, self).setUp()
+        o_models.Listener.__table__.create(self.engine)
+        self.repo = repo.ListenerRepository()
+        for i, lb_id in enumerate(('lb-1', 'lb-1', 'lb-2')):
+            self.session.execute(o_models.Listener.__table__.insert().values(
+                id='listener-{}'.format(i), load_balancer_id=lb_id, protocol='HTTP',
+                protocol_port=80 + i, enabled=True, provisioning_status='ACTIVE',
+                operating_status='ONLINE'))
+
+    def test_get_port_listener_maps(self):
+        self.assertEqual({'lb-1': {80: 'listener-0', 81: 'listener-1'},
+                          'lb-2': {82: 'listener-2'}, 'lb-3': {}},
+                         self.repo.get_port_listener_maps(self.session,
+                                                          ['lb-1', 'lb-2', 'lb-3']))
+        self.assertEqual({}, self.repo.get_port_listener_maps(self.session, []))
+
+
+class TestVThunderQueryPlans(BaseRepositoryTest):
+
+    def setUp(self):
+        super(TestVThunderQueryPlans, self).setUp()
+        self.repo = repo.VThunderRepository()
+        for i in range(1, 50):
+            self._create_vthunder(id=i, ip_address='10.0.0.{}'.format(i),
+                                  project_id='project-{}'.format(i),
+                                  health_state='UP')
+
+    def _query_plan(self, repo_call):
+        statements = []
+
+        def _capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+
+        event.listen(self.engine, 'before_cursor_execute', _capture)
+        try:
+            repo_call()
+        finally:
+            event.remove(self.engine, 'before_cursor_execute', _capture)
+        statement, parameters = statements[-1]
+        rows = self.session.connection().exec_driver_sql(
+            'EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()
+        return ' '.join(row[-1] for row in rows)
+
+    def test_heartbeat_lookup_uses_ip_address_index(self):
+        plan = self._query_plan(
+            lambda: self.repo.get_vthunder_from_src_addr(self.session, '10.0.0.7'))
+        self.assertIn('ix_vthunders_ip_address_partition_name', plan)
+
+    def test_stale_check_uses_health_state_index(self):
+        now = datetime.datetime.utcnow()
+        plan = self._query_plan(
+            lambda: self.repo.get_stale_vthunders(self.session, now, now))
+        self.assertIn('ix_vthunders_health_state_last_udp_update', plan)
@@ -31,6 +31,7 @@ from octavia.tests.unit import base
 
 from a10_octavia.common import a10constants
 from a10_octavia.common import config_options
+from a10_octavia.common import exceptions as a10_exceptions
 from a10_octavia.network.drivers.neutron import a10_octavia_neutron
 from a10_octavia.tests.common import a10constants as a10_tconstants
 
@@ -366,3 +367,199 @@ class TestA10NeutronDriver(base.TestCase):
 
         self.assertRaises(expected_error, module_func, *module_args)
         update_port.assert_called_with(port['id'], expected_payload)
+
+    def test_get_ports_by_security_group_server_side_filter(self):
+        ports = {'ports': [{'id': 'instance-port-1',
+                            'security_groups': ['sec-grp-1'],
+                            'device_owner': a10constants.OCTAVIA_OWNER}]}
+        self.driver._check_extension_cache[a10constants.SEC_GRP_FILTER_EXT_ALIAS] = True
+        self.driver.neutron_client.list_ports.return_value = ports
+
+        actual_ports = self.driver._get_ports_by_security_group('sec-grp-1')
+        self.driver.neutron_client.list_ports.assert_called_once_with(
+            security_groups=['sec-grp-1'])
+        self.assertEqual(ports['ports'], actual_ports)
+
+    def test_get_ports_by_security_group_no_filter_ext(self):
+        ports = {'ports': [{'id': 'instance-port-1',
+                            'security_groups': ['sec-grp-1'],
+                            'device_owner': a10constants.OCTAVIA_OWNER},
+                           {'id': 'instance-port-2',
+                            'security_groups': ['sec-grp-2'],
+                            'device_owner': a10constants.OCTAVIA_OWNER}]}
+        self.driver._check_extension_cache[a10constants.SEC_GRP_FILTER_EXT_ALIAS] = False
+        self.driver.neutron_client.list_ports.return_value = ports
+
+        actual_ports = self.driver._get_ports_by_security_group('sec-grp-1')
+        self.driver.neutron_client.list_ports.assert_called_once_with()
+        self.assertEqual([ports['ports'][0]], actual_ports)
+
+    def test_get_port_id_from_ip(self):
+        ports = {'ports': [{'id': 'instance-port-1',
+                            'fixed_ips': [{'ip_address': '10.0.0.5'}]}]}
+        list_ports = self.driver.neutron_client.list_ports
+        list_ports.return_value = ports
+
+        port_id = self.driver.get_port_id_from_ip('10.0.0.5')
+        list_ports.assert_called_once_with(device_owner=a10constants.OCTAVIA_OWNER,
+                                           fixed_ips=['ip_address=10.0.0.5'])
+        self.assertEqual('instance-port-1', port_id)
+
+    def test_get_port_id_from_ip_not_found(self):
+        self.driver.neutron_client.list_ports.return_value = {'ports': []}
+        self.assertIsNone(self.driver.get_port_id_from_ip('10.0.0.5'))
+
+    def test_get_port_id_from_ip_port_index_fallback(self):
+        ports = {'ports': [{'id': 'instance-port-1',
+                            'fixed_ips': [{'ip_address': '10.0.0.5'}]},
+                           {'id': 'instance-port-2',
+                            'fixed_ips': [{'ip_address': '10.0.0.6'}]}]}
+        list_ports = self.driver.neutron_client.list_ports
+
+        def _list_ports(**kwargs):
+            if 'fixed_ips' in kwargs:
+                raise neutron_client_exceptions.BadRequest()
+            return ports
+        list_ports.side_effect = _list_ports
+
+        self.assertEqual('instance-port-1', self.driver.get_port_id_from_ip('10.0.0.5'))
+        self.assertEqual('instance-port-2', self.driver.get_port_id_from_ip('10.0.0.6'))
+        # The second lookup is served from the index, not a new full listing
+        unfiltered_calls = [c for c in list_ports.call_args_list
+                            if 'fixed_ips' not in c[1]]
+        self.assertEqual(1, len(unfiltered_calls))
+
+    def test_get_port_id_from_ip_port_index_rebuilt_on_miss(self):
+        ports = {'ports': [{'id': 'instance-port-1',
+                            'fixed_ips': [{'ip_address': '10.0.0.5'}]}]}
+        list_ports = self.driver.neutron_client.list_ports
+
+        def _list_ports(**kwargs):
+            if 'fixed_ips' in kwargs:
+                raise neutron_client_exceptions.BadRequest()
+            return ports
+        list_ports.side_effect = _list_ports
+
+        self.driver.get_port_id_from_ip('10.0.0.5')
+        # created by another worker after the index was built
+        ports['ports'].append({'id': 'instance-port-2',
+                               'fixed_ips': [{'ip_address': '10.0.0.6'}]})
+        self.assertEqual('instance-port-2', self.driver.get_port_id_from_ip('10.0.0.6'))
+        self.assertIsNone(self.driver.get_port_id_from_ip('10.0.0.7'))
+
+    def test_get_port_id_from_ip_port_index_invalidated_on_delete(self):
+        ports = {'ports': [{'id': 'instance-port-1',
+                            'fixed_ips': [{'ip_address': '10.0.0.5'}]}]}
+        list_ports = self.driver.neutron_client.list_ports
+
+        def _list_ports(**kwargs):
+            if 'fixed_ips' in kwargs:
+                raise neutron_client_exceptions.BadRequest()
+            return ports
+        list_ports.side_effect = _list_ports
+
+        self.driver.get_port_id_from_ip('10.0.0.5')
+        self.driver.delete_port('instance-port-1')
+        ports['ports'] = []
+        self.assertIsNone(self.driver.get_port_id_from_ip('10.0.0.5'))
+
+    def test_reserve_subnet_addresses_bulk_no_subnet_contains_addresses(self):
+        self.driver.get_subnet = mock.Mock(return_value=mock.Mock(
+            id='subnet-1', network_id='net-1', cidr='10.0.0.0/24'))
+        self.driver.neutron_client.create_port = mock.Mock()
+        self.assertEqual({}, self.driver.reserve_subnet_addresses_bulk(
+            ['subnet-1'], ['1.1.1.1', '1.1.1.2'], None))
+        self.driver.neutron_client.create_port.assert_not_called()
+
+    def test_allocate_vrid_fips(self):
+        vrid_1 = mock.Mock(id='vrid-1', subnet_id='subnet-1', owner='owner')
+        vrid_2 = mock.Mock(id='vrid-2', subnet_id='subnet-2', owner='owner')
+        amphora = mock.Mock(status='ALLOCATED', compute_id='compute-1',
+                            lb_network_ip='10.0.0.2')
+        self.driver.neutron_client.create_port = mock.Mock()
+        self.driver.neutron_client.create_port.return_value = {'ports': [
+            {'id': 'port-1', 'network_id': 'net-1',
+             'fixed_ips': [{'subnet_id': 'subnet-1', 'ip_address': '10.0.1.5'}]},
+            {'id': 'port-2', 'network_id': 'net-2',
+             'fixed_ips': [{'subnet_id': 'subnet-2', 'ip_address': '10.0.2.5'}]}]}
+        self.driver._get_plugged_interface = mock.Mock(
+            side_effect=lambda compute_id, network_id, lb_network_ip: mock.Mock(
+                port_id='amp-port-' + network_id))
+        self.driver._add_allowed_address_pair_to_port = mock.Mock()
+
+        new_ports = self.driver.allocate_vrid_fips(
+            [(vrid_1, 'net-1', '10.0.1.5'), (vrid_2, 'net-2', None)], [amphora])
+        self.assertEqual(['port-1', 'port-2'], [port.id for port in new_ports])
+        self.driver.neutron_client.create_port.assert_called_once()
+        payload = self.driver.neutron_client.create_port.call_args[0][0]
+        self.assertEqual(2, len(payload['ports']))
+        self.assertEqual([{'subnet_id': 'subnet-1', 'ip_address': '10.0.1.5'}],
+                         payload['ports'][0]['fixed_ips'])
+        self.assertEqual([{'subnet_id': 'subnet-2'}], payload['ports'][1]['fixed_ips'])
+        self.driver._add_allowed_address_pair_to_port.assert_has_calls(
+            [mock.call('amp-port-net-1', ['10.0.1.5']),
+             mock.call('amp-port-net-2', ['10.0.2.5'])], any_order=True)
+
+    def test_allocate_vrid_fips_create_failure(self):
+        vrid = mock.Mock(id='vrid-1', subnet_id='subnet-1', owner='owner')
+        with mock.patch.object(self.driver.neutron_client, 'create_port',
+                               side_effect=Exception):
+            self.assertRaises(network_driver_base.AllocateVIPException,
+                              self.driver.allocate_vrid_fips,
+                              [(vrid, 'net-1', None)], [])
+
+    def test_allocate_vrid_fips_aap_failure_deletes_ports(self):
+        vrid = mock.Mock(id='vrid-1', subnet_id='subnet-1', owner='owner')
+        amphora = mock.Mock(status='ALLOCATED', compute_id='compute-1',
+                            lb_network_ip='10.0.0.2')
+        self.driver.neutron_client.create_port = mock.Mock()
+        self.driver.neutron_client.create_port.return_value = {'ports': [
+            {'id': 'port-1', 'network_id': 'net-1',
+             'fixed_ips': [{'subnet_id': 'subnet-1', 'ip_address': '10.0.1.5'}]}]}
+        self.driver.neutron_client.delete_port = mock.Mock()
+        self.driver._get_plugged_interface = mock.Mock(return_value=None)
+        self.assertRaises(a10_exceptions.InterfaceNotFound,
+                          self.driver.allocate_vrid_fips,
+                          [(vrid, 'net-1', None)], [amphora])
+        self.driver.neutron_client.delete_port.assert_called_once_with('port-1')
+
+    def test_reserve_subnet_addresses_bulk_aap_failure_deletes_ports(self):
+        self.driver.get_subnet = mock.Mock(return_value=mock.Mock(
+            id='subnet-1', network_id='net-1', cidr='1.1.1.0/24'))
+        amphora = mock.Mock(status='ALLOCATED', compute_id='compute-1',
+                            lb_network_ip='10.0.0.2')
+        self.driver.neutron_client.create_port = mock.Mock()
+        self.driver.neutron_client.create_port.return_value = {'ports': [
+            {'id': 'port-1', 'network_id': 'net-1'}]}
+        self.driver.neutron_client.delete_port = mock.Mock()
+        self.driver._get_plugged_interface = mock.Mock(return_value=None)
+        self.assertRaises(a10_exceptions.InterfaceNotFound,
+                          self.driver.reserve_subnet_addresses_bulk,
+                          ['subnet-1'], ['1.1.1.1'], [amphora])
+        self.driver.neutron_client.delete_port.assert_called_once_with('port-1')
+
+    def test_reserve_subnet_addresses_bulk(self):
+        subnets = {'subnet-1': mock.Mock(id='subnet-1', network_id='net-1', cidr='1.1.1.0/25'),
+                   'subnet-2': mock.Mock(id='subnet-2', network_id='net-1', cidr='1.1.1.0/24'),
+                   'subnet-3': mock.Mock(id='subnet-3', network_id='net-2', cidr='10.0.0.0/24')}
+        self.driver.get_subnet = mock.Mock(side_effect=lambda subnet_id: subnets[subnet_id])
+        amphora = mock.Mock(status='ALLOCATED', compute_id='compute-1',
+                            lb_network_ip='10.0.0.2')
+        self.driver.neutron_client.create_port = mock.Mock()
+        self.driver.neutron_client.create_port.return_value = {'ports': [
+            {'id': 'port-1', 'network_id': 'net-1'},
+            {'id': 'port-2', 'network_id': 'net-1'}]}
+        self.driver._get_plugged_interface = mock.Mock(
+            return_value=mock.Mock(port_id='amp-port-1'))
+        self.driver._add_allowed_address_pair_to_port = mock.Mock()
+
+        subnet_ports = self.driver.reserve_subnet_addresses_bulk(
+            ['subnet-1', 'subnet-3', 'subnet-2'], ['1.1.1.1'], [amphora])
+        self.assertEqual({'subnet-1': 'port-1', 'subnet-2': 'port-2'},
+                         {k: v.id for k, v in subnet_ports.items()})
+        self.driver.neutron_client.create_port.assert_called_once()
+        # subnet-3 doesn't contain the addresses, so no port is built for it
+        self.assertEqual(2, len(self.driver.neutron_client.create_port.call_args[0][0]['ports']))
+        # Both subnets share the amphora interface, so one update carries both
+        self.driver._add_allowed_address_pair_to_port.assert_called_once_with(
+            'amp-port-1', ['1.1.1.1', '1.1.1.1'])